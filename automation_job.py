@@ -1,7 +1,20 @@
+import argparse
 import os
+import signal
+import socket
+import threading
+import uuid
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 from supabase import create_client, Client
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from db_utils import select_in, insert_chunked, keyset_page, chunked, INSERT_CHUNK_SIZE
+from instrumentation import CallRecorder, instrument
+from waha import WahaSender
 
 try:
     from dotenv import load_dotenv
@@ -19,11 +32,72 @@ WAHA_URL = os.getenv("WAHA_URL")
 WAHA_API_KEY = os.getenv("WAHA_API_KEY", "")
 # Nome da sessão do WAHA (padrão é "default")
 WAHA_SESSION = os.getenv("WAHA_SESSION", "default")
+# Quantidade de envios simultâneos ao WAHA (tamanho do pool de workers/conexões)
+WAHA_CONCURRENCY = max(1, int(os.getenv("WAHA_CONCURRENCY") or 8))
+# Limites de envio (mensagens/segundo): total no servidor WAHA e por sessão (número de WhatsApp)
+WAHA_RATE = float(os.getenv("WAHA_RATE") or 5)
+WAHA_SESSION_RATE = float(os.getenv("WAHA_SESSION_RATE") or 1)
+# Tentativas por mensagem em 429/5xx/timeout (com backoff exponencial + jitter)
+WAHA_MAX_ATTEMPTS = int(os.getenv("WAHA_MAX_ATTEMPTS") or 4)
+# Partição (shard) deste processo: contratos divididos em SHARD_COUNT faixas de id
+SHARD_INDEX = int(os.getenv("SHARD_INDEX") or 0)
+SHARD_COUNT = int(os.getenv("SHARD_COUNT") or 1)
+# Contratos por página; o checkpoint é gravado ao fim de cada página
+PAGE_SIZE = int(os.getenv("JOB_PAGE_SIZE") or 200)
+# Modo worker (fila notification_outbox): mensagens por lote e espera quando a fila está vazia
+WORKER_BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE") or 20)
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS") or 5)
+# Quantos workers rodam ao mesmo tempo: os limites do WAHA são divididos entre eles
+WORKER_COUNT = max(1, int(os.getenv("WORKER_COUNT") or 1))
+# Interrompido (SIGTERM), quantos segundos esperar pelos envios já em andamento antes de sair.
+# O GitHub Actions manda SIGKILL ~7,5s depois do SIGTERM.
+DRAIN_SECONDS = float(os.getenv("DRAIN_SECONDS") or 5)
+
+# Fuso do negócio: "o dia" da cobrança termina à meia-noite de Brasília, não de UTC
+BUSINESS_TZ = ZoneInfo("America/Sao_Paulo")
+
+# Opcional: arquivo .jsonl que recebe cada chamada ao Supabase (ver instrumentation.py)
+QUERY_LOG_FILE = os.getenv("QUERY_LOG_FILE")
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("Variáveis SUPABASE_URL e SUPABASE_SERVICE_KEY não configuradas.")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+recorder = CallRecorder("job", QUERY_LOG_FILE)
+supabase: Client = instrument(create_client(SUPABASE_URL, SUPABASE_KEY), recorder)
+
+_http_session = None
+_sender = None
+
+
+def get_http_session() -> requests.Session:
+    """Sessão HTTP compartilhada (keep-alive) com pool do tamanho da concorrência."""
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=WAHA_CONCURRENCY)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _http_session = session
+    return _http_session
+
+
+def get_sender(share: int = 1) -> WahaSender:
+    """
+    Remetente compartilhado pelas threads: os limites de taxa valem para o
+    processo todo. `share` divide os limites entre as partições (shards)
+    que rodam ao mesmo tempo contra o mesmo WAHA/número — juntas elas
+    enviam no máximo WAHA_RATE/WAHA_SESSION_RATE, com qualquer nº de partições.
+    """
+    global _sender
+    if _sender is None:
+        rate, session_rate = WAHA_RATE / share, WAHA_SESSION_RATE / share
+        _sender = WahaSender(
+            WAHA_URL, WAHA_API_KEY, get_http_session(),
+            rate=rate, burst=max(1.0, rate),
+            session_rate=session_rate, session_burst=max(1.0, 3 * session_rate),
+            max_attempts=WAHA_MAX_ATTEMPTS,
+        )
+    return _sender
 
 
 def format_phone_waha(phone: str) -> str:
@@ -44,25 +118,10 @@ def send_whatsapp(phone: str, message: str) -> bool:
         print(f"[SIMULAÇÃO — WAHA_URL não configurada] {phone}: {message}")
         return True
 
-    chat_id = format_phone_waha(phone)
-    url = f"{WAHA_URL.rstrip('/')}/api/sendText"
-    headers = {"Content-Type": "application/json"}
-    if WAHA_API_KEY:
-        headers["X-Api-Key"] = WAHA_API_KEY
-
-    payload = {
-        "session": WAHA_SESSION,
-        "chatId": chat_id,
-        "text": message,
-    }
-
-    try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=15)
-        resp.raise_for_status()
-        return True
-    except Exception as e:
-        print(f"  [ERRO] Falha ao enviar para {phone}: {e}")
-        return False
+    ok, error = get_sender().send_text(format_phone_waha(phone), message, WAHA_SESSION)
+    if not ok:
+        print(f"  [ERRO] Falha ao enviar para {phone}: {error}")
+    return ok
 
 
 def build_message(client_name: str, loan: dict) -> str:
@@ -89,31 +148,242 @@ def build_message(client_name: str, loan: dict) -> str:
         )
 
 
-def already_notified_today(loan_id: str, today: str) -> bool:
-    """Verifica se já foi enviada notificação hoje para este empréstimo."""
-    r = supabase.table("notification_logs") \
-        .select("id") \
-        .eq("loan_id", loan_id) \
-        .gte("sent_at", f"{today}T00:00:00") \
-        .execute()
-    return bool(r.data)
+def fetch_notified_today(loan_ids: list, today: str) -> set:
+    """Busca de uma vez (em lotes de in_) os empréstimos notificados com sucesso hoje.
+    Envios com erro não contam: a próxima execução tenta de novo."""
+    rows = select_in(
+        lambda: supabase.table("notification_logs")
+            .select("loan_id")
+            .eq("status", "success")
+            .gte("sent_at", f"{today}T00:00:00"),
+        "loan_id",
+        loan_ids,
+    )
+    return {r["loan_id"] for r in rows}
 
 
-def main():
-    today = date.today().isoformat()
-    print(f"--- Job de Cobrança: {today} ---")
+class NotificationLogBuffer:
+    """
+    Acumula as linhas de notification_logs e grava com inserts em lote.
+    Deve ser descarregado (flush) ao final e em caso de erro, para que
+    o controle de "já notificado hoje" sobreviva a uma falha do job.
+    """
 
-    # Busca empréstimos atrasados + vencendo hoje (status pendente ou atrasado)
-    response = supabase.table("loans") \
+    # Lotes pequenos limitam quantos envios ficam sem log se o processo morrer
+    def __init__(self, chunk_size: int = 50):
+        self.chunk_size = chunk_size
+        self.rows = []
+
+    def add(self, loan_id: str, status: str):
+        self.rows.append({"loan_id": loan_id, "status": status})
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        while self.rows:
+            chunk = self.rows[:self.chunk_size]
+            insert_chunked(supabase, "notification_logs", chunk, self.chunk_size)
+            del self.rows[:len(chunk)]
+
+
+def _send_job(job: dict, stop: threading.Event):
+    """Envia um job do pool; None se a execução foi interrompida antes do envio."""
+    if stop.is_set():
+        return None
+    return send_whatsapp(job["phone"], job["message"])
+
+
+def dispatch(jobs: list, on_result, concurrency: int = WAHA_CONCURRENCY, flush=None,
+             drain_seconds: float = DRAIN_SECONDS):
+    """
+    Envia as mensagens por um pool limitado de threads. Cada job é um dict
+    com 'phone' e 'message'; `on_result(job, sucesso)` roda na thread
+    principal, na ordem em que os envios terminam.
+
+    Só `concurrency` jobs ficam no pool por vez. Se a execução for
+    interrompida (ex: SIGTERM → SystemExit), os que ainda não começaram são
+    cancelados, `flush` grava o que já foi registrado e os envios em
+    andamento ainda passam por `on_result` se terminarem em `drain_seconds`
+    — o que saiu entra no log e não é reenviado na próxima execução.
+    """
+    if not jobs:
+        return
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=min(concurrency, len(jobs)))
+    queue = iter(jobs)
+    pending = {}
+    try:
+        while True:
+            for job in islice(queue, concurrency - len(pending)):
+                pending[pool.submit(_send_job, job, stop)] = job
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                on_result(pending.pop(future), future.result())
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        if pending:
+            if flush:
+                flush()
+            done, _ = wait(pending, timeout=drain_seconds)
+            for future in done:
+                if not future.cancelled() and future.exception() is None and future.result() is not None:
+                    on_result(pending[future], future.result())
+
+
+def promote_overdue():
+    """Promove pendentes vencidos para 'atrasado' (no máximo uma vez por dia, ver migration_v4)."""
+    try:
+        promoted = supabase.rpc("promote_overdue_loans", {}).execute().data
+    except Exception as e:
+        print(f"  [AVISO] Não foi possível atualizar contratos atrasados: {e}")
+        return
+    if promoted is not None and promoted >= 0:
+        print(f"Contratos promovidos para atrasado: {promoted}")
+
+
+def take_snapshot(day: str = None, overwrite: bool = False):
+    """
+    Foto da carteira por dono/status (migration_v12); refazer o mesmo dia só substitui as linhas.
+    Num dia passado a foto exata já gravada é mantida (retorna -1), a não ser com `overwrite`.
+    """
+    params = {"p_date": day, "p_overwrite": overwrite} if day else {}
+    try:
+        rows = supabase.rpc("take_portfolio_snapshot", params).execute().data
+    except Exception as e:
+        print(f"  [AVISO] Não foi possível gravar a foto da carteira: {e}")
+        return None
+    return rows
+
+
+def backfill_snapshots(start: date, end: date, overwrite: bool = False):
+    """
+    Reconstrói (aproximadamente, ver migration_v12) as fotos diárias de `start` até `end`.
+    Dias com a foto exata do robô ficam como estão, a não ser com `overwrite`.
+    """
+    print(f"--- Backfill da carteira: {start} a {end} ---")
+    recorder.start_rerun()
+    recorder.page = "backfill"
+    day, total, kept = start, 0, 0
+    while day <= end:
+        rows = take_snapshot(day.isoformat(), overwrite)
+        if rows is None:
+            break
+        if rows < 0:
+            kept += 1
+        else:
+            total += rows
+        day += timedelta(days=1)
+    print(f"Fotos gravadas: {(day - start).days - kept} dia(s), {total} linhas"
+          + (f" | {kept} dia(s) com foto exata mantidos" if kept else ""))
+    print_call_summary()
+
+
+def shard_bounds(index: int, count: int):
+    """
+    Faixa [início, fim) de ids da partição `index` de `count`. Os ids são
+    uuid v4 (aleatórios), então faixas iguais do espaço de 128 bits têm
+    ~o mesmo número de contratos, e o filtro por faixa usa a chave primária.
+    None = sem limite naquele lado.
+    """
+    if not 0 <= index < count:
+        raise ValueError(f"shard {index} fora de 0..{count - 1}")
+    lo = None if index == 0 else str(uuid.UUID(int=index * 2**128 // count))
+    hi = None if index == count - 1 else str(uuid.UUID(int=(index + 1) * 2**128 // count))
+    return lo, hi
+
+
+class Checkpoint:
+    """
+    Progresso da partição no dia (tabela job_checkpoints, migration_v10).
+    Sem a tabela o job roda normalmente, só não retoma de onde parou.
+    """
+
+    def __init__(self, run_date: str, index: int, count: int):
+        self.key = {"run_date": run_date, "shard_index": index, "shard_count": count}
+        self.last_loan_id, self.processed, self.done = None, 0, False
+        self.enabled = True
+        try:
+            q = supabase.table("job_checkpoints").select("last_loan_id, processed, done")
+            for col, value in self.key.items():
+                q = q.eq(col, value)
+            rows = q.execute().data
+        except Exception as e:
+            print(f"  [AVISO] Checkpoints indisponíveis (aplique database/migration_v10.sql): {e}")
+            self.enabled = False
+            return
+        if rows:
+            self.last_loan_id = rows[0]["last_loan_id"]
+            self.processed = rows[0]["processed"]
+            self.done = rows[0]["done"]
+
+    def save(self, last_loan_id: str, processed: int, done: bool = False):
+        self.last_loan_id, self.processed, self.done = last_loan_id, processed, done
+        if not self.enabled:
+            return
+        supabase.table("job_checkpoints").upsert({
+            **self.key, "last_loan_id": last_loan_id, "processed": processed, "done": done,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }, on_conflict="run_date,shard_index,shard_count").execute()
+
+
+def failed_today(today: str, lo, hi) -> list:
+    """Contratos em aberto da partição cujo envio falhou hoje — reenviados no início da próxima execução."""
+    q = supabase.table("notification_logs") \
+        .select("loan_id") \
+        .eq("status", "error") \
+        .gte("sent_at", f"{today}T00:00:00")
+    if lo: q = q.gte("loan_id", lo)
+    if hi: q = q.lt("loan_id", hi)
+    ids = {r["loan_id"] for r in q.execute().data or []}
+    ids -= fetch_notified_today(list(ids), today)
+    return select_in(
+        lambda: supabase.table("loans").select("*, clients(name, phone)").in_("status", ["pendente", "atrasado"]),
+        "id",
+        ids,
+    )
+
+
+def due_loans_query(today: str, lo, hi):
+    """Contratos atrasados + vencendo hoje (pendente/atrasado) dentro da faixa de ids da partição."""
+    q = supabase.table("loans") \
         .select("*, clients(name, phone)") \
         .in_("status", ["pendente", "atrasado"]) \
-        .lte("due_date", today) \
-        .execute()
+        .lte("due_date", today)
+    if lo: q = q.gte("id", lo)
+    if hi: q = q.lt("id", hi)
+    return q
+
+
+def print_call_summary():
+    """Fecha a medição do job e imprime as chamadas ao Supabase por alvo."""
+    summary = recorder.finish()
+    print(f"Supabase: {summary['calls']} chamadas, {summary['ms']:.0f} ms, {summary['rows']} linhas")
+    for target, s in summary["by_target"].items():
+        print(f"  {target}: {s['calls']}x, {s['ms']:.0f} ms (máx {s['max_ms']:.0f}), {s['rows']} linhas")
+
 
-    loans = response.data or []
-    print(f"Contratos encontrados: {len(loans)}")
+def enqueue_jobs(jobs: list, today: str):
+    """Grava as cobranças na fila (migration_v11); a mesma cobrança do dia não entra duas vezes.
+    A cobrança vale só para o dia: o que não sair até a meia-noite de Brasília é descartado pelo claim."""
+    expires_at = datetime.combine(date.fromisoformat(today) + timedelta(days=1), time(), BUSINESS_TZ).isoformat()
+    rows = [{
+        "kind": "cobranca", "loan_id": j["loan_id"], "phone": j["phone"], "message": j["message"],
+        "dedup_key": f"cobranca:{j['loan_id']}:{today}", "expires_at": expires_at,
+    } for j in jobs]
+    for chunk in chunked(rows, INSERT_CHUNK_SIZE):
+        supabase.table("notification_outbox").upsert(chunk, on_conflict="dedup_key", ignore_duplicates=True).execute()
 
-    enviados, pulados, erros = 0, 0, 0
+
+def process_page(loans: list, today: str, logs: NotificationLogBuffer, totals: dict, enqueue: bool = False):
+    """
+    Envia as mensagens de uma página de contratos e acumula os contadores em `totals`.
+    Com `enqueue`, só grava na fila notification_outbox (os workers enviam).
+    """
+    jobs = []
+    notified = fetch_notified_today([l["id"] for l in loans], today)
 
     for loan in loans:
         loan_id = loan["id"]
@@ -121,37 +391,195 @@ def main():
 
         if not client or not client.get("phone"):
             print(f"  [AVISO] Empréstimo {loan_id} sem cliente/telefone. Pulando.")
-            pulados += 1
+            totals["pulados"] += 1
             continue
 
-        if already_notified_today(loan_id, today):
+        if loan_id in notified:
             print(f"  [PULADO] {client['name']} já notificado hoje.")
-            pulados += 1
+            totals["pulados"] += 1
             continue
 
-        message = build_message(client["name"], loan)
-        print(f"  Enviando para {client['name']} ({client['phone']})...")
+        print(f"  {'Enfileirando' if enqueue else 'Enviando'} para {client['name']} ({client['phone']})...")
+        jobs.append({
+            "loan_id": loan_id,
+            "name": client["name"],
+            "phone": client["phone"],
+            "message": build_message(client["name"], loan),
+        })
 
-        success = send_whatsapp(client["phone"], message)
+    if enqueue:
+        enqueue_jobs(jobs, today)
+        totals["enfileirados"] += len(jobs)
+        return
 
-        log_status = "success" if success else "error"
-        supabase.table("notification_logs").insert({
-            "loan_id": loan_id,
-            "status": log_status,
-        }).execute()
+    # Os envios rodam em paralelo; o log e os contadores ficam na thread principal
+    def record(job, success):
+        logs.add(job["loan_id"], "success" if success else "error")
 
         if success:
-            enviados += 1
-            print(f"  [OK] Mensagem enviada e logada.")
+            totals["enviados"] += 1
+            print(f"  [OK] {job['name']}: mensagem enviada.")
         else:
-            erros += 1
+            totals["erros"] += 1
+
+    dispatch(jobs, record, flush=logs.flush)
+
 
-    print(f"\n--- Resultado: {enviados} enviados | {pulados} pulados | {erros} erros ---")
+def main(shard_index: int = SHARD_INDEX, shard_count: int = SHARD_COUNT, page_size: int = PAGE_SIZE,
+         enqueue: bool = False):
+    today = date.today().isoformat()
+    shard = f" (shard {shard_index + 1}/{shard_count})" if shard_count > 1 else ""
+    print(f"--- Job de Cobrança: {today}{shard} ---")
+    recorder.start_rerun()
+    recorder.page = f"cobranca:{shard_index}/{shard_count}"
+    if WAHA_URL:
+        get_sender(shard_count)
+    promote_overdue()
+    # A foto do dia é da carteira toda: só a primeira partição grava (já com os atrasados promovidos)
+    if shard_index == 0:
+        rows = take_snapshot()
+        if rows is not None:
+            print(f"Foto da carteira gravada: {rows} linhas")
+
+    lo, hi = shard_bounds(shard_index, shard_count)
+    totals = {"enviados": 0, "pulados": 0, "erros": 0, "enfileirados": 0}
+    logs = NotificationLogBuffer()
+
+    # Primeiro, o que falhou mais cedo hoje (já sem os que deram certo depois).
+    # Na fila, as novas tentativas ficam por conta dos workers.
+    retry = [] if enqueue else failed_today(today, lo, hi)
+    if retry:
+        print(f"Reenviando {len(retry)} mensagem(ns) que falharam hoje...")
+        try:
+            process_page(retry, today, logs, totals)
+        finally:
+            logs.flush()
+
+    checkpoint = Checkpoint(today, shard_index, shard_count)
+    if checkpoint.done:
+        print(f"Partição já concluída hoje ({checkpoint.processed} contratos).")
+        print_summary(totals)
+        return
+    if checkpoint.last_loan_id:
+        print(f"Retomando após o contrato {checkpoint.last_loan_id} ({checkpoint.processed} já processados).")
+
+    # Percorre a faixa em páginas por id; cada página concluída vira checkpoint
+    after = checkpoint.last_loan_id
+    processed = checkpoint.processed
+    try:
+        while True:
+            loans, nxt = keyset_page(due_loans_query(today, lo, hi), "id",
+                                     (after, after) if after else None, page_size)
+            process_page(loans, today, logs, totals, enqueue)
+            # Log gravado antes do checkpoint: retomar nunca pula um envio sem registro
+            logs.flush()
+            processed += len(loans)
+            if loans:
+                after = loans[-1]["id"]
+            checkpoint.save(after, processed, done=nxt is None)
+            if nxt is None:
+                break
+    finally:
+        logs.flush()
+
+    print(f"Contratos processados: {processed}")
+    print_summary(totals)
+
+
+def print_summary(totals: dict):
+    queued = f" | {totals['enfileirados']} enfileirados" if totals["enfileirados"] else ""
+    print(f"\n--- Resultado: {totals['enviados']} enviados | {totals['pulados']} pulados | {totals['erros']} erros{queued} ---")
+    if _sender is not None:
+        st = _sender.stats
+        print(f"WAHA: {st['sent']} entregues, {st['retries']} retentativas, {st['throttled']} respostas 429, "
+              f"{st['budget_exhausted']} sem orçamento de retry, {st['failed']} falhas definitivas")
+    print_call_summary()
+
+
+def run_worker(batch_size: int = WORKER_BATCH_SIZE, poll_seconds: float = WORKER_POLL_SECONDS, once: bool = False,
+               workers: int = WORKER_COUNT):
+    """
+    Worker de longa duração: reserva lotes da fila notification_outbox
+    (claim_notifications, FOR UPDATE SKIP LOCKED — vários workers podem rodar
+    juntos), envia e marca o resultado (complete_notifications). Com `once`,
+    sai quando a fila esvazia. SIGTERM/Ctrl+C terminam o lote atual e saem.
+    `workers` é o total de workers no ar: cada um envia com 1/workers dos
+    limites WAHA_RATE/WAHA_SESSION_RATE, como as partições do robô diário.
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"--- Worker de notificações {worker_id} (lotes de {batch_size}, 1/{workers} da taxa do WAHA) ---")
+    if WAHA_URL:
+        get_sender(workers)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    enviados, erros = 0, 0
+
+    while not stop.is_set():
+        recorder.start_rerun()  # um "rerun" por ciclo: o log .jsonl fica com o resumo de cada lote
+        recorder.page = "worker"
+        batch = supabase.rpc("claim_notifications", {"p_worker": worker_id, "p_limit": batch_size}).execute().data or []
+        if not batch:
+            if once:
+                break
+            stop.wait(poll_seconds)
+            continue
+
+        sent, failed = [], []
+        dispatch(batch, lambda job, success: (sent if success else failed).append(job["id"]))
+        supabase.rpc("complete_notifications", {
+            "p_sent": sent, "p_failed": failed, "p_error": "falha no envio" if failed else None,
+        }).execute()
+        enviados += len(sent)
+        erros += len(failed)
+        print(f"  Lote: {len(sent)} enviados, {len(failed)} com erro (total: {enviados} enviados, {erros} erros)")
+
+    recorder.finish()
+    agg = recorder.pages.get("worker", {"reruns": 0, "calls": 0, "ms": 0.0, "rows": 0})
+    print(f"\n--- Worker encerrado: {enviados} enviados | {erros} erros ---")
+    print(f"Supabase: {agg['calls']} chamadas em {agg['reruns']} ciclos, {agg['ms']:.0f} ms, {agg['rows']} linhas")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Robô de cobrança diária via WhatsApp (WAHA).")
+    parser.add_argument("--shard-index", type=int, default=SHARD_INDEX,
+                        help="partição deste processo, de 0 a shard-count - 1 (env SHARD_INDEX)")
+    parser.add_argument("--shard-count", type=int, default=SHARD_COUNT,
+                        help="total de partições (env SHARD_COUNT)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help="contratos por página/checkpoint (env JOB_PAGE_SIZE)")
+    parser.add_argument("--backfill-from", type=date.fromisoformat, metavar="AAAA-MM-DD",
+                        help="só reconstrói as fotos diárias da carteira a partir desta data e sai")
+    parser.add_argument("--backfill-to", type=date.fromisoformat, metavar="AAAA-MM-DD",
+                        help="último dia do backfill (padrão: ontem)")
+    parser.add_argument("--backfill-overwrite", action="store_true",
+                        help="backfill: substitui também as fotos exatas gravadas pelo robô")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="grava as cobranças na fila notification_outbox em vez de enviar")
+    parser.add_argument("--worker", action="store_true",
+                        help="roda como worker da fila notification_outbox (migration_v11)")
+    parser.add_argument("--once", action="store_true", help="worker: sai quando a fila esvaziar")
+    parser.add_argument("--batch-size", type=int, default=WORKER_BATCH_SIZE,
+                        help="worker: mensagens por lote (env WORKER_BATCH_SIZE)")
+    parser.add_argument("--poll-seconds", type=float, default=WORKER_POLL_SECONDS,
+                        help="worker: espera com a fila vazia (env WORKER_POLL_SECONDS)")
+    parser.add_argument("--workers", type=int, default=WORKER_COUNT,
+                        help="worker: total de workers rodando juntos, divide a taxa do WAHA (env WORKER_COUNT)")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
+    # SIGTERM (ex: cancelamento no GitHub Actions) vira SystemExit para o flush dos logs rodar
+    signal.signal(signal.SIGTERM, lambda *_: exit(1))
+    args = parse_args()
     try:
-        main()
+        if args.backfill_from:
+            backfill_snapshots(args.backfill_from, args.backfill_to or date.today() - timedelta(days=1),
+                               args.backfill_overwrite)
+        elif args.worker:
+            run_worker(args.batch_size, args.poll_seconds, args.once, max(1, args.workers))
+        else:
+            main(args.shard_index, args.shard_count, args.page_size, args.enqueue)
     except Exception as e:
         print(f"Erro fatal: {e}")
         exit(1)
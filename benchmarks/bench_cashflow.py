@@ -0,0 +1,104 @@
+"""
+Benchmark da projeção de recebimentos (cashflow.project) com contratos
+sintéticos, sem banco. Antes de medir, confere a agenda vetorizada
+(duedates.add_months) contra next_due_date aplicado mês a mês, com âncoras
+29-31 e anos bissextos.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_cashflow --loans 100000 --months 12
+
+Sai com código 1 se a agenda divergir ou a projeção passar de --budget segundos.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import cashflow
+from duedates import add_months, next_due_date
+
+
+def check_add_months(n=20000, steps=30, seed_value=7):
+    """Compara add_months com N chamadas de next_due_date. Retorna a lista de divergências."""
+    rng = random.Random(seed_value)
+    anchors, starts = [], []
+    for _ in range(n):
+        anchor = rng.choice([28, 29, 30, 31]) if rng.random() < 0.5 else rng.randint(1, 31)
+        # O vencimento atual já respeita a âncora (como no banco)
+        start = add_months(anchor, np.datetime64(date(rng.randint(2019, 2031), rng.randint(1, 12), 1)), 0)
+        anchors.append(anchor)
+        starts.append(start)
+    anchors, starts = np.array(anchors), np.array(starts, dtype="datetime64[D]")
+    grid = add_months(anchors[:, None], starts[:, None], np.arange(steps + 1))
+    errors = []
+    for i in range(n):
+        current = starts[i].astype(date)
+        for k in range(1, steps + 1):
+            current = next_due_date(int(anchors[i]), current)
+            if grid[i, k].astype(date) != current:
+                errors.append((int(anchors[i]), str(starts[i]), k, str(grid[i, k]), str(current)))
+                break
+    return errors
+
+
+def synthetic_loans(n, n_owners=20, seed_value=42):
+    rng = np.random.default_rng(seed_value)
+    hoje = np.datetime64(date.today(), "D")
+    due = hoje + rng.integers(-120, 60, n)
+    day = (due - due.astype("datetime64[M]").astype("datetime64[D]")).astype(int) + 1
+    original = rng.integers(4, 200, n) * 50.0
+    loans = pd.DataFrame({
+        "id": np.arange(n).astype(str),
+        "owner_id": rng.integers(0, n_owners, n).astype(str),
+        "original_amount": original,
+        "remaining_amount": original * rng.choice([1.0, 0.5], n),
+        "interest_rate": rng.choice([10.0, 20.0, 30.0], n),
+        "due_date": due.astype(str),
+        "due_day": np.where(rng.random(n) < 0.05, None, day).astype(object),  # alguns sem due_day
+    })
+    roles = {str(i): "admin" if i == 0 else "employee" for i in range(n_owners)}
+    return loans, roles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loans", type=int, default=100000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="tempo máximo da projeção (s)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    errors = check_add_months()
+    print(f"Agenda vetorizada x next_due_date: {len(errors)} divergências ({time.perf_counter() - t0:.1f}s)")
+    for e in errors[:10]:
+        print("  âncora={} início={} mês+{}: vetorizado={} escalar={}".format(*e))
+
+    loans, roles = synthetic_loans(args.loans)
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        out = cashflow.project(loans, roles, args.months)
+        best = min(best, time.perf_counter() - t0)
+
+    # Total de parcelas conferido contra uma conta simples (contratos x meses na janela)
+    start_month = np.datetime64(date.today(), "M")
+    due_month = pd.to_datetime(loans["due_date"]).to_numpy(dtype="datetime64[M]")
+    expected = int(np.clip(args.months - np.maximum(due_month - start_month, np.timedelta64(0, "M")).astype(int),
+                           0, None).sum())
+    ok_count = int(out["parcelas"].sum()) == expected
+    print(f"Projeção: {args.loans} contratos x {args.months} meses em {best * 1000:.0f} ms "
+          f"(melhor de {args.repeat}) | {len(out)} linhas | parcelas {'ok' if ok_count else 'DIVERGENTES'}")
+    by_month = out.groupby("mes")[["parcelas", "juros", "comissao", "lucro"]].sum()
+    print(by_month.to_string(float_format=lambda v: f"{v:,.0f}"))
+
+    if errors or not ok_count or best > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark da exportação para a contabilidade (exporter.py).
+
+1. Memória: grava CSV e Parquet a partir de páginas sintéticas de pagamentos
+   com N e 4×N linhas e compara o pico (tracemalloc) com o jeito ingênuo
+   (todas as linhas num DataFrame e to_csv). O pico do exporter não deve
+   crescer com o número de linhas.
+2. Paginação: exporta pagamentos, contratos e clientes do fake_supabase e
+   confere que nenhuma chamada trouxe mais de uma página e que o arquivo
+   tem as mesmas linhas, na mesma ordem, que um select único da tabela.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_export --rows 40000
+
+Sai com código 1 se o pico crescer mais que --max-growth MB entre N e 4×N
+ou se algum arquivo divergir.
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+import pandas as pd
+
+import exporter
+
+PAGE_SIZE = 1000
+
+
+def synthetic_pages(n_rows, page_size=PAGE_SIZE):
+    """Páginas com a forma das linhas de payments já achatadas (como iter_pages devolve)."""
+    owner = str(uuid.uuid4())
+    start = date(2020, 1, 1)
+    for first in range(0, n_rows, page_size):
+        yield [{
+            "id": str(uuid.uuid4()), "paid_at": str(start + timedelta(days=i // 100)), "loan_id": str(uuid.uuid4()),
+            "owner_id": owner, "profile_name": "Funcionário", "profile_email": "func@empresa.com",
+            "payment_type": "JUROS", "amount": 150.0 + i % 7, "proof_url": None,
+            "created_at": f"{start + timedelta(days=i // 100)}T12:00:00+00:00",
+        } for i in range(first, min(first + page_size, n_rows))]
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20, time.perf_counter() - t0
+    finally:
+        tracemalloc.stop()
+
+
+def measure_memory(n_rows, path):
+    columns = exporter.DATASETS["payments"]["columns"]
+    names = [name for name, _ in columns]
+    runs = {
+        "exporter CSV": lambda: exporter.write_csv(synthetic_pages(n_rows), path, names),
+        "ingênuo (DataFrame)": lambda: pd.DataFrame(
+            [r for page in synthetic_pages(n_rows) for r in page], columns=names).to_csv(path, index=False),
+    }
+    if exporter.parquet_available():
+        runs["exporter Parquet"] = lambda: exporter.write_parquet(synthetic_pages(n_rows), path, columns)
+    return {label: peak_mb(fn) for label, fn in runs.items()}
+
+
+def check_paging(clients, loans, page_size, workdir):
+    """Exporta do fake_supabase. Retorna a lista de problemas encontrados."""
+    from benchmarks.bench_pages import seed
+    from benchmarks.fake_supabase import FakeDB, FakeSupabase
+
+    db = FakeDB()
+    seed(db, clients, loans)
+    client = FakeSupabase(db)
+    problems = []
+    for dataset, spec in exporter.DATASETS.items():
+        path = os.path.join(workdir, exporter.file_name(dataset, "csv"))
+        db.reset_counters()
+        t0 = time.perf_counter()
+        n = exporter.export(client, dataset, path, page_size=page_size)
+        elapsed = time.perf_counter() - t0
+        calls = db.queries
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            got = [row["id"] for row in csv.DictReader(f)]
+        rows = client.table(dataset).select("id").order(spec["date_col"]).order("id").execute().data
+        expected = [r["id"] for r in rows]
+        print(f"  {dataset:9} {n:7d} linhas em {calls:4d} chamadas ({elapsed:.2f}s)")
+        if got != expected:
+            problems.append(f"{dataset}: {len(got)} linhas no arquivo, {len(expected)} na tabela (ou fora de ordem)")
+        if calls > len(expected) // page_size + 1:
+            problems.append(f"{dataset}: {calls} chamadas para {len(expected)} linhas (página de {page_size})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=40000, help="linhas sintéticas do teste de memória (e 1/4 disso)")
+    parser.add_argument("--max-growth", type=float, default=2.0, help="MB que o pico do exporter pode crescer")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--loans", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "memoria")
+        sizes = [args.rows // 4, args.rows]
+        results = {n: measure_memory(n, path) for n in sizes}
+        header = f"{'escrita':22}" + "".join(f" {f'{n} linhas':>22}" for n in sizes)
+        print(header)
+        print("-" * len(header))
+        for label in results[sizes[0]]:
+            print(f"{label:22}" + "".join(
+                f" {results[n][label][0]:10.1f} MB {results[n][label][1]:7.2f}s" for n in sizes))
+            growth = results[sizes[1]][label][0] - results[sizes[0]][label][0]
+            if label.startswith("exporter") and growth > args.max_growth:
+                failures.append(f"{label}: pico cresceu {growth:.1f} MB de {sizes[0]} para {sizes[1]} linhas")
+
+        print(f"\nPaginação no fake_supabase (página de {args.page_size}):")
+        failures += check_paging(args.clients, args.loans, args.page_size, workdir)
+
+    for f in failures:
+        print(f"ERRO: {f}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Benchmark das páginas do app.py sem tocar no Supabase real: popula o
+fake_supabase com dados sintéticos e roda cada item do menu pelo AppTest
+do Streamlit (sem navegador). Para cada cenário mostra tempo total, tempo
+gasto dentro do fake ("banco"), nº de round trips, linhas devolvidas e
+pico de memória do Python, na primeira renderização (fria) e num rerun
+logo em seguida (cache quente).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_pages --clients 10000 --loans 50000
+    python -m benchmarks.bench_pages --role employee --only "Base de Clientes"
+
+Sai com código 1 se alguma página levantar exceção.
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+import tracemalloc
+import types
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+import views
+from benchmarks.fake_supabase import FakeDB, FakeSupabase
+
+try:
+    from streamlit.testing.v1 import AppTest
+except ImportError:
+    raise SystemExit("Instale o streamlit para rodar este benchmark: pip install streamlit")
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+FIRST = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+         "Larissa", "Marcos", "Maria", "Natália", "Otávio", "Paula", "Rafael", "Sabrina", "Tiago", "Vitória"]
+LAST = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Ferreira", "Almeida", "Conceição"]
+
+
+def _cpf(rng):
+    base = [rng.randint(0, 9) for _ in range(9)]
+    for w in (10, 11):
+        d = sum(x * (w - i) for i, x in enumerate(base)) * 10 % 11
+        base.append(0 if d == 10 else d)
+    return "".join(map(str, base))
+
+
+def seed(db, n_clients, n_loans, n_employees=3, seed_value=42):
+    """Popula perfis, clientes, contratos, pagamentos e documentos. Retorna os perfis."""
+    rng = random.Random(seed_value)
+    admin = db.insert("profiles", [{"email": "admin@bench.local", "role": "admin", "name": "Admin"}])[0]
+    employees = db.insert("profiles", [{"email": f"func{i}@bench.local", "role": "employee", "name": f"Func {i}"}
+                                       for i in range(n_employees)])
+    owners = [admin] + employees
+    clients = db.insert("clients", [{
+        "name": f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(LAST)}", "cpf": _cpf(rng),
+        "phone": f"119{rng.randint(10000000, 99999999)}", "address": f"Rua {rng.randint(1, 999)}",
+        "reference_contact": "Referência", "reputation": rng.choice(["BOM", "RUIM", "NEUTRO"]),
+        "owner_id": rng.choice(owners)["id"],
+    } for _ in range(n_clients)])
+    hoje = date.today()
+    loans = []
+    for _ in range(n_loans):
+        c = rng.choice(clients)
+        due = hoje + timedelta(days=rng.randint(-120, 60))
+        amount = float(rng.randrange(200, 10000, 50))
+        status = rng.choices(["pago", "pendente"], [1, 3])[0]
+        loans.append({
+            "client_id": c["id"], "original_amount": amount,
+            "remaining_amount": 0.0 if status == "pago" else amount * rng.choice([1, 0.8, 0.5]),
+            "interest_rate": rng.choice([10.0, 20.0, 30.0]), "due_date": str(due), "due_day": due.day,
+            "status": status, "owner_id": c["owner_id"],
+        })
+    loans = db.insert("loans", loans)
+    db.insert("payments", [{
+        "loan_id": l["id"], "amount": l["original_amount"] * l["interest_rate"] / 100, "payment_type": "JUROS",
+        "paid_at": str(date.fromisoformat(l["due_date"]) - timedelta(days=30)), "owner_id": l["owner_id"],
+    } for l in loans if rng.random() < 0.5])
+    db.insert("client_documents", [{
+        "client_id": c["id"], "file_name": "rg.jpg",
+        "file_url": f"https://fake.supabase.co/storage/v1/object/public/documents/{c['id']}/rg.jpg",
+    } for c in clients if rng.random() < 0.3])
+    return {"admin": admin, "employee": employees[0] if employees else admin}
+
+
+# --- Cenários: (rótulo, item do menu, ação antes do rerun ou None) ---
+def _search(text):
+    return lambda at: at.text_input[0].input(text)
+
+
+def _click(label):
+    return lambda at: next(b for b in at.button if b.label == label).click()
+
+
+def _open_first_client(view):
+    def act(at):
+        radios = [r for r in at.radio if str(r.key or "").startswith("view_")]
+        radios[0].set_value(view)
+    return act
+
+
+def _switch_first_client(first, then):
+    """Abre `first` no 1º cliente, roda, e troca para `then` (mede só a troca de aba)."""
+    def act(at):
+        _open_first_client(first)(at)
+        at.run()
+        _open_first_client(then)(at)
+    return act
+
+
+def _next_page(at):
+    next(b for b in at.button if b.key and b.key.startswith("_pgnext_")).click()
+
+
+SCENARIOS = [
+    ("Painel Financeiro", "Painel Financeiro", None),
+    ("Painel · busca cliente 'maria'", "Painel Financeiro", lambda at: at.text_input(key="_painel_busca").input("maria")),
+    ("Painel · próxima página", "Painel Financeiro", _next_page),
+    ("Baixa de Pagamentos", "Baixa de Pagamentos", None),
+    ("Baixa · busca 'maria'", "Baixa de Pagamentos", _search("maria")),
+    ("Novo Contrato", "Novo Contrato", None),
+    ("Novo Contrato · busca 'silva'", "Novo Contrato", _search("silva")),
+    ("Cadastrar Cliente", "Cadastrar Cliente", None),
+    ("Base de Clientes", "Base de Clientes", None),
+    ("Base · próxima página", "Base de Clientes", _next_page),
+    ("Base · contratos do 1º", "Base de Clientes", _open_first_client("💰 Contratos")),
+    ("Base · pagamentos do 1º", "Base de Clientes", _open_first_client("💸 Pagamentos")),
+    ("Base · contratos → pagamentos", "Base de Clientes", _switch_first_client("💰 Contratos", "💸 Pagamentos")),
+    ("Calculadora de Atraso", "Calculadora de Atraso", None),
+    ("Gerenciar Usuários", "Gerenciar Usuários", None),
+    ("Exportar Dados", "Exportar Dados", None),
+    ("Exportar · pagamentos CSV", "Exportar Dados", _click("📤 Gerar arquivo")),
+]
+
+
+def new_app(profile, timeout):
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.secrets["SUPABASE_URL"] = "https://fake.supabase.co"
+    at.secrets["SUPABASE_SERVICE_KEY"] = "service-key"
+    at.session_state["user"] = types.SimpleNamespace(id=profile["id"], email=profile["email"])
+    at.session_state["role"] = profile["role"]
+    at.session_state["name"] = profile["name"]
+    at.session_state["session"] = None
+    return at
+
+
+def prepare(profile, menu, action, timeout):
+    """AppTest logado, já na página `menu` e com a ação aplicada (falta só o run medido).
+    Sem ação, o run medido é a página aberta com o cache da sessão vazio."""
+    at = new_app(profile, timeout)
+    at.run()  # primeira página (Painel), fora da medição
+    at.sidebar.radio[0].set_value(menu)
+    if action:
+        at.run()
+        action(at)
+    else:
+        if "_query_cache" in at.session_state:
+            del at.session_state["_query_cache"]
+        # Índices de busca são do processo (core já foi importado pelo app.py no run acima)
+        sys.modules["core"]._client_indexes.clear()
+    return at
+
+
+def timed(db, at):
+    db.reset_counters()
+    t0 = time.perf_counter()
+    at.run()
+    return {"s": time.perf_counter() - t0, "db_s": db.elapsed, "queries": db.queries, "rows": db.rows_out}
+
+
+def peak_memory(at):
+    """Pico de memória alocada pelo Python durante um run (MB). O tracemalloc
+    deixa o Python bem mais lento, por isso fica fora da medição de tempo."""
+    tracemalloc.start()
+    try:
+        at.run()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--loans", type=int, default=50000)
+    parser.add_argument("--role", choices=["admin", "employee"], default="admin")
+    parser.add_argument("--only", help="roda só os cenários cujo rótulo contém este texto")
+    parser.add_argument("--timeout", type=float, default=120, help="limite por execução do script (s)")
+    args = parser.parse_args()
+
+    db = FakeDB()
+    t0 = time.perf_counter()
+    profiles = seed(db, args.clients, args.loans)
+    print(f"Seed: {args.clients} clientes, {args.loans} contratos, {len(db.tables['payments'])} pagamentos "
+          f"em {time.perf_counter() - t0:.1f}s | perfil: {args.role}\n")
+
+    client = FakeSupabase(db)
+    # O app importa create_client do pacote supabase; sem o pacote instalado, um módulo mínimo basta
+    module = sys.modules.get("supabase")
+    if module is None:
+        try:
+            import supabase as module
+        except ImportError:
+            module = sys.modules["supabase"] = types.ModuleType("supabase")
+            module.Client = FakeSupabase
+            module.create_client = None
+
+    logging.disable(logging.WARNING)  # avisos de contexto/deprecação do Streamlit poluem a tabela
+    failures = []
+    header = (f"{'cenário':32} {'fria (s)':>9} {'banco (s)':>9} {'queries':>8} {'linhas':>8} {'pico MB':>8} | "
+              f"{'quente (s)':>10} {'queries':>8}")
+    print(header)
+    print("-" * len(header))
+    with mock.patch.object(module, "create_client", lambda *a, **k: client, create=True):
+        for label, menu, action in SCENARIOS:
+            if args.only and args.only.lower() not in label.lower():
+                continue
+            if menu in views.ADMIN_PAGES and args.role != "admin":
+                continue
+            profile = profiles[args.role]
+            at = prepare(profile, menu, action, args.timeout)
+            cold = timed(db, at)
+            warm = timed(db, at)
+            errors = [str(e.value) for e in at.exception]
+            if errors:
+                failures.append((label, errors))
+            peak = peak_memory(prepare(profile, menu, action, args.timeout))
+            print(f"{label:32} {cold['s']:9.3f} {cold['db_s']:9.3f} {cold['queries']:8d} {cold['rows']:8d} {peak:8.1f} | "
+                  f"{warm['s']:10.3f} {warm['queries']:8d}{'  ERRO' if errors else ''}")
+
+    for label, errors in failures:
+        print(f"\n[{label}]\n" + "\n".join(errors))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark e conferência da reconciliação de vencimentos (reconcile_due_dates.py).
+
+1. Casos conhecidos: monta contratos e pagamentos no fake_supabase, roda
+   scan → reconcile → apply_diffs e confere o due_date/status gravados —
+   inclusive o contrato cujo pagamento atrasado já foi aplicado por
+   register_payment (não pode avançar de novo) e âncoras de fim de mês.
+2. Tempo: reconcile() sobre uma carteira sintética de --loans contratos.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_reconcile --loans 200000
+
+Sai com código 1 se algum caso divergir ou o cálculo passar de --budget segundos.
+"""
+import argparse
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_supabase import FakeDB, FakeSupabase
+from reconcile_due_dates import apply_diffs, reconcile, scan
+
+# Data em que register_payment (migration_v7) passou a avançar o vencimento
+REGISTERED_BEFORE = date(2025, 3, 1)
+
+# (descrição, contrato, pagamentos [(tipo, paid_at, registrado em)], hoje, esperado (due_date, status, due_day))
+CASES = [
+    ("pagamento atrasado já aplicado por register_payment",
+     {"status": "atrasado", "due_date": "2026-02-10", "due_day": 10, "remaining_amount": 1000},
+     [("JUROS", "2026-02-15", "2026-02-15")], date(2026, 2, 20), ("2026-02-10", "atrasado", 10)),
+    ("juros antigo sem avanço (migration_v3)",
+     {"status": "atrasado", "due_date": "2025-01-10", "due_day": 10, "remaining_amount": 1000},
+     [("JUROS", "2025-01-12", "2025-01-12")], date(2025, 1, 20), ("2025-02-10", "pendente", 10)),
+    ("avança um mês só e continua atrasado",
+     {"status": "atrasado", "due_date": "2024-12-10", "due_day": 10, "remaining_amount": 1000},
+     [("JUROS", "2024-11-01", "2024-11-01"), ("AMORTIZACAO", "2024-12-15", "2024-12-15")],
+     date(2025, 2, 20), ("2025-01-10", "atrasado", 10)),
+    ("âncora 31 em fevereiro",
+     {"status": "atrasado", "due_date": "2024-01-31", "due_day": 31, "remaining_amount": 1000},
+     [("JUROS", "2024-02-01", "2024-02-01")], date(2024, 2, 5), ("2024-02-29", "pendente", 31)),
+    ("pendente não entra no predicado",
+     {"status": "pendente", "due_date": "2025-01-10", "due_day": 10, "remaining_amount": 1000},
+     [("JUROS", "2025-01-10", "2025-01-10")], date(2025, 1, 5), ("2025-01-10", "pendente", 10)),
+    ("pagamento anterior ao vencimento",
+     {"status": "atrasado", "due_date": "2025-01-10", "due_day": 10, "remaining_amount": 1000},
+     [("JUROS", "2025-01-09", "2025-01-09")], date(2025, 1, 20), ("2025-01-10", "atrasado", 10)),
+    ("saldo quitado",
+     {"status": "atrasado", "due_date": "2025-01-10", "due_day": 10, "remaining_amount": 0.3},
+     [("JUROS", "2025-01-12", "2025-01-12")], date(2025, 1, 20), ("2025-01-10", "atrasado", 10)),
+    ("quitação não conta como juros",
+     {"status": "atrasado", "due_date": "2025-01-10", "due_day": 10, "remaining_amount": 1000},
+     [("QUITACAO", "2025-01-12", "2025-01-12")], date(2025, 1, 20), ("2025-01-10", "atrasado", 10)),
+    ("due_day vazio é preenchido sem mexer no resto",
+     {"status": "pendente", "due_date": "2025-03-15", "due_day": None, "remaining_amount": 1000},
+     [], date(2025, 3, 1), ("2025-03-15", "pendente", 15)),
+]
+
+
+def check_cases():
+    """Roda cada caso no fake_supabase. Retorna a lista de divergências."""
+    errors = []
+    for label, loan, payments, today, expected in CASES:
+        db = FakeDB()
+        owner = db.insert("profiles", [{"email": "func@bench.local", "role": "employee"}])[0]["id"]
+        client_id = db.insert("clients", [{"name": "C", "cpf": "1", "owner_id": owner}])[0]["id"]
+        row = db.insert("loans", [{"client_id": client_id, "owner_id": owner, "original_amount": 1000,
+                                   "interest_rate": 10, **loan}])[0]
+        db.insert("payments", [{"loan_id": row["id"], "owner_id": owner, "amount": 100, "payment_type": kind,
+                                "paid_at": paid_at, "created_at": f"{created}T12:00:00+00:00"}
+                               for kind, paid_at, created in payments])
+        client = FakeSupabase(db)
+        diffs = reconcile(*scan(client, 100, REGISTERED_BEFORE), today)
+        if not diffs.empty:
+            apply_diffs(client, diffs)
+        got = next(l for l in db.tables["loans"] if l["id"] == row["id"])
+        got = (str(got["due_date"]), got["status"], got["due_day"])
+        mark = "ok" if got == expected else "DIVERGENTE"
+        print(f"  {label:52} {loan['due_date']} {loan['status']:8} → {got[0]} {got[1]:8} {mark}")
+        if got != expected:
+            errors.append(f"{label}: esperado {expected}, gravado {got}")
+    return errors
+
+
+def synthetic(n, seed_value=42):
+    rng = np.random.default_rng(seed_value)
+    due = np.datetime64(date.today(), "D") + rng.integers(-400, 60, n)
+    day = (due - due.astype("datetime64[M]").astype("datetime64[D]")).astype(int) + 1
+    loans = pd.DataFrame({
+        "id": np.arange(n).astype(str),
+        "status": rng.choice(["pendente", "atrasado", "pago"], n),
+        "due_date": due.astype(str),
+        "due_day": np.where(rng.random(n) < 0.05, None, day).astype(object),
+        "remaining_amount": rng.integers(0, 200, n) * 50.0,
+    })
+    n_pay = 3 * n
+    payments = pd.DataFrame({
+        "id": np.arange(n_pay).astype(str),
+        "loan_id": rng.integers(0, n, n_pay).astype(str),
+        "paid_at": (np.datetime64(date.today(), "D") - rng.integers(0, 500, n_pay)).astype(str),
+    })
+    return loans, payments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loans", type=int, default=200000)
+    parser.add_argument("--budget", type=float, default=3.0, help="tempo máximo do cálculo (s)")
+    args = parser.parse_args()
+
+    print("Casos conhecidos (fake_supabase, scan → reconcile → apply_diffs):")
+    errors = check_cases()
+
+    loans, payments = synthetic(args.loans)
+    t0 = time.perf_counter()
+    diffs = reconcile(loans, payments, date.today())
+    elapsed = time.perf_counter() - t0
+    print(f"\nreconcile: {len(loans)} contratos, {len(payments)} pagamentos em {elapsed * 1000:.0f} ms "
+          f"| {len(diffs)} com diferença, {int(diffs['months'].sum())} avançados")
+
+    for e in errors:
+        print(f"ERRO: {e}")
+    if errors or elapsed > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
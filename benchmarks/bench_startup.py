@@ -0,0 +1,117 @@
+"""
+Benchmark de partida a frio do app.py: para cada página (e a tela de login)
+sobe um processo Python novo, importa o core.py e renderiza a página pela
+primeira vez com o AppTest sobre o fake_supabase. Mostra o tempo de import
+do core, da primeira renderização (inclui importar views/<página> e o que
+ela usa), de um rerun logo depois e quais módulos pesados foram carregados.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --only painel --repeat 3
+
+Sai com código 1 se alguma página levantar exceção.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ["pandas", "numpy", "altair", "PIL"]
+
+
+def child(page, role, clients, loans):
+    """Roda dentro do processo novo; imprime uma linha JSON com as medidas."""
+    import importlib
+    import logging
+    from unittest import mock
+
+    from benchmarks.bench_pages import new_app, seed
+    from benchmarks.fake_supabase import FakeDB, FakeSupabase
+    import supabase
+
+    db = FakeDB()
+    profiles = seed(db, clients, loans)
+    logging.disable(logging.WARNING)
+    before = {m for m in HEAVY_MODULES if m in sys.modules}
+
+    # O core importa create_client ao ser carregado: o patch precisa vir antes
+    with mock.patch.object(supabase, "create_client", lambda *a, **k: FakeSupabase(db)):
+        t0 = time.perf_counter()
+        importlib.import_module("core")
+        core_s = time.perf_counter() - t0
+
+        at = new_app(profiles[role], 120)
+        if page == "Login":
+            del at.session_state["user"]
+        else:
+            at.session_state["_menu"] = page
+        t0 = time.perf_counter()
+        at.run()
+        first_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        at.run()
+        rerun_s = time.perf_counter() - t0
+
+    print(json.dumps({
+        "core_s": core_s, "first_s": first_s, "rerun_s": rerun_s,
+        "heavy": [m for m in HEAVY_MODULES if m in sys.modules and m not in before],
+        "errors": [str(e.value) for e in at.exception],
+    }))
+
+
+def run_child(page, args):
+    cmd = [sys.executable, "-m", "benchmarks.bench_startup", "--child", page, "--role", args.role,
+           "--clients", str(args.clients), "--loans", str(args.loans)]
+    t0 = time.perf_counter()
+    out = subprocess.run(cmd, capture_output=True, text=True)
+    total = time.perf_counter() - t0
+    lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if out.returncode or not lines:
+        return {"errors": [out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"código {out.returncode}"]}
+    result = json.loads(lines[-1])
+    result["process_s"] = total
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--loans", type=int, default=2000)
+    parser.add_argument("--role", choices=["admin", "employee"], default="admin")
+    parser.add_argument("--only", help="só as páginas cujo nome contém este texto")
+    parser.add_argument("--repeat", type=int, default=1, help="processos por página (mostra a mediana)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.role, args.clients, args.loans)
+        return
+
+    import views
+    pages = ["Login"] + views.menu_items(args.role == "admin")
+    header = (f"{'página':24} {'import core (ms)':>16} {'1ª render (ms)':>15} {'rerun (ms)':>11} "
+              f"{'processo (s)':>12}  módulos pesados")
+    print(header)
+    print("-" * len(header))
+    failures = []
+    for page in pages:
+        if args.only and args.only.lower() not in page.lower():
+            continue
+        runs = [run_child(page, args) for _ in range(args.repeat)]
+        if any(r["errors"] for r in runs):
+            failures.append((page, next(r["errors"] for r in runs if r["errors"])))
+            print(f"{page:24} ERRO")
+            continue
+        med = {k: sorted(r[k] for r in runs)[len(runs) // 2] for k in ("core_s", "first_s", "rerun_s", "process_s")}
+        print(f"{page:24} {med['core_s'] * 1000:16.0f} {med['first_s'] * 1000:15.0f} {med['rerun_s'] * 1000:11.0f} "
+              f"{med['process_s']:12.2f}  {', '.join(runs[0]['heavy']) or '-'}")
+
+    for page, errors in failures:
+        print(f"\n[{page}]\n" + "\n".join(errors))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
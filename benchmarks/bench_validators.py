@@ -0,0 +1,117 @@
+"""
+Micro-benchmark dos validadores de CPF/celular: laço escalar x versão vetorizada.
+Antes de medir, confere que as duas versões dão o mesmo resultado para
+todos os valores gerados (CPFs válidos, inválidos, formatados, repetidos...).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_validators -n 100000
+"""
+import argparse
+import random
+import re
+import time
+
+import pandas as pd
+
+from validators import check_cpfs, check_phones, validate_cpf, validate_phone
+
+
+# Implementações originais (uma string por vez), usadas como referência
+def ref_validate_phone(phone):
+    nums = re.sub(r'\D', '', phone)
+    return len(nums) == 11 and nums[2] == '9'
+
+
+def ref_validate_cpf(cpf):
+    cpf = re.sub(r'\D', '', cpf)
+    if len(cpf) != 11 or cpf == cpf[0] * 11: return False
+    sum_ = sum(int(cpf[i]) * (10 - i) for i in range(9))
+    d1 = (sum_ * 10 % 11); d1 = 0 if d1 == 10 else d1
+    if d1 != int(cpf[9]): return False
+    sum_ = sum(int(cpf[i]) * (11 - i) for i in range(10))
+    d2 = (sum_ * 10 % 11); d2 = 0 if d2 == 10 else d2
+    return d2 == int(cpf[10])
+
+
+def _valid_cpf(rng):
+    base = [rng.randint(0, 9) for _ in range(9)]
+    for w in (10, 11):
+        d = sum(x * (w - i) for i, x in enumerate(base)) * 10 % 11
+        base.append(0 if d == 10 else d)
+    return "".join(map(str, base))
+
+
+def gen_cpfs(n, rng):
+    out = []
+    for _ in range(n):
+        kind = rng.random()
+        cpf = _valid_cpf(rng)
+        if kind < 0.3:
+            cpf = f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+        elif kind < 0.5:
+            cpf = cpf[:10] + str((int(cpf[10]) + 1) % 10)
+        elif kind < 0.55:
+            cpf = str(rng.randint(0, 9)) * 11
+        elif kind < 0.65:
+            cpf = cpf[:rng.randint(0, 10)]
+        elif kind < 0.7:
+            cpf = cpf + str(rng.randint(0, 9))
+        elif kind < 0.72:
+            cpf = "abc" + cpf[:5]
+        out.append(cpf)
+    return out
+
+
+def gen_phones(n, rng):
+    out = []
+    for _ in range(n):
+        num = f"{rng.randint(11, 99)}{rng.choice('9999998')}{rng.randint(0, 99999999):08d}"
+        kind = rng.random()
+        if kind < 0.3:
+            num = f"({num[:2]}) {num[2:7]}-{num[7:]}"
+        elif kind < 0.4:
+            num = num[:rng.randint(0, 10)]
+        out.append(num)
+    return out
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=100_000, help="quantidade de valores gerados")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cpfs, phones = gen_cpfs(args.n, rng), gen_phones(args.n, rng)
+    cpf_s, phone_s = pd.Series(cpfs), pd.Series(phones)
+
+    # Equivalência: referência escalar x vetorizado x atalho escalar
+    ref_cpf = [ref_validate_cpf(c) for c in cpfs]
+    assert check_cpfs(cpf_s)[0].tolist() == ref_cpf, "CPF: vetorizado diverge da referência"
+    sample = range(0, args.n, max(1, args.n // 2000))
+    assert all(validate_cpf(cpfs[i]) == ref_cpf[i] for i in sample), "CPF: atalho escalar diverge"
+    ref_phone = [ref_validate_phone(p) for p in phones]
+    assert check_phones(phone_s)[0].tolist() == ref_phone, "Celular: vetorizado diverge da referência"
+    assert all(validate_phone(phones[i]) == ref_phone[i] for i in sample), "Celular: atalho escalar diverge"
+    print(f"Equivalência OK ({args.n} CPFs, {sum(ref_cpf)} válidos; {args.n} celulares, {sum(ref_phone)} válidos)")
+
+    rows = []
+    for label, scalar, vector in (
+        ("CPF", lambda: [ref_validate_cpf(c) for c in cpfs], lambda: check_cpfs(cpf_s)),
+        ("Celular", lambda: [ref_validate_phone(p) for p in phones], lambda: check_phones(phone_s)),
+    ):
+        _, t_loop = timed(scalar)
+        _, t_vec = timed(vector)
+        rows.append({"Validador": label, "Laço (s)": round(t_loop, 4), "Vetorizado (s)": round(t_vec, 4),
+                     "Ganho": f"{t_loop / t_vec:.1f}x"})
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
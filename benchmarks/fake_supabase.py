@@ -0,0 +1,588 @@
+"""
+Substituto em memória do client `supabase` para os benchmarks: tabelas,
+filtros do PostgREST (eq/neq/gt/gte/lt/lte/in_/ilike/or_ com and aninhado),
+order/limit, insert/upsert/update/delete, joins embutidos como
+`clients(name, cpf)` e `profiles!owner_id(email)`, as funções RPC das
+migrations, storage e auth. Conta cada round trip em `FakeDB.calls`.
+
+Não é um banco: cada query percorre a tabela inteira. O objetivo é medir o
+custo do lado do app (nº de queries, linhas trafegadas, tempo de Python).
+"""
+import copy
+import re
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from duedates import next_due_date
+
+# Validade do access token das sessões falsas (o padrão do Supabase é 1 hora)
+SESSION_SECONDS = 3600
+
+# Chaves estrangeiras (tabela, tabela referenciada) -> coluna; usadas nos joins embutidos
+FOREIGN_KEYS = {
+    ("clients", "profiles"): "owner_id",
+    ("client_documents", "clients"): "client_id",
+    ("loans", "clients"): "client_id",
+    ("loans", "profiles"): "owner_id",
+    ("payments", "loans"): "loan_id",
+    ("payments", "profiles"): "owner_id",
+    ("notification_logs", "loans"): "loan_id",
+}
+
+# Defaults das colunas (db_setup.sql e migrations)
+DEFAULTS = {
+    "profiles": {"role": "employee", "name": None},
+    "clients": {"reputation": "NEUTRO", "rg": None, "email": None, "reference_contact": None},
+    "client_documents": {"thumb_url": None},
+    "loans": {"status": "pendente", "due_day": None},
+    "payments": {"proof_url": None},
+    "notification_logs": {"status": "success"},
+    "notification_outbox": {"status": "pending", "attempts": 0, "claimed_at": None, "claimed_by": None,
+                            "sent_at": None, "last_error": None, "expires_at": None},
+}
+# Colunas com default now() além de created_at
+NOW_DEFAULTS = {"notification_logs": ("sent_at",), "notification_outbox": ("available_at",)}
+
+
+class APIError(Exception):
+    """Erro devolvido pelo PostgREST (mesmo papel de postgrest.exceptions.APIError)."""
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _coerce(row_value, value):
+    """Converte o valor do filtro (texto na URL do PostgREST) para o tipo da coluna."""
+    if isinstance(row_value, bool):
+        return str(value).lower() in ("true", "t", "1")
+    if isinstance(row_value, (int, float)) and not isinstance(value, (int, float)):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+    if isinstance(row_value, str) and not isinstance(value, str) and value is not None:
+        return str(value)
+    return value
+
+
+def _compare(op, row_value, value):
+    if op == "is":
+        return row_value is None if str(value).lower() == "null" else row_value == _coerce(row_value, value)
+    if row_value is None:
+        return False
+    if op == "in":
+        return any(row_value == _coerce(row_value, v) for v in value)
+    if op in ("like", "ilike"):
+        flags = re.IGNORECASE if op == "ilike" else 0
+        pattern = "".join(".*" if ch in "%*" else "." if ch == "_" else re.escape(ch) for ch in str(value))
+        return re.fullmatch(pattern, str(row_value), flags | re.DOTALL) is not None
+    value = _coerce(row_value, value)
+    if op == "eq": return row_value == value
+    if op == "neq": return row_value != value
+    if op == "gt": return row_value > value
+    if op == "gte": return row_value >= value
+    if op == "lt": return row_value < value
+    if op == "lte": return row_value <= value
+    raise APIError(f"operador não suportado: {op}")
+
+
+# --- Filtros lógicos or_/and() ---
+def _split_top(text, sep=","):
+    """Divide no separador fora de parênteses e de aspas."""
+    parts, depth, quoted, escaped, cur = [], 0, False, False, []
+    for ch in text:
+        if escaped:
+            cur.append(ch); escaped = False; continue
+        if ch == "\\" and quoted:
+            cur.append(ch); escaped = True; continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == sep:
+            parts.append("".join(cur)); cur = []; continue
+        cur.append(ch)
+    parts.append("".join(cur))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+
+def _parse_logic(text, combine):
+    """Transforma 'a.eq.1,and(b.gt.2,c.lt.3)' num predicado sobre a linha."""
+    preds = []
+    for term in _split_top(text):
+        m = re.fullmatch(r'(and|or)\((.*)\)', term, re.DOTALL)
+        if m:
+            preds.append(_parse_logic(m.group(2), all if m.group(1) == "and" else any))
+            continue
+        col, op, value = term.split(".", 2)
+        negate = op == "not"
+        if negate:
+            op, value = value.split(".", 1)
+        if op == "in":
+            value = [_unquote(v) for v in _split_top(value.strip("()"))]
+        else:
+            value = _unquote(value)
+        preds.append(lambda row, c=col, o=op, v=value, n=negate: _compare(o, row.get(c), v) != n)
+    return lambda row: combine(p(row) for p in preds)
+
+
+# --- select com joins embutidos ---
+def _parse_select(columns):
+    """'*, clients(name, cpf)' -> (colunas, [(alias, tabela, fk, sub-select)])"""
+    cols, embeds = [], []
+    for item in _split_top(columns or "*"):
+        m = re.fullmatch(r'(?:(\w+):)?(\w+)(?:!(\w+))?\((.*)\)', item, re.DOTALL)
+        if m:
+            alias, target, hint, sub = m.groups()
+            embeds.append((alias or target, target, hint, sub))
+        else:
+            cols.append(item)
+    return cols, embeds
+
+
+class Response(SimpleNamespace):
+    """Mesma forma do APIResponse: .data e .count."""
+
+
+class FakeDB:
+    """Tabelas em memória e o contador de round trips."""
+
+    def __init__(self):
+        self.tables = defaultdict(list)
+        self.storage = defaultdict(dict)
+        self.markers = {}
+        self.calls = Counter()   # (tipo, alvo) -> nº de chamadas
+        self.rows_out = 0        # linhas devolvidas ao app
+        self.elapsed = 0.0       # segundos gastos dentro do fake (descontar do tempo do app)
+        self._ids = {}           # tabela -> {id: linha}, refeito após insert/delete
+
+    def record(self, kind, target, rows=0, started=None):
+        self.calls[(kind, target)] += 1
+        self.rows_out += rows
+        if started is not None:
+            self.elapsed += time.perf_counter() - started
+
+    @property
+    def queries(self):
+        return sum(n for (kind, _), n in self.calls.items() if kind != "storage")
+
+    def reset_counters(self):
+        self.calls.clear()
+        self.rows_out = 0
+        self.elapsed = 0.0
+
+    def by_id(self, table):
+        if table not in self._ids:
+            self._ids[table] = {r["id"]: r for r in self.tables[table]}
+        return self._ids[table]
+
+    def insert(self, table, rows):
+        """Insere sem contar round trip (seed). Retorna as linhas com defaults."""
+        out = []
+        for row in rows:
+            full = {"id": str(uuid.uuid4()), "created_at": _now(), **DEFAULTS.get(table, {}), **row}
+            for col in NOW_DEFAULTS.get(table, ()):
+                full.setdefault(col, _now())
+            self.tables[table].append(full)
+            out.append(full)
+        self._ids.pop(table, None)
+        return out
+
+    def _embed(self, table, row, target, hint, sub):
+        cols, embeds = _parse_select(sub)
+        fk = hint or FOREIGN_KEYS.get((table, target))
+        if fk and fk in row:  # muitos-para-um: objeto (ou None)
+            ref = self.by_id(target).get(row[fk])
+            return self._project(target, ref, cols, embeds) if ref else None
+        back = hint or FOREIGN_KEYS.get((target, table))
+        if back:              # um-para-muitos: lista
+            return [self._project(target, r, cols, embeds) for r in self.tables[target] if r.get(back) == row["id"]]
+        raise APIError(f"sem relacionamento entre {table} e {target}")
+
+    def _project(self, table, row, cols, embeds):
+        out = dict(row) if "*" in cols else {c: row.get(c) for c in cols}
+        for alias, target, hint, sub in embeds:
+            out[alias] = self._embed(table, row, target, hint, sub)
+        return out
+
+
+class Query:
+    """Builder no estilo do postgrest-py; cada execute() é um round trip."""
+
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.op, self.payload, self.columns, self.count = "select", None, "*", None
+        self.filters, self.orders, self._limit, self._offset = [], [], None, 0
+        self.on_conflict, self.ignore_duplicates = None, False
+
+    # Operações
+    def select(self, columns="*", count=None):
+        self.op, self.columns, self.count = "select", columns, count
+        return self
+
+    def insert(self, rows, **_):
+        self.op, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False, **_):
+        self.op, self.payload = "upsert", rows
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, values, **_):
+        self.op, self.payload = "update", values
+        return self
+
+    def delete(self, **_):
+        self.op = "delete"
+        return self
+
+    # Filtros
+    def _filter(self, op, column, value):
+        self.filters.append(lambda row: _compare(op, row.get(column), value))
+        return self
+
+    def eq(self, column, value): return self._filter("eq", column, value)
+    def neq(self, column, value): return self._filter("neq", column, value)
+    def gt(self, column, value): return self._filter("gt", column, value)
+    def gte(self, column, value): return self._filter("gte", column, value)
+    def lt(self, column, value): return self._filter("lt", column, value)
+    def lte(self, column, value): return self._filter("lte", column, value)
+    def like(self, column, pattern): return self._filter("like", column, pattern)
+    def ilike(self, column, pattern): return self._filter("ilike", column, pattern)
+    def is_(self, column, value): return self._filter("is", column, value)
+    def in_(self, column, values):
+        wanted = {str(v) for v in values}  # conjunto: filtros in_ com centenas de ids
+        self.filters.append(lambda row: row.get(column) is not None and str(row.get(column)) in wanted)
+        return self
+
+    def or_(self, filters, **_):
+        self.filters.append(_parse_logic(filters, any))
+        return self
+
+    # Ordem e paginação
+    def order(self, column, desc=False, nullsfirst=False, **_):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size, **_):
+        self._limit = size
+        return self
+
+    def range(self, start, end, **_):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def _matches(self):
+        return [r for r in self.db.tables[self.table] if all(f(r) for f in self.filters)]
+
+    def execute(self):
+        started = time.perf_counter()
+        data, count = getattr(self, f"_run_{self.op}")()
+        data = copy.deepcopy(data)
+        self.db.record(self.op, self.table, len(data), started)
+        return Response(data=data, count=count)
+
+    def _run_select(self):
+        rows = self._matches()
+        for column, desc in reversed(self.orders):
+            # Nulos por último na ordem ascendente (padrão do Postgres)
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column) if r.get(column) is not None else 0), reverse=desc)
+        count = len(rows) if self.count else None
+        end = None if self._limit is None else self._offset + self._limit
+        rows = rows[self._offset:end]
+        cols, embeds = _parse_select(self.columns)
+        return [self.db._project(self.table, r, cols, embeds) for r in rows], count
+
+    def _rows(self):
+        return self.payload if isinstance(self.payload, list) else [self.payload]
+
+    def _run_insert(self):
+        return self.db.insert(self.table, self._rows()), None
+
+    def _run_upsert(self):
+        keys = (self.on_conflict or "id").split(",")
+        out = []
+        for row in self._rows():
+            existing = next((r for r in self.db.tables[self.table] if all(r.get(k) == row.get(k) for k in keys)), None)
+            if existing is None:
+                out.extend(self.db.insert(self.table, [row]))
+            elif not self.ignore_duplicates:
+                existing.update(row)
+                out.append(existing)
+        return out, None
+
+    def _run_update(self):
+        rows = self._matches()
+        for r in rows:
+            r.update(self.payload)
+        return rows, None
+
+    def _run_delete(self):
+        rows = self._matches()
+        ids = {id(r) for r in rows}
+        self.db.tables[self.table] = [r for r in self.db.tables[self.table] if id(r) not in ids]
+        self.db._ids.pop(self.table, None)
+        return rows, None
+
+
+# --- RPC (versões em Python das funções das migrations) ---
+def _rpc_promote_overdue_loans(db, p_min_interval=None):
+    today = str(date.today())
+    if db.markers.get("promote_overdue_loans") == today:
+        return -1
+    db.markers["promote_overdue_loans"] = today
+    rows = [l for l in db.tables["loans"] if l["status"] == "pendente" and l["due_date"] < today]
+    for l in rows:
+        l["status"] = "atrasado"
+    return len(rows)
+
+
+def _rpc_dashboard_summary(db, p_owner_id=None, p_start=None, p_end=None, p_client_ids=None):
+    roles = {p["id"]: p.get("role") for p in db.tables["profiles"]}
+    ids = set(p_client_ids) if p_client_ids else None
+    groups = {}
+    for l in db.tables["loans"]:
+        if p_owner_id and l["owner_id"] != p_owner_id: continue
+        if p_start and l["due_date"] < p_start: continue
+        if p_end and l["due_date"] > p_end: continue
+        if ids is not None and l["client_id"] not in ids: continue
+        g = groups.setdefault(l["status"], {"status": l["status"], "contratos": 0, "total_emprestado": 0.0,
+                                            "saldo_devedor": 0.0, "juros_previstos": 0.0, "comissao_funcionarios": 0.0})
+        g["contratos"] += 1
+        g["total_emprestado"] += l["original_amount"]
+        g["saldo_devedor"] += l["remaining_amount"]
+        g["juros_previstos"] += l["original_amount"] * l["interest_rate"] / 100
+        if roles.get(l["owner_id"]) == "employee":
+            g["comissao_funcionarios"] += l["original_amount"] * 0.10
+    return list(groups.values())
+
+
+def _rpc_open_loans_by_month(db, p_owner_id=None):
+    groups = {}
+    for l in db.tables["loans"]:
+        if l["status"] == "pago" or (p_owner_id and l["owner_id"] != p_owner_id): continue
+        key = (l["owner_id"], str(l["due_date"])[:7] + "-01", l["interest_rate"])
+        g = groups.setdefault(key, {"owner_id": key[0], "due_date": key[1], "interest_rate": key[2],
+                                    "contratos": 0, "original_amount": 0.0, "remaining_amount": 0.0})
+        g["contratos"] += 1
+        g["original_amount"] += l["original_amount"]
+        g["remaining_amount"] += l["remaining_amount"]
+    return list(groups.values())
+
+
+def _rpc_register_payment(db, p_loan_id, p_amount, p_payment_type, p_paid_at, p_owner_id, p_proof_url=None):
+    l = next((r for r in db.tables["loans"] if r["id"] == p_loan_id), None)
+    if l is None: raise APIError(f"Contrato {p_loan_id} não encontrado")
+    if l["status"] == "pago": raise APIError(f"Contrato {p_loan_id} já está quitado")
+    juros = l["original_amount"] * l["interest_rate"] / 100
+    saldo = {"JUROS": l["remaining_amount"], "AMORTIZACAO": l["remaining_amount"] - (p_amount - juros), "QUITACAO": 0}.get(p_payment_type)
+    if saldo is None: raise APIError(f"Tipo de pagamento inválido: {p_payment_type}")
+    for c in db.tables["clients"]:
+        if c["id"] == l["client_id"]:
+            c["reputation"] = "BOM" if p_paid_at <= l["due_date"] else "RUIM"
+    db.insert("payments", [{"loan_id": l["id"], "amount": p_amount, "payment_type": p_payment_type,
+                            "paid_at": p_paid_at, "owner_id": p_owner_id, "proof_url": p_proof_url}])
+    due = date.fromisoformat(l["due_date"])
+    l.update(remaining_amount=saldo, status="pago" if saldo <= 0.5 else "pendente",
+             due_date=str(next_due_date(l.get("due_day") or due.day, due)) if saldo > 0.5 else l["due_date"])
+    return dict(l)
+
+
+def _rpc_claim_notifications(db, p_worker, p_limit=20, p_lease="5 minutes"):
+    now = datetime.now(timezone.utc)
+    stale = (now - timedelta(minutes=int(str(p_lease).split()[0]))).isoformat()
+    def expired(r):
+        return bool(r["expires_at"]) and datetime.fromisoformat(r["expires_at"]) <= now
+
+    for r in db.tables["notification_outbox"]:
+        if expired(r) and (r["status"] == "pending" or (r["status"] == "sending" and r["claimed_at"] < stale)):
+            r.update(status="failed", last_error="expirada")
+    queue = sorted((r for r in db.tables["notification_outbox"]
+                    if ((r["status"] == "pending" and r["available_at"] <= now.isoformat())
+                        or (r["status"] == "sending" and r["claimed_at"] < stale))
+                    and not expired(r)),
+                   key=lambda r: (r["available_at"], r["created_at"]))
+    batch = queue[:p_limit]
+    for r in batch:
+        r.update(status="sending", claimed_at=now.isoformat(), claimed_by=p_worker, attempts=r["attempts"] + 1)
+    return [dict(r) for r in batch]
+
+
+def _rpc_complete_notifications(db, p_sent, p_failed=(), p_error=None, p_max_attempts=5):
+    sent, failed = set(p_sent or ()), set(p_failed or ())
+    logs = []
+    for r in db.tables["notification_outbox"]:
+        if r["status"] != "sending" or r["id"] not in sent | failed:
+            continue
+        if r["id"] in sent:
+            r.update(status="sent", sent_at=_now(), last_error=None)
+        else:
+            delay = timedelta(minutes=2 ** (r["attempts"] - 1))
+            r.update(status="failed" if r["attempts"] >= p_max_attempts else "pending",
+                     available_at=(datetime.now(timezone.utc) + delay).isoformat(), last_error=p_error)
+        if r["kind"] == "cobranca" and r["loan_id"] and r["status"] in ("sent", "failed"):
+            logs.append({"loan_id": r["loan_id"], "status": "success" if r["status"] == "sent" else "error"})
+    if logs:
+        db.insert("notification_logs", logs)
+    return None
+
+
+def _rpc_take_portfolio_snapshot(db, p_date=None, p_overwrite=False):
+    # Sempre a partir do estado atual: o fake não reconstrói datas passadas (backfill)
+    day = p_date or str(date.today())
+    if day < str(date.today()) and not p_overwrite and any(
+            r["snapshot_date"] == day and not r["approximate"] for r in db.tables["portfolio_snapshots"]):
+        return -1
+    roles = {p["id"]: p.get("role") for p in db.tables["profiles"]}
+    db.tables["portfolio_snapshots"] = [r for r in db.tables["portfolio_snapshots"] if r["snapshot_date"] != day]
+    groups = {}
+    for l in db.tables["loans"]:
+        g = groups.setdefault((l["owner_id"], l["status"]), {
+            "snapshot_date": day, "owner_id": l["owner_id"], "status": l["status"], "contratos": 0,
+            "total_emprestado": 0.0, "saldo_devedor": 0.0, "juros_previstos": 0.0, "comissao_funcionarios": 0.0,
+            "approximate": day < str(date.today())})
+        g["contratos"] += 1
+        g["total_emprestado"] += l["original_amount"]
+        g["saldo_devedor"] += l["remaining_amount"]
+        g["juros_previstos"] += l["original_amount"] * l["interest_rate"] / 100
+        if roles.get(l["owner_id"]) == "employee":
+            g["comissao_funcionarios"] += l["original_amount"] * 0.10
+    db.insert("portfolio_snapshots", list(groups.values()))
+    return len(groups)
+
+
+RPCS = {
+    "promote_overdue_loans": _rpc_promote_overdue_loans,
+    "dashboard_summary": _rpc_dashboard_summary,
+    "open_loans_by_month": _rpc_open_loans_by_month,
+    "register_payment": _rpc_register_payment,
+    "claim_notifications": _rpc_claim_notifications,
+    "complete_notifications": _rpc_complete_notifications,
+    "take_portfolio_snapshot": _rpc_take_portfolio_snapshot,
+}
+
+
+class RPCCall:
+    def __init__(self, db, name, params):
+        self.db, self.name, self.params = db, name, params or {}
+
+    def execute(self):
+        fn = RPCS.get(self.name)
+        if fn is None:
+            raise APIError(f"Could not find the function public.{self.name}")
+        started = time.perf_counter()
+        data = copy.deepcopy(fn(self.db, **self.params))
+        self.db.record("rpc", self.name, len(data) if isinstance(data, list) else 1, started)
+        return Response(data=data, count=None)
+
+
+# --- Storage e auth ---
+class FakeBucket:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    def upload(self, path, file, file_options=None):
+        data = open(file, "rb").read() if isinstance(file, str) else bytes(file)
+        self.db.storage[self.name][path] = data
+        self.db.record("storage", "upload")
+        return SimpleNamespace(path=path)
+
+    def get_public_url(self, path, options=None):
+        return f"https://fake.supabase.co/storage/v1/object/public/{self.name}/{path}"
+
+    def remove(self, paths):
+        for p in paths:
+            self.db.storage[self.name].pop(p, None)
+        self.db.record("storage", "remove")
+        return []
+
+
+class FakeStorage:
+    def __init__(self, db):
+        self.db = db
+
+    def from_(self, bucket):
+        return FakeBucket(self.db, bucket)
+
+
+class FakeAdmin:
+    def __init__(self, db):
+        self.db = db
+
+    def create_user(self, attrs):
+        self.db.record("auth", "create_user")
+        if any(p["email"] == attrs["email"] for p in self.db.tables["profiles"]):
+            raise APIError("User already registered")
+        prof = self.db.insert("profiles", [{"email": attrs["email"], "password": attrs.get("password")}])[0]
+        return SimpleNamespace(user=SimpleNamespace(id=prof["id"], email=prof["email"]))
+
+    def delete_user(self, user_id):
+        self.db.record("auth", "delete_user")
+        self.db.tables["profiles"] = [p for p in self.db.tables["profiles"] if p["id"] != user_id]
+        self.db._ids.pop("profiles", None)
+
+
+class FakeAuth:
+    def __init__(self, db):
+        self.db = db
+        self.admin = FakeAdmin(db)
+        self.user = None
+
+    def sign_in_with_password(self, credentials):
+        self.db.record("auth", "sign_in")
+        prof = next((p for p in self.db.tables["profiles"] if p["email"] == credentials["email"]
+                     and p.get("password", credentials["password"]) == credentials["password"]), None)
+        if prof is None:
+            raise APIError("Invalid login credentials")
+        self.user = SimpleNamespace(id=prof["id"], email=prof["email"])
+        return SimpleNamespace(user=self.user, session=self._session(prof["id"]))
+
+    def _session(self, user_id):
+        return SimpleNamespace(access_token=f"at-{user_id}", refresh_token=f"rt-{user_id}", user=self.user,
+                               expires_at=int(time.time()) + SESSION_SECONDS)
+
+    def refresh_session(self, refresh_token=None):
+        self.db.record("auth", "refresh_session")
+        if self.user is None:
+            raise APIError("Invalid Refresh Token")
+        return SimpleNamespace(user=self.user, session=self._session(self.user.id))
+
+    def set_session(self, access_token, refresh_token):
+        self.db.record("auth", "set_session")
+
+    def sign_out(self):
+        self.user = None
+
+    def update_user(self, attrs):
+        self.db.record("auth", "update_user")
+        return SimpleNamespace(user=self.user)
+
+
+class FakeSupabase:
+    """Client com a mesma interface usada pelo app, o robô e os módulos auxiliares."""
+
+    def __init__(self, db):
+        self.db = db
+        self.storage = FakeStorage(db)
+        self.auth = FakeAuth(db)
+
+    def table(self, name):
+        return Query(self.db, name)
+
+    from_ = table
+
+    def rpc(self, name, params=None):
+        return RPCCall(self.db, name, params)
@@ -0,0 +1,84 @@
+"""
+Projeção de recebimentos da carteira por mês e por responsável (owner).
+
+Cada contrato em aberto paga juros (original_amount * interest_rate/100)
+todo mês, no dia âncora (ver duedates.py), até ser quitado. Contratos de
+funcionários geram comissão de 10% do saldo devedor (remaining_amount) a
+cada parcela — com saldo = valor original é a mesma conta do "Lucro
+Previsto" do painel (dashboard_summary), só que distribuída no tempo.
+Parcelas já vencidas e não pagas entram no mês atual.
+
+`project` aceita um contrato por linha ou grupos de contratos com a coluna
+`contratos` e os valores somados — o Painel usa os grupos por dono, mês de
+vencimento e taxa de open_loans_by_month (database/migration_v15.sql), que
+só soma colunas: a regra de juros/comissão fica toda aqui.
+
+Tudo é feito em arrays numpy (agenda contratos x meses), sem laço por contrato.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from duedates import add_months, anchor_days
+
+# Comissão mensal dos funcionários sobre o saldo devedor
+COMMISSION_RATE = 0.10
+# Colunas de loans que a projeção usa
+LOAN_COLUMNS = "id, owner_id, original_amount, remaining_amount, interest_rate, due_date, due_day"
+
+
+def schedule(loans: pd.DataFrame, months: int = 12, start: date = None):
+    """
+    Agenda de vencimentos dos próximos `months` meses a partir do mês de `start`.
+    Retorna (datas datetime64[D] contratos x meses, índice do mês 0..months-1,
+    máscara das parcelas dentro da janela).
+    """
+    start_month = np.datetime64(start or date.today(), "M")
+    due = pd.to_datetime(loans["due_date"]).to_numpy(dtype="datetime64[D]")
+    anchors = anchor_days(loans["due_day"], due)
+    # Primeira parcela na janela: a do vencimento atual ou, se já venceu, a do mês atual
+    skip = np.maximum(start_month - due.astype("datetime64[M]"), np.timedelta64(0, "M")).astype(np.int64)
+    k = np.arange(months)
+    dates = add_months(anchors[:, None], due[:, None], skip[:, None] + k)
+    month_idx = (dates.astype("datetime64[M]") - start_month).astype(np.int64)
+    return dates, month_idx, month_idx < months
+
+
+def project(loans, roles: dict = None, months: int = 12, start: date = None,
+            commission_rate: float = COMMISSION_RATE) -> pd.DataFrame:
+    """
+    Projeção mensal por owner: parcelas, juros, comissão e lucro (juros - comissão).
+    `loans` são os contratos em aberto (lista de dicts ou DataFrame com LOAN_COLUMNS)
+    ou grupos deles, com `contratos` (quantidade) e original_amount/remaining_amount
+    somados; `roles` mapeia owner_id -> role (comissão só para 'employee').
+    Retorna uma linha por (owner_id, mês) com colunas owner_id, mes, parcelas,
+    juros, comissao, lucro — meses sem parcela aparecem zerados.
+    """
+    df = pd.DataFrame(loans)
+    df = df.reindex(columns=[c.strip() for c in LOAN_COLUMNS.split(",")] + ["contratos"])
+    start_month = np.datetime64(start or date.today(), "M")
+    meses = start_month + np.arange(months)
+    if df.empty:
+        return pd.DataFrame(columns=["owner_id", "mes", "parcelas", "juros", "comissao", "lucro"])
+
+    _, month_idx, inside = schedule(df, months, start)
+    owner_code, owners = pd.factorize(df["owner_id"].astype(str), sort=True)
+    count = df["contratos"].fillna(1).astype(float).to_numpy()
+    juros = df["original_amount"].astype(float).to_numpy() * df["interest_rate"].astype(float).to_numpy() / 100
+    is_employee = np.array([(roles or {}).get(o) == "employee" for o in owners])[owner_code]
+    comissao = np.where(is_employee, df["remaining_amount"].astype(float).to_numpy() * commission_rate, 0.0)
+
+    # Soma por (owner, mês) com bincount sobre o índice achatado
+    cell = (owner_code[:, None] * months + month_idx)[inside]
+    rows = np.broadcast_to(np.arange(len(df))[:, None], month_idx.shape)[inside]
+    size = len(owners) * months
+    out = pd.DataFrame({
+        "owner_id": np.repeat(owners, months),
+        "mes": np.tile(meses, len(owners)).astype("datetime64[ns]"),
+        "parcelas": np.bincount(cell, weights=count[rows], minlength=size).astype(np.int64),
+        "juros": np.bincount(cell, weights=juros[rows], minlength=size),
+        "comissao": np.bincount(cell, weights=comissao[rows], minlength=size),
+    })
+    out["lucro"] = out["juros"] - out["comissao"]
+    return out
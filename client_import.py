@@ -0,0 +1,140 @@
+"""
+Importação em massa de clientes via CSV.
+O arquivo é lido em blocos; cada bloco é validado por coluna, deduplicado
+(dentro do arquivo e contra os CPFs já cadastrados do dono) e gravado com
+upserts em lote pela chave (owner_id, cpf) — ver migration_v6.
+"""
+import pandas as pd
+
+from db_utils import select_in
+from validators import only_digits, cpf_mask, phone_mask
+
+REQUIRED_COLUMNS = {"nome", "cpf", "celular", "endereco", "referencia"}
+OPTIONAL_COLUMNS = ["rg", "email"]
+# Linhas lidas do CSV por bloco / linhas por upsert
+CSV_CHUNK_SIZE = 1000
+UPSERT_CHUNK_SIZE = 500
+
+ERROR_COLUMNS = ["Linha", "Nome", "CPF", "Motivo"]
+# Motivo das linhas puladas porque o dono já tem o CPF
+DUPLICATE_REASON = "CPF já cadastrado"
+
+
+def _read(file, **kwargs):
+    file.seek(0)
+    return pd.read_csv(file, dtype=str, keep_default_na=False, **kwargs)
+
+
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [c.strip().lower() for c in df.columns]
+    for col in OPTIONAL_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    return df
+
+
+def read_columns(file) -> list:
+    """Nomes das colunas do CSV (normalizados)."""
+    return [c.strip().lower() for c in _read(file, nrows=0).columns]
+
+
+def read_preview(file, rows: int = 5) -> pd.DataFrame:
+    return _normalize_columns(_read(file, nrows=rows))
+
+
+def count_rows(file) -> int:
+    """Conta as linhas de dados lendo só a primeira coluna, em blocos."""
+    return sum(len(c) for c in _read(file, usecols=[0], chunksize=CSV_CHUNK_SIZE * 10))
+
+
+def _errors(df: pd.DataFrame, reason) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Linha": df.index + 2,  # +1 do cabeçalho, +1 porque a planilha começa em 1
+        "Nome": df["nome"],
+        "CPF": df["cpf"],
+        "Motivo": reason,
+    })
+
+
+def prepare_chunk(df: pd.DataFrame, seen_cpfs: set):
+    """
+    Valida e deduplica um bloco do CSV.
+    Retorna (válidos, erros); `seen_cpfs` acumula os CPFs já vistos no arquivo.
+    """
+    df = df.assign(cpf_digits=only_digits(df["cpf"]), phone_digits=only_digits(df["celular"]))
+    errors = []
+
+    bad_cpf = ~cpf_mask(df["cpf_digits"])
+    errors.append(_errors(df[bad_cpf], "CPF inválido"))
+    df = df[~bad_cpf]
+
+    bad_phone = ~phone_mask(df["phone_digits"])
+    errors.append(_errors(df[bad_phone], "Celular inválido"))
+    df = df[~bad_phone]
+
+    dup = df["cpf_digits"].duplicated() | df["cpf_digits"].isin(seen_cpfs)
+    errors.append(_errors(df[dup], "CPF repetido no arquivo"))
+    df = df[~dup]
+    seen_cpfs.update(df["cpf_digits"])
+
+    return df, pd.concat(errors)
+
+
+def _to_rows(df: pd.DataFrame, owner_id: str) -> list:
+    return pd.DataFrame({
+        "name": df["nome"].str.strip(),
+        "cpf": df["cpf_digits"],
+        "phone": df["phone_digits"],
+        "address": df["endereco"].str.strip(),
+        "reference_contact": df["referencia"].str.strip(),
+        "rg": df["rg"].str.strip(),
+        "email": df["email"].str.strip(),
+        "reputation": "NEUTRO",
+        "owner_id": owner_id,
+    }).to_dict("records")
+
+
+def import_clients(client, file, owner_id: str, on_progress=None):
+    """
+    Importa o CSV para `clients` do dono informado.
+    Retorna (quantidade inserida, DataFrame de erros com ERROR_COLUMNS) — as
+    linhas puladas por CPF já cadastrado estão nos erros com DUPLICATE_REASON.
+    `on_progress(linhas_processadas)` é chamado ao fim de cada bloco.
+    """
+    imported, done = 0, 0
+    seen, errors = set(), []
+
+    for df in _read(file, chunksize=CSV_CHUNK_SIZE):
+        df = _normalize_columns(df)
+        valid, errs = prepare_chunk(df, seen)
+        errors.append(errs)
+
+        # CPFs que o dono já tem cadastrados (uma query in_ por lote de CPFs)
+        existing = select_in(
+            lambda: client.table("clients").select("cpf").eq("owner_id", owner_id),
+            "cpf", valid["cpf_digits"].tolist(),
+        )
+        dup = valid["cpf_digits"].isin({r["cpf"] for r in existing})
+        errors.append(_errors(valid[dup], DUPLICATE_REASON))
+        valid = valid[~dup]
+
+        for start in range(0, len(valid), UPSERT_CHUNK_SIZE):
+            batch = valid.iloc[start:start + UPSERT_CHUNK_SIZE]
+            rows = _to_rows(batch, owner_id)
+            try:
+                res = client.table("clients").upsert(rows, on_conflict="owner_id,cpf", ignore_duplicates=True).execute()
+            except Exception as e:
+                errors.append(_errors(batch, f"Erro ao gravar: {e}"))
+                continue
+            # ON CONFLICT DO NOTHING devolve só as linhas inseridas; as demais foram
+            # cadastradas (ex: por outra sessão) entre a consulta acima e o upsert
+            inserted = {r["cpf"] for r in res.data or []}
+            imported += len(inserted)
+            errors.append(_errors(batch[~batch["cpf_digits"].isin(inserted)], DUPLICATE_REASON))
+
+        done += len(df)
+        if on_progress:
+            on_progress(done)
+
+    report = pd.concat(errors) if errors else pd.DataFrame(columns=ERROR_COLUMNS)
+    return imported, report.sort_values("Linha").reset_index(drop=True)
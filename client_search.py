@@ -0,0 +1,155 @@
+"""
+Índice de busca de clientes em memória.
+Nome: sem acento e sem diferenciar maiúsculas, por prefixo de palavras e,
+para erros de digitação ou trechos, por similaridade de trigramas.
+CPF: por prefixo dos dígitos. A busca não faz nenhuma chamada ao banco.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+# Pontuação por tipo de acerto (maior = mais relevante)
+SCORE_CPF_PREFIX = 100
+SCORE_NAME_PREFIX = 90
+SCORE_WORD_PREFIX = 80
+SCORE_TRIGRAM = 60
+# Fração mínima dos trigramas da busca presentes no nome para entrar no resultado
+MIN_SIMILARITY = 0.5
+
+
+def normalize(text) -> str:
+    """Minúsculas, sem acentos e com espaços simples."""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def trigrams(text: str) -> set:
+    """Trigramas no estilo do pg_trgm: cada palavra com 2 espaços antes e 1 depois."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class ClientSearchIndex:
+    """
+    Índice dos clientes de um dono. Atualizável cliente a cliente (upsert/remove).
+    Seguro para uso por várias threads (as sessões do processo dividem o índice).
+    """
+
+    def __init__(self, clients=()):
+        self._lock = threading.RLock()
+        self._clients = {}
+        self._names = {}
+        self._grams = defaultdict(set)
+        tokens, cpfs = [], []
+        for c in clients:
+            name = self._add(c)
+            tokens.extend((t, c["id"]) for t in set(name.split()))
+            cpfs.append((self._digits(c), c["id"]))
+        # Listas ordenadas para busca por prefixo com bisect
+        self._tokens = sorted(tokens)
+        self._cpfs = sorted(cpfs)
+
+    def __len__(self):
+        return len(self._clients)
+
+    @staticmethod
+    def _digits(client) -> str:
+        return re.sub(r"\D", "", client.get("cpf") or "")
+
+    def _add(self, client) -> str:
+        cid = client["id"]
+        name = normalize(client.get("name"))
+        self._clients[cid] = client
+        self._names[cid] = name
+        for g in trigrams(name):
+            self._grams[g].add(cid)
+        return name
+
+    def upsert(self, client):
+        """Inclui ou atualiza um cliente."""
+        with self._lock:
+            self.remove(client["id"])
+            name = self._add(client)
+            for t in set(name.split()):
+                bisect.insort(self._tokens, (t, client["id"]))
+            bisect.insort(self._cpfs, (self._digits(client), client["id"]))
+
+    def remove(self, client_id):
+        """Remove um cliente (se existir)."""
+        with self._lock:
+            client = self._clients.pop(client_id, None)
+            if client is None:
+                return
+            name = self._names.pop(client_id)
+            for g in trigrams(name):
+                self._grams[g].discard(client_id)
+            for t in set(name.split()):
+                self._tokens.pop(bisect.bisect_left(self._tokens, (t, client_id)))
+            self._cpfs.pop(bisect.bisect_left(self._cpfs, (self._digits(client), client_id)))
+
+    def patch(self, client_id, **fields):
+        """Atualiza campos de um cliente já indexado (ex: reputação)."""
+        with self._lock:
+            if client_id in self._clients:
+                self.upsert({**self._clients[client_id], **fields})
+
+    @staticmethod
+    def _prefix_ids(pairs, prefix) -> set:
+        start = bisect.bisect_left(pairs, (prefix,))
+        ids = set()
+        for key, cid in pairs[start:]:
+            if not key.startswith(prefix):
+                break
+            ids.add(cid)
+        return ids
+
+    def search(self, query, k=20) -> list:
+        """Os `k` clientes mais relevantes para `query` (nome ou CPF)."""
+        with self._lock:
+            return self._search(query, k)
+
+    def _search(self, query, k):
+        scores = {}
+
+        def hit(ids, score):
+            for cid in ids:
+                if scores.get(cid, 0) < score:
+                    scores[cid] = score
+
+        digits = re.sub(r"\D", "", str(query or ""))
+        if digits and not re.search(r"[^\d\s.\-/]", str(query)):
+            hit(self._prefix_ids(self._cpfs, digits), SCORE_CPF_PREFIX)
+
+        q = normalize(query)
+        words = q.split()
+        if words:
+            # Todas as palavras da busca são início de alguma palavra do nome
+            ids = self._prefix_ids(self._tokens, words[0])
+            for w in words[1:]:
+                ids &= self._prefix_ids(self._tokens, w)
+            hit((cid for cid in ids if self._names[cid].startswith(q)), SCORE_NAME_PREFIX)
+            hit(ids, SCORE_WORD_PREFIX)
+
+            # Aproximada (trigramas) só se os acertos por prefixo não bastarem
+            if len(scores) < k:
+                q_grams = trigrams(q)
+                shared = defaultdict(int)
+                for g in q_grams:
+                    for cid in self._grams.get(g, ()):
+                        shared[cid] += 1
+                for cid, n in shared.items():
+                    if cid in scores:
+                        continue
+                    # Como o word_similarity do pg_trgm: quanto da busca aparece no nome
+                    sim = n / len(q_grams)
+                    if sim >= MIN_SIMILARITY:
+                        scores[cid] = SCORE_TRIGRAM * sim
+
+        ranked = sorted(scores, key=lambda cid: (-scores[cid], self._names[cid]))
+        return [self._clients[cid] for cid in ranked[:k]]
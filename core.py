@@ -0,0 +1,394 @@
+"""
+Base compartilhada pelas páginas do app (views/): conexão com o Supabase,
+sessão, cache de leituras, busca de clientes, paginação e uploads.
+Fica fora daqui tudo que é pesado e só uma página usa (pandas, altair).
+"""
+import streamlit as st
+from supabase import create_client, Client
+from datetime import datetime, date, timedelta
+import re
+import time
+from db_utils import select_in, keyset_page, iter_keyset
+from query_cache import QueryCache
+from client_search import ClientSearchIndex
+import uploads
+import instrumentation
+
+# --- Validadores ---
+def validate_email(email):
+    return re.match(r'^[\w\.-]+@[\w\.-]+\.\w+$', email) is not None
+
+def brl(v):
+    """Formata valor numérico para moeda brasileira: R$ 1.234,56"""
+    return "R$ " + f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+# --- Conexão Supabase ---
+# Configurações lidas dos secrets em connect() (iguais para todas as sessões)
+QUERY_CACHE_TTL = 60.0
+QUERY_CACHE_MAX_ENTRIES = 64
+OVERDUE_CHECK_MINUTES = 60.0
+CLIENT_INDEX_TTL = 300.0
+QUERY_LOG_FILE = None
+
+def connect():
+    """Lê os secrets e prepara os clients da sessão (chamada pelo app.py a cada rerun).
+    O client service_role é um só por processo (_service_client); o de login é
+    criado uma vez por sessão. Os dois ficam no session_state embrulhados pela
+    instrumentação da sessão: cada sessão roda na sua thread e este módulo é
+    compartilhado pelo processo todo."""
+    global QUERY_CACHE_TTL, QUERY_CACHE_MAX_ENTRIES, OVERDUE_CHECK_MINUTES, CLIENT_INDEX_TTL, QUERY_LOG_FILE
+    try:
+        url = st.secrets["SUPABASE_URL"]
+        service_key = st.secrets["SUPABASE_SERVICE_KEY"]
+        # anon key é opcional — se não existir usa service_role em ambos os clients
+        key = st.secrets.get("SUPABASE_KEY", service_key)
+        # Conexões keep-alive do pool HTTP do processo (≈ sessões fazendo queries ao mesmo tempo)
+        pool_size = int(st.secrets.get("HTTP_POOL_SIZE", 32))
+        # Cache de leituras por sessão (segundos / nº máximo de queries guardadas)
+        QUERY_CACHE_TTL = float(st.secrets.get("QUERY_CACHE_TTL", 60))
+        QUERY_CACHE_MAX_ENTRIES = int(st.secrets.get("QUERY_CACHE_MAX_ENTRIES", 64))
+        # Intervalo (minutos) entre verificações de contratos vencidos por processo
+        OVERDUE_CHECK_MINUTES = float(st.secrets.get("OVERDUE_CHECK_MINUTES", 60))
+        # Segundos até o índice de busca de clientes ser remontado (pega alterações feitas fora do app)
+        CLIENT_INDEX_TTL = float(st.secrets.get("CLIENT_INDEX_TTL", 300))
+        # Fotos enviadas: reduz para IMAGE_MAX_SIDE px, recomprime (IMAGE_QUALITY) e gera miniatura
+        uploads.IMAGE_OPTIONS.update(
+            enabled=bool(st.secrets.get("IMAGE_PROCESSING", True)),
+            max_side=int(st.secrets.get("IMAGE_MAX_SIDE", 1600)),
+            quality=int(st.secrets.get("IMAGE_QUALITY", 80)),
+            thumb_side=int(st.secrets.get("IMAGE_THUMB_SIDE", 320)),
+        )
+        # Opcional: arquivo .jsonl que recebe cada chamada ao Supabase (instrumentation.py)
+        QUERY_LOG_FILE = st.secrets.get("QUERY_LOG_FILE")
+    except:
+        st.error("Erro: Configure .streamlit/secrets.toml")
+        st.stop()
+
+    # Instrumentação: cada chamada ao Supabase é medida e agregada por rerun/página
+    recorder().start_rerun()
+    if '_db' not in st.session_state:
+        # supabase: todas as queries de dados (service_role bypassa RLS)
+        st.session_state['_db'] = instrumentation.instrument(_service_client(url, service_key, pool_size), recorder())
+    if '_auth_db' not in st.session_state:
+        # supabase_auth: apenas para login/logout; guarda a sessão do usuário entre reruns
+        supabase_auth = _new_client(url, key, pool_size, auto_refresh_token=False)
+        st.session_state['_auth_db'] = instrumentation.instrument(supabase_auth, recorder())
+
+@st.cache_resource
+def _http_pool(size):
+    """Pool HTTP (keep-alive) do processo, usado por todos os clients: a conexão
+    TLS com o Supabase é aberta uma vez e reaproveitada pelas sessões."""
+    import httpx
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+        timeout=httpx.Timeout(120, connect=10), follow_redirects=True,
+    )
+
+def _new_client(url, key, pool_size, **options) -> Client:
+    """create_client usando o pool HTTP do processo. As bibliotecas do supabase
+    montam URL absoluta e headers em cada requisição, então o pool pode ser dividido."""
+    try:
+        from supabase import ClientOptions
+    except ImportError:
+        return create_client(url, key)
+    try:
+        opts = ClientOptions(httpx_client=_http_pool(pool_size), **options)
+    except TypeError:  # supabase antigo, sem httpx_client: cada client abre o seu pool
+        opts = ClientOptions(**options)
+    return create_client(url, key, opts)
+
+@st.cache_resource
+def _service_client(url, service_key, pool_size) -> Client:
+    """Client service_role único do processo. Não faz login, então o estado
+    dele (headers com a service key) é o mesmo para todas as sessões."""
+    return _new_client(url, service_key, pool_size, auto_refresh_token=False, persist_session=False)
+
+def db() -> Client:
+    """Client de dados (service_role, ignora RLS) da sessão atual."""
+    return st.session_state['_db']
+
+def auth_db() -> Client:
+    """Client de login/logout e troca de senha da sessão atual."""
+    return st.session_state['_auth_db']
+
+def recorder():
+    if '_recorder' not in st.session_state:
+        st.session_state._recorder = instrumentation.CallRecorder("app", QUERY_LOG_FILE)
+    return st.session_state._recorder
+
+# --- 2. SESSÃO ---
+# Renova o token quando faltar menos que isso para expirar (segundos)
+TOKEN_REFRESH_MARGIN = 120
+
+def _expires_soon(session):
+    expires_at = getattr(session, 'expires_at', None)
+    return expires_at is not None and expires_at - time.time() < TOKEN_REFRESH_MARGIN
+
+def init_session():
+    if 'session' not in st.session_state: st.session_state.session = None
+    if 'user' not in st.session_state: st.session_state.user = None
+    if 'role' not in st.session_state: st.session_state.role = None
+    if 'name' not in st.session_state: st.session_state.name = None
+    if 'edit_client_id' not in st.session_state: st.session_state.edit_client_id = None
+    # O client de login da sessão já guarda o token: só vai ao auth perto de expirar
+    session = st.session_state.session
+    if session and _expires_soon(session):
+        try:
+            res = auth_db().auth.refresh_session(session.refresh_token)
+            st.session_state.session = res.session
+            st.session_state.role = fetch_role(res.user.id, res.session.expires_at)
+        except Exception:
+            logout()
+
+def login(email, password, nome):
+    try:
+        res = auth_db().auth.sign_in_with_password({"email": email, "password": password})
+        st.session_state.session = res.session
+        st.session_state.user = res.user
+        st.session_state.name = nome.strip() if nome and nome.strip() else None
+        st.session_state.role = fetch_role(res.user.id, res.session.expires_at)
+    except Exception:
+        st.error("Credenciais inválidas.")
+        return
+    st.rerun()
+
+def logout():
+    auth_db().auth.sign_out()
+    st.session_state.session = None; st.session_state.user = None
+    st.session_state.role = None; st.session_state.name = None
+    st.session_state.pop('_query_cache', None)
+    st.rerun()
+
+# --- 3. UPLOAD ---
+def upload_file(file, folder="docs"):
+    """Envia um arquivo. Retorna (info, erro) — info com url, name, thumb_url e tamanhos."""
+    info, err = uploads.upload_file(db(), file, folder)
+    if info: uploads.record_uploads(db(), [info], st.session_state.user.id)
+    return info, err
+
+def upload_files(files, folder):
+    """Envia vários arquivos em paralelo. Retorna (enviados [info], falhas [(arquivo, erro)])."""
+    sent, failed = uploads.upload_many(db(), files, folder)
+    uploads.record_uploads(db(), sent, st.session_state.user.id)
+    return sent, failed
+
+def remove_uploaded(infos):
+    uploads.remove_uploaded(db(), infos)
+
+def doc_rows(client_id, sent):
+    return [{"client_id": client_id, "file_name": i['name'], "file_url": i['url'], "thumb_url": i['thumb_url']} for i in sent]
+
+@st.cache_resource
+def _role_cache():
+    """Roles do processo: {user_id: (role, expira_em)} — vale até o token expirar."""
+    return {}
+
+def fetch_role(user_id, expires_at=None):
+    """Busca role usando o client service_role (bypassa RLS).
+    Com `expires_at` (do token), o resultado fica em cache para o usuário até
+    essa hora: logins em outras abas/sessões não consultam profiles de novo."""
+    hit = _role_cache().get(user_id)
+    if hit and hit[1] and hit[1] > time.time():
+        return hit[0]
+    role = 'employee'
+    try:
+        d = db().table("profiles").select("role").eq("id", user_id).execute()
+        if d.data:
+            role = d.data[0].get('role', 'employee')
+    except:
+        return role
+    _role_cache()[user_id] = (role, expires_at)
+    return role
+
+def forget_role(user_id):
+    """Tira o usuário do cache de roles (ex: usuário excluído)."""
+    _role_cache().pop(user_id, None)
+
+# --- 4. ATUALIZAR STATUS ATRASADO ---
+@st.cache_resource
+def _overdue_marker():
+    """Marcador do processo: quando foi a última verificação de vencidos."""
+    return {'checked_at': None}
+
+def update_atrasados():
+    """Promove pendentes vencidos para 'atrasado' fora do caminho de cada clique.
+    O processo só consulta a cada OVERDUE_CHECK_MINUTES; a função do banco
+    (migration_v4) só executa o UPDATE uma vez por dia entre todos os processos."""
+    marker = _overdue_marker()
+    now = datetime.now()
+    last = marker['checked_at']
+    if last and last.date() == now.date() and now - last < timedelta(minutes=OVERDUE_CHECK_MINUTES):
+        return
+    marker['checked_at'] = now
+    try:
+        promoted = db().rpc("promote_overdue_loans", {}).execute().data
+    except Exception:
+        # Banco sem a migration_v4: faz a promoção direto (ainda limitada pelo marcador)
+        try:
+            promoted = len(db().table("loans").update({"status": "atrasado"}).eq("status", "pendente").lt("due_date", str(date.today())).execute().data or [])
+        except: return
+    if promoted and promoted > 0:
+        invalidate("loans")
+
+def is_admin():
+    return st.session_state.get('role') == 'admin'
+
+def owner_id():
+    """Retorna o owner_id do usuário logado."""
+    return st.session_state.user.id if st.session_state.user else None
+
+def apply_owner_filter(q):
+    """Aplica filtro owner_id se o usuário for funcionário."""
+    if not is_admin():
+        q = q.eq("owner_id", owner_id())
+    return q
+
+# --- Cache de leituras (por sessão) ---
+def _query_cache():
+    if '_query_cache' not in st.session_state:
+        st.session_state._query_cache = QueryCache(QUERY_CACHE_TTL, QUERY_CACHE_MAX_ENTRIES)
+    return st.session_state._query_cache
+
+def cached(tables, key, fetch):
+    """Executa `fetch` (uma leitura) ou devolve o resultado em cache.
+    A chave inclui owner_id e role; `tables` são as tabelas lidas,
+    usadas para invalidar a entrada quando houver escrita nelas."""
+    scope = (owner_id(), st.session_state.get('role'))
+    return _query_cache().get_or_fetch((scope,) + tuple(key), tables, fetch)
+
+def invalidate(*tables):
+    """Descarta do cache as leituras que dependem das tabelas alteradas
+    (e, se clients mudou, os índices de busca de clientes)."""
+    _query_cache().invalidate(*tables)
+    if not tables or "clients" in tables:
+        _invalidate_client_indexes()
+
+def profiler_panel():
+    """Painel (sidebar, só admin) com as chamadas ao Supabase do último rerun e o acumulado por página."""
+    import pandas as pd  # só carregado quando o painel é aberto
+    rec = recorder()
+    box = st.sidebar.expander("🔬 Perfil de queries", expanded=True)
+    last = rec.last
+    if not last:
+        box.caption("Sem reruns concluídos ainda.")
+        return
+    box.caption(f"Último rerun (#{last['rerun']} · {last['page']})")
+    m1, m2 = box.columns(2)
+    m1.metric("Chamadas", last['calls'])
+    m2.metric("Tempo (ms)", f"{last['ms']:.0f}")
+    if last['by_target']:
+        box.dataframe(pd.DataFrame.from_dict(last['by_target'], orient='index'), use_container_width=True)
+    box.caption("Acumulado por página")
+    pages = pd.DataFrame.from_dict(rec.pages, orient='index')
+    pages['ms/rerun'] = (pages['ms'] / pages['reruns']).round(1)
+    box.dataframe(pages[['reruns', 'calls', 'ms/rerun', 'rows']], use_container_width=True)
+    box.download_button("💾 Exportar chamadas (.jsonl)", rec.export_jsonl().encode('utf-8'),
+                        file_name="supabase_calls.jsonl", mime="application/x-ndjson")
+
+# --- Busca de clientes em memória ---
+CLIENT_SEARCH_LIMIT = 50
+
+@st.cache_resource
+def _client_indexes():
+    """Índices de busca do processo, um por escopo de dono (None = admin, vê
+    todos): {escopo: {'built_at', 'stale', 'index'}}. Compartilhados pelas sessões."""
+    return {}
+
+def _index_scope():
+    return None if is_admin() else owner_id()
+
+def client_index():
+    """Índice de busca (nome/CPF) dos clientes visíveis ao usuário. Montado uma
+    vez por processo e escopo; escritas no app passam por invalidate("clients")
+    e update_client_index. Remontado após CLIENT_INDEX_TTL (escritas fora do app)."""
+    indexes = _client_indexes()
+    scope = _index_scope()
+    entry = indexes.get(scope)
+    if not entry or entry['stale'] or time.monotonic() - entry['built_at'] > CLIENT_INDEX_TTL:
+        with st.spinner("Indexando clientes..."):
+            rows = iter_keyset(lambda: apply_owner_filter(db().table("clients").select("*")), "name")
+            entry = {'built_at': time.monotonic(), 'stale': False, 'index': ClientSearchIndex(rows)}
+        indexes[scope] = entry
+    return entry['index']
+
+def _invalidate_client_indexes():
+    """Escrita em clients: descarta os índices dos outros escopos (remontados no
+    próximo uso) e marca o do usuário como desatualizado até update_client_index."""
+    indexes = _client_indexes()
+    scope = _index_scope()
+    for key in [k for k in indexes if k != scope]:
+        indexes.pop(key, None)
+    if scope in indexes:
+        indexes[scope]['stale'] = True
+
+def update_client_index(fn):
+    """Aplica `fn(índice)` ao índice do usuário (se já montado) depois de uma
+    escrita já passada por invalidate("clients"): evita remontar o índice todo."""
+    entry = _client_indexes().get(_index_scope())
+    if entry:
+        fn(entry['index'])
+        entry['stale'] = False
+
+# --- Paginação por cursor (keyset) ---
+PAGE_SIZES = [10, 25, 50, 100]
+
+def keyset_pager(key, tables, query, sort_col, reset_on=None):
+    """Mostra os controles de paginação e devolve as linhas da página atual.
+    Guarda na sessão a pilha de cursores visitados (voltar não refaz páginas
+    anteriores); a pilha reinicia quando o tamanho da página ou `reset_on`
+    (ex: o texto da busca) muda. `query` deve criar a query base sem ordem."""
+    state = st.session_state.setdefault(f"_pager_{key}", {'cursors': [None], 'reset_on': None})
+    c_size, c_prev, c_info, c_next = st.columns([2, 1, 1, 1])
+    size = c_size.selectbox("Itens por página", PAGE_SIZES, index=1, key=f"_pgsize_{key}")
+    if state['reset_on'] != (reset_on, size):
+        state.update(cursors=[None], reset_on=(reset_on, size))
+    after = state['cursors'][-1]
+    rows, nxt = cached(tables, ("page", key, reset_on, size, after),
+                       lambda: keyset_page(query(), sort_col, after, size))
+    page = len(state['cursors'])
+    if c_prev.button("⬅️ Anterior", key=f"_pgprev_{key}", disabled=page == 1, use_container_width=True):
+        state['cursors'].pop(); st.rerun()
+    c_info.caption(f"Página {page}")
+    if c_next.button("Próxima ➡️", key=f"_pgnext_{key}", disabled=nxt is None, use_container_width=True):
+        state['cursors'].append(nxt); st.rerun()
+    return rows
+
+# Base de Clientes: abas de detalhe de cada cliente
+CLIENT_VIEWS = ["📎 Documentos", "💰 Contratos", "💸 Pagamentos"]
+
+def _group(rows, key):
+    out = {}
+    for r in rows:
+        out.setdefault(r[key], []).append(r)
+    return out
+
+def load_clients_bundle(client_ids, views):
+    """Carrega documentos, contratos e pagamentos de vários clientes de uma vez
+    (uma query in_ por tabela) e agrupa por client_id. Só busca as tabelas
+    das abas que estão abertas em `views`; cada tabela fica em cache pela
+    página (client_ids), então abrir/fechar abas não repete as buscas."""
+    ids = tuple(client_ids)
+    bundle = {cid: {'docs': [], 'loans': [], 'payments': []} for cid in ids}
+    if not ids or not views: return bundle
+    if "📎 Documentos" in views:
+        docs = cached(["client_documents"], ("bundle_docs", ids), lambda: _group(
+            select_in(lambda: db().table("client_documents").select("*"), "client_id", list(ids)), 'client_id'))
+        for cid, rows in docs.items():
+            bundle[cid]['docs'] = rows
+    if "💰 Contratos" in views or "💸 Pagamentos" in views:
+        loans = cached(["loans"], ("bundle_loans", ids), lambda: _group(
+            select_in(lambda: db().table("loans").select("*"), "client_id", list(ids)), 'client_id'))
+        for cid, rows in loans.items():
+            bundle[cid]['loans'] = rows
+        if "💸 Pagamentos" in views:
+            loan_client = {l['id']: cid for cid, rows in loans.items() for l in rows}
+            def fetch_payments():
+                if not loan_client: return {}
+                pays = select_in(lambda: db().table("payments").select("*, profiles!owner_id(email)"), "loan_id", list(loan_client))
+                out = {}
+                for p in sorted(pays, key=lambda x: x['paid_at'], reverse=True):
+                    out.setdefault(loan_client[p['loan_id']], []).append(p)
+                return out
+            for cid, rows in cached(["loans", "payments"], ("bundle_payments", ids), fetch_payments).items():
+                bundle[cid]['payments'] = rows
+    return bundle
@@ -0,0 +1,23 @@
+-- =============================================================
+-- MIGRATION V10 — Rodar no SQL Editor do Supabase
+-- Adiciona: job_checkpoints, onde cada partição (shard) do robô de
+-- cobrança grava o último contrato processado no dia. Uma execução
+-- repetida da mesma partição continua dali em vez de recomeçar.
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS public.job_checkpoints (
+  run_date     date    NOT NULL,
+  shard_index  integer NOT NULL,
+  shard_count  integer NOT NULL,
+  last_loan_id uuid,                      -- último contrato (ordem de id) já processado
+  processed    integer NOT NULL DEFAULT 0,
+  done         boolean NOT NULL DEFAULT false,
+  updated_at   timestamp with time zone DEFAULT timezone('utc'::text, now()) NOT NULL,
+  PRIMARY KEY (run_date, shard_index, shard_count)
+);
+
+-- Só o service_role (robô) grava/lê
+ALTER TABLE public.job_checkpoints ENABLE ROW LEVEL SECURITY;
+
+-- Limpeza opcional (checkpoints só valem no próprio dia):
+--   DELETE FROM public.job_checkpoints WHERE run_date < current_date - 30;
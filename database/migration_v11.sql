@@ -0,0 +1,158 @@
+-- =============================================================
+-- MIGRATION V11 — Rodar no SQL Editor do Supabase
+-- Adiciona: fila persistente de mensagens (notification_outbox).
+-- Produtores (robô diário com --enqueue e, se ligado, o trigger de
+-- pagamentos da seção 3) gravam na fila; workers (automation_job.py --worker) reservam lotes
+-- com FOR UPDATE SKIP LOCKED — vários workers em paralelo nunca pegam
+-- a mesma mensagem — e marcam o resultado.
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS public.notification_outbox (
+  id           bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  created_at   timestamp with time zone DEFAULT timezone('utc'::text, now()) NOT NULL,
+  kind         text NOT NULL,                 -- 'cobranca', 'pagamento', ...
+  loan_id      uuid REFERENCES public.loans(id) ON DELETE CASCADE,
+  phone        text NOT NULL,
+  message      text NOT NULL,
+  dedup_key    text UNIQUE,                   -- ex: 'cobranca:<loan_id>:<data>' (enfileirar 2x não duplica)
+  status       text NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+  attempts     integer NOT NULL DEFAULT 0,
+  available_at timestamp with time zone DEFAULT now() NOT NULL,  -- próxima tentativa
+  expires_at   timestamp with time zone,      -- depois disso não envia mais (NULL = sem prazo)
+  claimed_at   timestamp with time zone,
+  claimed_by   text,
+  sent_at      timestamp with time zone,
+  last_error   text
+);
+
+-- Bancos onde a v11 rodou antes do prazo de validade: a coluna precisa existir
+-- antes das funções abaixo (CREATE TABLE IF NOT EXISTS não altera a tabela)
+ALTER TABLE public.notification_outbox ADD COLUMN IF NOT EXISTS expires_at timestamp with time zone;
+
+-- Só o que está na fila (pendente/em envio) entra no índice usado pelo claim
+CREATE INDEX IF NOT EXISTS notification_outbox_queue
+  ON public.notification_outbox (available_at, id)
+  WHERE status IN ('pending', 'sending');
+
+-- Só o service_role (robô/app) grava/lê
+ALTER TABLE public.notification_outbox ENABLE ROW LEVEL SECURITY;
+
+-- ---------------------------------------------------------------
+-- 1. Reserva um lote para o worker. Mensagens 'sending' cuja reserva
+--    passou de p_lease (worker morreu) voltam a ser elegíveis. Vencidas
+--    (expires_at) — pendentes ou presas em 'sending' por um worker que
+--    morreu — viram 'failed' em vez de saírem atrasadas.
+-- ---------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.claim_notifications(
+  p_worker text,
+  p_limit  integer  DEFAULT 20,
+  p_lease  interval DEFAULT '5 minutes'
+)
+RETURNS SETOF public.notification_outbox
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE notification_outbox
+  SET status = 'failed', last_error = 'expirada'
+  WHERE expires_at <= now()
+    AND (status = 'pending' OR (status = 'sending' AND claimed_at < now() - p_lease));
+
+  UPDATE notification_outbox o
+  SET status = 'sending', claimed_at = now(), claimed_by = p_worker, attempts = o.attempts + 1
+  WHERE o.id IN (
+    SELECT id FROM notification_outbox
+    WHERE ((status = 'pending' AND available_at <= now())
+       OR (status = 'sending' AND claimed_at < now() - p_lease))
+      AND (expires_at IS NULL OR expires_at > now())
+    ORDER BY available_at, id
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING o.*;
+$$;
+
+-- ---------------------------------------------------------------
+-- 2. Resultado de um lote: enviados viram 'sent'; falhas voltam para a
+--    fila com espera exponencial (1, 2, 4... minutos) até p_max_attempts,
+--    depois 'failed'. Cobranças também vão para notification_logs, que o
+--    robô diário usa para não mandar a mesma cobrança duas vezes no dia.
+-- ---------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.complete_notifications(
+  p_sent         bigint[],
+  p_failed       bigint[] DEFAULT '{}',
+  p_error        text     DEFAULT NULL,
+  p_max_attempts integer  DEFAULT 5
+)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  UPDATE notification_outbox
+  SET status = 'sent', sent_at = now(), last_error = NULL
+  WHERE id = ANY (p_sent) AND status = 'sending';
+
+  UPDATE notification_outbox
+  SET status = CASE WHEN attempts >= p_max_attempts THEN 'failed' ELSE 'pending' END,
+      available_at = now() + interval '1 minute' * power(2, attempts - 1),
+      last_error = p_error
+  WHERE id = ANY (p_failed) AND status = 'sending';
+
+  INSERT INTO notification_logs (loan_id, status)
+  SELECT loan_id, CASE WHEN id = ANY (p_sent) THEN 'success' ELSE 'error' END
+  FROM notification_outbox
+  WHERE kind = 'cobranca' AND loan_id IS NOT NULL
+    AND (id = ANY (p_sent) OR (id = ANY (p_failed) AND status = 'failed'));
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.claim_notifications(text, integer, interval) FROM public, anon, authenticated;
+REVOKE ALL ON FUNCTION public.complete_notifications(bigint[], bigint[], text, integer) FROM public, anon, authenticated;
+
+-- ---------------------------------------------------------------
+-- 3. (Opcional, desligado) Confirmação de pagamento em segundos: cada
+--    pagamento registrado enfileira uma mensagem para o cliente. Só ligue
+--    com workers rodando (automation_job.py --worker); a mensagem vale por
+--    6 horas, depois disso o claim a descarta em vez de mandar um recibo velho.
+-- ---------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.enqueue_payment_receipt()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_name  text;
+  v_phone text;
+  v_valor text;
+BEGIN
+  SELECT c.name, c.phone INTO v_name, v_phone
+  FROM loans l JOIN clients c ON c.id = l.client_id
+  WHERE l.id = NEW.loan_id;
+  IF v_phone IS NULL OR v_phone = '' THEN
+    RETURN NEW;
+  END IF;
+
+  -- R$ 1.234,56 (sem depender do locale do servidor)
+  v_valor := translate(to_char(NEW.amount, 'FM999,999,990.00'), ',.', '.,');
+  INSERT INTO notification_outbox (kind, loan_id, phone, message, dedup_key, expires_at)
+  VALUES (
+    'pagamento', NEW.loan_id, v_phone,
+    format(E'Olá %s! 👋\n\nRecebemos seu pagamento de *R$ %s* em %s.\n\nObrigado!',
+           v_name, v_valor, to_char(NEW.paid_at, 'DD/MM/YYYY')),
+    'pagamento:' || NEW.id,
+    now() + interval '6 hours'
+  )
+  ON CONFLICT (dedup_key) DO NOTHING;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS payments_enqueue_receipt ON public.payments;
+
+-- Para ligar (depois de colocar os workers no ar):
+-- CREATE TRIGGER payments_enqueue_receipt
+--   AFTER INSERT ON public.payments
+--   FOR EACH ROW EXECUTE FUNCTION public.enqueue_payment_receipt();
@@ -0,0 +1,116 @@
+-- =============================================================
+-- MIGRATION V12 — Rodar no SQL Editor do Supabase
+-- Adiciona: foto diária da carteira (portfolio_snapshots) por dono e
+-- status, gravada pelo robô diário (take_portfolio_snapshot). Os gráficos
+-- de tendência do Painel leem algumas centenas de linhas daqui em vez
+-- de recalcular o histórico a partir de payments.
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS public.portfolio_snapshots (
+  snapshot_date         date NOT NULL,
+  owner_id              uuid NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+  status                text NOT NULL,
+  contratos             integer NOT NULL,
+  total_emprestado      numeric NOT NULL,
+  saldo_devedor         numeric NOT NULL,
+  juros_previstos       numeric NOT NULL,
+  comissao_funcionarios numeric NOT NULL,
+  approximate           boolean NOT NULL DEFAULT false,  -- reconstruída por backfill
+  created_at            timestamp with time zone DEFAULT timezone('utc'::text, now()) NOT NULL,
+  PRIMARY KEY (snapshot_date, owner_id, status)
+);
+
+-- Só o service_role (robô/app) grava/lê
+ALTER TABLE public.portfolio_snapshots ENABLE ROW LEVEL SECURITY;
+
+-- ---------------------------------------------------------------
+-- Grava a foto de p_date (mesmas métricas de dashboard_summary, migration_v5).
+-- Idempotente: refaz as linhas do dia. Retorna quantas linhas gravou, ou
+-- -1 se o dia já tem a foto exata e foi mantido (ver p_overwrite).
+--
+-- p_date >= hoje: estado atual dos contratos (exato).
+-- p_date no passado (backfill): só preenche dias sem foto ou com foto
+-- aproximada; a foto exata gravada pelo robô naquele dia é mantida, a não
+-- ser que p_overwrite seja true. Reconstrução aproximada, já que loans
+-- não guarda histórico nem data de criação:
+--   - saldo na data = saldo atual + amortizações pagas depois dela
+--     (valor pago - juros da parcela, em AMORTIZACAO/QUITACAO);
+--   - vencimento na data = vencimento atual recuado 1 mês por pagamento
+--     de juros/amortização feito depois dela; vencido → 'atrasado';
+--   - o contrato entra a partir de 1 mês antes da 1ª parcela estimada.
+-- ---------------------------------------------------------------
+-- Versão anterior (sem p_overwrite): removida para a chamada só com p_date não ficar ambígua
+DROP FUNCTION IF EXISTS public.take_portfolio_snapshot(date);
+
+CREATE OR REPLACE FUNCTION public.take_portfolio_snapshot(
+  p_date      date    DEFAULT current_date,
+  p_overwrite boolean DEFAULT false
+)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_rows integer;
+BEGIN
+  IF p_date < current_date AND NOT p_overwrite AND EXISTS (
+    SELECT 1 FROM portfolio_snapshots WHERE snapshot_date = p_date AND NOT approximate
+  ) THEN
+    RETURN -1;
+  END IF;
+
+  DELETE FROM portfolio_snapshots WHERE snapshot_date = p_date;
+
+  IF p_date >= current_date THEN
+    INSERT INTO portfolio_snapshots (snapshot_date, owner_id, status, contratos, total_emprestado,
+                                     saldo_devedor, juros_previstos, comissao_funcionarios, approximate)
+    SELECT p_date, l.owner_id, l.status, count(*),
+           coalesce(sum(l.original_amount), 0),
+           coalesce(sum(l.remaining_amount), 0),
+           coalesce(sum(l.original_amount * l.interest_rate / 100), 0),
+           coalesce(sum(l.original_amount * 0.10) FILTER (WHERE p.role = 'employee'), 0),
+           false
+    FROM loans l
+    LEFT JOIN profiles p ON p.id = l.owner_id
+    GROUP BY 2, 3;
+  ELSE
+    INSERT INTO portfolio_snapshots (snapshot_date, owner_id, status, contratos, total_emprestado,
+                                     saldo_devedor, juros_previstos, comissao_funcionarios, approximate)
+    WITH pay AS (
+      SELECT py.loan_id,
+             count(*) FILTER (WHERE py.payment_type <> 'QUITACAO') AS parcelas,
+             count(*) FILTER (WHERE py.payment_type <> 'QUITACAO' AND py.paid_at > p_date) AS parcelas_depois,
+             coalesce(sum(greatest(py.amount - l.original_amount * l.interest_rate / 100, 0))
+                        FILTER (WHERE py.payment_type <> 'JUROS' AND py.paid_at > p_date), 0) AS amortizado_depois
+      FROM payments py
+      JOIN loans l ON l.id = py.loan_id
+      GROUP BY py.loan_id
+    ), est AS (
+      SELECT l.owner_id, l.original_amount, l.interest_rate,
+             least(l.original_amount, l.remaining_amount + coalesce(pay.amortizado_depois, 0)) AS saldo,
+             (l.due_date - make_interval(months => coalesce(pay.parcelas_depois, 0)::int))::date AS vencimento,
+             (l.due_date - make_interval(months => coalesce(pay.parcelas, 0)::int + 1))::date AS inicio
+      FROM loans l
+      LEFT JOIN pay ON pay.loan_id = l.id
+    )
+    SELECT p_date, e.owner_id,
+           CASE WHEN e.saldo <= 0.5 THEN 'pago' WHEN e.vencimento < p_date THEN 'atrasado' ELSE 'pendente' END,
+           count(*),
+           sum(e.original_amount),
+           sum(e.saldo),
+           sum(e.original_amount * e.interest_rate / 100),
+           coalesce(sum(e.original_amount * 0.10) FILTER (WHERE p.role = 'employee'), 0),
+           true
+    FROM est e
+    LEFT JOIN profiles p ON p.id = e.owner_id
+    WHERE e.inicio <= p_date
+    GROUP BY 2, 3;
+  END IF;
+
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.take_portfolio_snapshot(date, boolean) FROM public, anon, authenticated;
@@ -0,0 +1,32 @@
+-- =============================================================
+-- MIGRATION V13 — Rodar no SQL Editor do Supabase
+-- Adiciona: índices da exportação para a contabilidade (exporter.py /
+-- export_data.py). A exportação percorre cada tabela em páginas keyset
+-- ordenadas por (coluna de data, id), com filtro opcional de dono e de
+-- período; sem estes índices cada página ordena a tabela inteira.
+-- =============================================================
+
+-- ---------------------------------------------------------------
+-- PAYMENTS (paid_at, id) — todos os donos e por dono
+-- ---------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS payments_paid_id_idx
+  ON public.payments (paid_at, id);
+
+CREATE INDEX IF NOT EXISTS payments_owner_paid_id_idx
+  ON public.payments (owner_id, paid_at, id);
+
+-- ---------------------------------------------------------------
+-- LOANS (due_date, id) — loans_open_due_idx (v8) só cobre os em aberto;
+-- por dono já existe loans_owner_due_date_idx (v8)
+-- ---------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS loans_due_id_idx
+  ON public.loans (due_date, id);
+
+-- ---------------------------------------------------------------
+-- CLIENTS (created_at, id) — todos os donos e por dono
+-- ---------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS clients_created_id_idx
+  ON public.clients (created_at, id);
+
+CREATE INDEX IF NOT EXISTS clients_owner_created_id_idx
+  ON public.clients (owner_id, created_at, id);
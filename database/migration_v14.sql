@@ -0,0 +1,65 @@
+-- =============================================================
+-- MIGRATION V14 — Rodar no SQL Editor do Supabase
+-- Adiciona: função cashflow_projection, que agrega no banco a Previsão
+-- de Recebimentos do Painel (antes o app baixava todos os contratos em
+-- aberto e projetava em cashflow.py). O app recebe uma linha por
+-- (dono, mês) em vez de um contrato por linha.
+-- =============================================================
+
+-- Mesma regra de cashflow.project: cada contrato em aberto paga juros
+-- (original_amount * interest_rate/100) todo mês a partir do mês do
+-- vencimento atual — ou do mês de p_start, se já venceu — até o fim da
+-- janela de p_months meses. O dia do vencimento não muda o mês (a âncora
+-- só é limitada ao fim do mês), então basta o mês da primeira parcela.
+-- Comissão: 10% do valor original por parcela para donos com role 'employee'.
+-- Parâmetros:
+--   p_months    tamanho da janela em meses (a partir do mês de p_start)
+--   p_owner_id  dono dos contratos (funcionário); NULL para o admin ver tudo
+--   p_start     data de referência (padrão: hoje)
+CREATE OR REPLACE FUNCTION public.cashflow_projection(
+  p_months   integer DEFAULT 12,
+  p_owner_id uuid    DEFAULT NULL,
+  p_start    date    DEFAULT current_date
+)
+RETURNS TABLE (
+  owner_id  uuid,
+  mes       date,
+  parcelas  bigint,
+  juros     numeric,
+  comissao  numeric
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH por_inicio AS (
+    -- Contratos agrupados pelo mês (0..p_months-1) da primeira parcela na janela
+    SELECT
+      l.owner_id,
+      greatest((extract(year FROM l.due_date) * 12 + extract(month FROM l.due_date))
+               - (extract(year FROM p_start) * 12 + extract(month FROM p_start)), 0)::integer AS inicio,
+      count(*) AS parcelas,
+      sum(l.original_amount * l.interest_rate / 100) AS juros,
+      coalesce(sum(l.original_amount * 0.10) FILTER (WHERE p.role = 'employee'), 0) AS comissao
+    FROM loans l
+    LEFT JOIN profiles p ON p.id = l.owner_id
+    WHERE l.status <> 'pago'
+      AND (p_owner_id IS NULL OR l.owner_id = p_owner_id)
+    GROUP BY 1, 2
+  )
+  -- Cada grupo paga em todos os meses a partir do seu início; meses sem parcela saem zerados
+  SELECT
+    g.owner_id,
+    (date_trunc('month', p_start) + make_interval(months => m))::date,
+    coalesce(sum(g.parcelas) FILTER (WHERE g.inicio <= m), 0)::bigint,
+    coalesce(sum(g.juros) FILTER (WHERE g.inicio <= m), 0),
+    coalesce(sum(g.comissao) FILTER (WHERE g.inicio <= m), 0)
+  FROM por_inicio g
+  CROSS JOIN generate_series(0, p_months - 1) AS m
+  GROUP BY g.owner_id, m
+  ORDER BY g.owner_id, m;
+$$;
+
+-- SECURITY DEFINER ignora RLS: só a service_role (usada pelo app) pode chamar
+REVOKE ALL ON FUNCTION public.cashflow_projection(integer, uuid, date) FROM public, anon, authenticated;
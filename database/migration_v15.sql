@@ -0,0 +1,38 @@
+-- =============================================================
+-- MIGRATION V15 — Rodar no SQL Editor do Supabase
+-- Troca cashflow_projection (v14) por open_loans_by_month: a Previsão de
+-- Recebimentos do Painel volta a ser calculada por cashflow.py (a única
+-- cópia da regra de juros/comissão). O banco só agrupa os contratos em
+-- aberto — o app recebe algumas centenas de grupos, não a carteira toda.
+-- =============================================================
+
+DROP FUNCTION IF EXISTS public.cashflow_projection(integer, uuid, date);
+
+-- Contratos em aberto por dono, mês de vencimento (1º dia do mês) e taxa,
+-- com a quantidade e os valores somados. O dia do vencimento não muda o mês
+-- das parcelas (a âncora só é limitada ao fim do mês), então o mês basta.
+-- p_owner_id: dono dos contratos (funcionário); NULL para o admin ver tudo.
+CREATE OR REPLACE FUNCTION public.open_loans_by_month(p_owner_id uuid DEFAULT NULL)
+RETURNS TABLE (
+  owner_id         uuid,
+  due_date         date,
+  interest_rate    numeric,
+  contratos        bigint,
+  original_amount  numeric,
+  remaining_amount numeric
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT l.owner_id, date_trunc('month', l.due_date)::date, l.interest_rate,
+         count(*), sum(l.original_amount), sum(l.remaining_amount)
+  FROM loans l
+  WHERE l.status <> 'pago'
+    AND (p_owner_id IS NULL OR l.owner_id = p_owner_id)
+  GROUP BY 1, 2, 3;
+$$;
+
+-- SECURITY DEFINER ignora RLS: só a service_role (usada pelo app) pode chamar
+REVOKE ALL ON FUNCTION public.open_loans_by_month(uuid) FROM public, anon, authenticated;
@@ -0,0 +1,77 @@
+-- =============================================================
+-- MIGRATION V4 — Rodar no SQL Editor do Supabase
+-- Tira do caminho interativo a promoção de contratos vencidos para
+-- 'atrasado': uma função com marcador persistido garante que o UPDATE
+-- rode no máximo uma vez por dia (ou por intervalo configurável), e o
+-- pg_cron (se disponível) agenda a execução diária às 00:05 (BRT).
+-- =============================================================
+
+-- 1. Marcadores de execução de rotinas ("última vez que rodou")
+CREATE TABLE IF NOT EXISTS public.job_markers (
+  name text primary key,
+  ran_at timestamp with time zone not null
+);
+
+-- Sem policies: apenas a service_role (que ignora RLS) acessa
+ALTER TABLE public.job_markers ENABLE ROW LEVEL SECURITY;
+
+-- ---------------------------------------------------------------
+-- 2. Promoção pendente -> atrasado
+--    Roda se a última execução foi em um dia anterior ou, quando
+--    p_min_interval é informado, se esse intervalo já passou.
+--    Retorna a quantidade de contratos promovidos ou -1 se não rodou.
+-- ---------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.promote_overdue_loans(p_min_interval interval DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_last  timestamp with time zone;
+  v_count integer;
+BEGIN
+  INSERT INTO job_markers (name, ran_at)
+  VALUES ('promote_overdue_loans', '-infinity')
+  ON CONFLICT (name) DO NOTHING;
+
+  -- Trava o marcador: chamadas simultâneas esperam e depois veem o novo ran_at
+  SELECT ran_at INTO v_last
+  FROM job_markers
+  WHERE name = 'promote_overdue_loans'
+  FOR UPDATE;
+
+  IF v_last::date >= current_date
+     AND (p_min_interval IS NULL OR v_last > now() - p_min_interval) THEN
+    RETURN -1;
+  END IF;
+
+  UPDATE loans
+  SET status = 'atrasado'
+  WHERE status = 'pendente'
+    AND due_date < current_date;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  UPDATE job_markers SET ran_at = now() WHERE name = 'promote_overdue_loans';
+  RETURN v_count;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.promote_overdue_loans(interval) FROM public, anon, authenticated;
+
+-- ---------------------------------------------------------------
+-- 3. Agendamento diário (03:05 UTC = 00:05 BRT) via pg_cron.
+--    Se a extensão não estiver habilitada, o robô diário e o app
+--    chamam a função (ela mesma evita execuções repetidas).
+-- ---------------------------------------------------------------
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule(
+      'promote-overdue-loans',
+      '5 3 * * *',
+      'SELECT public.promote_overdue_loans()'
+    );
+  END IF;
+END;
+$$;
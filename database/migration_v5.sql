@@ -0,0 +1,50 @@
+-- =============================================================
+-- MIGRATION V5 — Rodar no SQL Editor do Supabase
+-- Adiciona: função dashboard_summary, que agrega no banco os KPIs e
+-- a distribuição por status do Painel Financeiro. O app recebe no
+-- máximo uma linha por status em vez de todos os contratos.
+-- =============================================================
+
+-- Parâmetros (NULL = sem filtro):
+--   p_owner_id    dono dos contratos (funcionário); NULL para o admin ver tudo
+--   p_start/p_end período de vencimento (due_date)
+--   p_client_ids  clientes selecionados
+-- Comissão: 10% do valor original dos contratos de donos com role 'employee'
+-- (mesma regra usada antes no app; dono sem profile conta como admin).
+CREATE OR REPLACE FUNCTION public.dashboard_summary(
+  p_owner_id   uuid   DEFAULT NULL,
+  p_start      date   DEFAULT NULL,
+  p_end        date   DEFAULT NULL,
+  p_client_ids uuid[] DEFAULT NULL
+)
+RETURNS TABLE (
+  status                text,
+  contratos             bigint,
+  total_emprestado      numeric,
+  saldo_devedor         numeric,
+  juros_previstos       numeric,
+  comissao_funcionarios numeric
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT
+    l.status,
+    count(*),
+    coalesce(sum(l.original_amount), 0),
+    coalesce(sum(l.remaining_amount), 0),
+    coalesce(sum(l.original_amount * l.interest_rate / 100), 0),
+    coalesce(sum(l.original_amount * 0.10) FILTER (WHERE p.role = 'employee'), 0)
+  FROM loans l
+  LEFT JOIN profiles p ON p.id = l.owner_id
+  WHERE (p_owner_id IS NULL OR l.owner_id = p_owner_id)
+    AND (p_start IS NULL OR l.due_date >= p_start)
+    AND (p_end IS NULL OR l.due_date <= p_end)
+    AND (p_client_ids IS NULL OR l.client_id = ANY (p_client_ids))
+  GROUP BY l.status;
+$$;
+
+-- SECURITY DEFINER ignora RLS: só a service_role (usada pelo app) pode chamar
+REVOKE ALL ON FUNCTION public.dashboard_summary(uuid, date, date, uuid[]) FROM public, anon, authenticated;
@@ -0,0 +1,32 @@
+-- =============================================================
+-- MIGRATION V6 — Rodar no SQL Editor do Supabase
+-- Adiciona: chave única (owner_id, cpf) em clients, usada pela
+-- importação via CSV para gravar com upsert em lote sem duplicar
+-- clientes do mesmo dono.
+-- =============================================================
+
+-- 1. Unificar duplicados já existentes (senão o índice único não é criado):
+--    para cada (owner_id, cpf) fica o cadastro mais antigo; contratos e
+--    documentos das cópias passam para ele e as cópias são apagadas.
+--    Para conferir antes:
+--      SELECT owner_id, cpf, count(*) FROM public.clients
+--      GROUP BY owner_id, cpf HAVING count(*) > 1;
+CREATE TEMP TABLE clients_merge AS
+SELECT id AS dup_id,
+       first_value(id) OVER (PARTITION BY owner_id, cpf ORDER BY created_at, id) AS keep_id
+FROM public.clients;
+DELETE FROM clients_merge WHERE dup_id = keep_id;
+
+UPDATE public.loans l SET client_id = m.keep_id
+FROM clients_merge m WHERE l.client_id = m.dup_id;
+
+UPDATE public.client_documents d SET client_id = m.keep_id
+FROM clients_merge m WHERE d.client_id = m.dup_id;
+
+DELETE FROM public.clients c USING clients_merge m WHERE c.id = m.dup_id;
+
+DROP TABLE clients_merge;
+
+-- 2. Chave única
+CREATE UNIQUE INDEX IF NOT EXISTS clients_owner_cpf_key
+  ON public.clients (owner_id, cpf);
@@ -0,0 +1,92 @@
+-- =============================================================
+-- MIGRATION V7 — Rodar no SQL Editor do Supabase
+-- Adiciona: função next_due_date (mesma regra do app) e a função
+-- register_payment, que registra a baixa de um pagamento numa única
+-- transação: insere em payments, atualiza saldo/status/vencimento do
+-- contrato e a reputação do cliente. Uma chamada, sem gravações parciais.
+-- =============================================================
+
+-- ---------------------------------------------------------------
+-- 1. Próximo vencimento: mês seguinte ao vencimento atual, no dia
+--    âncora, limitado ao último dia do mês (ex: âncora 31 em fev -> 28/29)
+-- ---------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.next_due_date(p_anchor_day integer, p_current date)
+RETURNS date
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT (date_trunc('month', p_current) + interval '1 month')::date
+         + (LEAST(
+              p_anchor_day,
+              EXTRACT(DAY FROM date_trunc('month', p_current) + interval '2 months' - interval '1 day')::int
+            ) - 1);
+$$;
+
+-- ---------------------------------------------------------------
+-- 2. Baixa de pagamento
+--    p_payment_type: JUROS (saldo mantido), AMORTIZACAO (abate o que
+--    exceder os juros da parcela) ou QUITACAO (saldo zerado).
+--    Juros da parcela = valor original * taxa / 100.
+--    Retorna o contrato atualizado.
+-- ---------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.register_payment(
+  p_loan_id      uuid,
+  p_amount       numeric,
+  p_payment_type text,
+  p_paid_at      date,
+  p_owner_id     uuid,
+  p_proof_url    text DEFAULT NULL
+)
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  l       loans%ROWTYPE;
+  v_juros numeric;
+  v_saldo numeric;
+BEGIN
+  -- Trava o contrato: duas baixas simultâneas não leem o mesmo saldo
+  SELECT * INTO l FROM loans WHERE id = p_loan_id FOR UPDATE;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Contrato % não encontrado', p_loan_id;
+  END IF;
+  IF l.status = 'pago' THEN
+    RAISE EXCEPTION 'Contrato % já está quitado', p_loan_id;
+  END IF;
+
+  v_juros := l.original_amount * l.interest_rate / 100;
+  v_saldo := CASE p_payment_type
+               WHEN 'JUROS'       THEN l.remaining_amount
+               WHEN 'AMORTIZACAO' THEN l.remaining_amount - (p_amount - v_juros)
+               WHEN 'QUITACAO'    THEN 0
+             END;
+  IF v_saldo IS NULL THEN
+    RAISE EXCEPTION 'Tipo de pagamento inválido: %', p_payment_type;
+  END IF;
+
+  UPDATE clients
+  SET reputation = CASE WHEN p_paid_at <= l.due_date THEN 'BOM' ELSE 'RUIM' END
+  WHERE id = l.client_id;
+
+  INSERT INTO payments (loan_id, amount, payment_type, paid_at, owner_id, proof_url)
+  VALUES (l.id, p_amount, p_payment_type, p_paid_at, p_owner_id, p_proof_url);
+
+  -- Não quitado: avança o vencimento pelo dia âncora
+  UPDATE loans
+  SET remaining_amount = v_saldo,
+      status   = CASE WHEN v_saldo <= 0.5 THEN 'pago' ELSE 'pendente' END,
+      due_date = CASE
+                   WHEN v_saldo > 0.5
+                   THEN next_due_date(COALESCE(l.due_day, EXTRACT(DAY FROM l.due_date)::int), l.due_date)
+                   ELSE l.due_date
+                 END
+  WHERE id = l.id
+  RETURNING * INTO l;
+
+  RETURN row_to_json(l);
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.register_payment(uuid, numeric, text, date, uuid, text) FROM public, anon, authenticated;
@@ -0,0 +1,64 @@
+-- =============================================================
+-- MIGRATION V8 — Rodar no SQL Editor do Supabase
+-- Adiciona: índices para os caminhos mais usados pelo app e pelo
+-- robô de cobrança (até aqui só existiam as chaves primárias).
+-- Para medir o ganho: python -m benchmarks.bench_indexes
+-- =============================================================
+
+-- Busca por trecho (ilike '%termo%') em nome/CPF
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ---------------------------------------------------------------
+-- 1. LOANS
+-- ---------------------------------------------------------------
+-- promote_overdue_loans (status = 'pendente' AND due_date < hoje) e
+-- consulta do robô (status IN (...) AND due_date <= hoje)
+CREATE INDEX IF NOT EXISTS loans_status_due_date_idx
+  ON public.loans (status, due_date);
+
+-- Contratos em aberto por dono: alertas do painel e Baixa de Pagamentos
+-- (paginação por due_date, id)
+CREATE INDEX IF NOT EXISTS loans_open_owner_due_idx
+  ON public.loans (owner_id, due_date, id) WHERE status <> 'pago';
+
+-- Mesma listagem para o admin (sem filtro de dono)
+CREATE INDEX IF NOT EXISTS loans_open_due_idx
+  ON public.loans (due_date, id) WHERE status <> 'pago';
+
+-- apply_owner_filter + período de vencimento (grade/indicadores do painel)
+CREATE INDEX IF NOT EXISTS loans_owner_due_date_idx
+  ON public.loans (owner_id, due_date);
+
+-- Contratos de um cliente (Base de Clientes, Novo Contrato, exclusão)
+CREATE INDEX IF NOT EXISTS loans_client_id_idx
+  ON public.loans (client_id);
+
+-- ---------------------------------------------------------------
+-- 2. CLIENTS
+-- ---------------------------------------------------------------
+-- Paginação por (name, id), do funcionário e do admin
+CREATE INDEX IF NOT EXISTS clients_owner_name_idx
+  ON public.clients (owner_id, name, id);
+CREATE INDEX IF NOT EXISTS clients_name_id_idx
+  ON public.clients (name, id);
+
+-- "Buscar (Nome/CPF)": name.ilike.%termo% / cpf.ilike.%termo%
+CREATE INDEX IF NOT EXISTS clients_name_trgm_idx
+  ON public.clients USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS clients_cpf_trgm_idx
+  ON public.clients USING gin (cpf gin_trgm_ops);
+
+-- ---------------------------------------------------------------
+-- 3. DEMAIS TABELAS
+-- ---------------------------------------------------------------
+-- "Já notificado hoje?" (loan_id IN (...) AND sent_at >= hoje)
+CREATE INDEX IF NOT EXISTS notification_logs_loan_sent_idx
+  ON public.notification_logs (loan_id, sent_at);
+
+-- Histórico de pagamentos por contrato, mais recentes primeiro
+CREATE INDEX IF NOT EXISTS payments_loan_paid_idx
+  ON public.payments (loan_id, paid_at DESC);
+
+-- Documentos de um cliente
+CREATE INDEX IF NOT EXISTS client_documents_client_idx
+  ON public.client_documents (client_id);
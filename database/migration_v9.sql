@@ -0,0 +1,28 @@
+-- =============================================================
+-- MIGRATION V9 — Rodar no SQL Editor do Supabase
+-- Adiciona: miniatura dos documentos (client_documents.thumb_url)
+-- e a tabela storage_uploads, que guarda o tamanho original x
+-- armazenado de cada envio para medir a economia do estágio de
+-- redução de imagens.
+-- =============================================================
+
+ALTER TABLE public.client_documents ADD COLUMN IF NOT EXISTS thumb_url text;
+
+CREATE TABLE IF NOT EXISTS public.storage_uploads (
+  id uuid DEFAULT gen_random_uuid() PRIMARY KEY,
+  created_at timestamp with time zone DEFAULT timezone('utc'::text, now()) NOT NULL,
+  owner_id uuid REFERENCES public.profiles(id),
+  path text NOT NULL,
+  thumb_url text,
+  original_size bigint NOT NULL,
+  stored_size bigint NOT NULL
+);
+
+-- Só o service_role (app) grava/lê
+ALTER TABLE public.storage_uploads ENABLE ROW LEVEL SECURITY;
+
+-- Economia acumulada:
+--   SELECT count(*), pg_size_pretty(sum(original_size)) AS original,
+--          pg_size_pretty(sum(stored_size)) AS armazenado,
+--          round(100 - 100.0 * sum(stored_size) / nullif(sum(original_size), 0), 1) AS economia_pct
+--   FROM public.storage_uploads;
@@ -0,0 +1,68 @@
+"""Utilitários compartilhados de acesso ao Supabase (app e robô de cobrança)."""
+
+# Quantidade máxima de valores por filtro in_ — mantém a URL do PostgREST em tamanho seguro
+IN_CHUNK_SIZE = 200
+# Quantidade de linhas por insert em lote
+INSERT_CHUNK_SIZE = 500
+
+
+def chunked(values, size):
+    """Divide uma sequência em listas de até `size` elementos."""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def select_in(make_query, column, values, size=IN_CHUNK_SIZE):
+    """
+    Executa `make_query().in_(column, lote)` para cada lote de valores
+    (sem repetição) e devolve todas as linhas numa única lista.
+    `make_query` deve criar uma query nova a cada chamada.
+    """
+    rows = []
+    for chunk in chunked(dict.fromkeys(values), size):
+        rows.extend(make_query().in_(column, chunk).execute().data or [])
+    return rows
+
+
+def insert_chunked(client, table, rows, size=INSERT_CHUNK_SIZE):
+    """Insere as linhas em lotes de até `size` (um round trip por lote)."""
+    for chunk in chunked(rows, size):
+        client.table(table).insert(chunk).execute()
+
+
+def _quote(value):
+    """Valor entre aspas para filtros lógicos (or/and) do PostgREST."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def keyset_page(query, sort_col, after=None, limit=25, id_col="id"):
+    """
+    Página de `query` ordenada por (sort_col, id_col), começando logo depois
+    do cursor `after` — a tupla (valor, id) da última linha da página anterior.
+    Usa o índice em vez de OFFSET, então a página N custa o mesmo que a 1ª.
+    Retorna (linhas, cursor da próxima página ou None se for a última).
+    """
+    if after is not None:
+        value, last_id = after
+        # O gte (redundante com o or) vira condição do índice: sem ele o Postgres
+        # percorre e descarta todas as linhas das páginas anteriores
+        query = query.gte(sort_col, value).or_(
+            f"{sort_col}.gt.{_quote(value)},"
+            f"and({sort_col}.eq.{_quote(value)},{id_col}.gt.{_quote(last_id)})"
+        )
+    rows = query.order(sort_col).order(id_col).limit(limit + 1).execute().data or []
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][sort_col], rows[-1][id_col])
+
+
+def iter_keyset(make_query, sort_col, page_size=1000, id_col="id"):
+    """Percorre todas as linhas de `make_query()` em páginas keyset de `page_size`."""
+    after = None
+    while True:
+        rows, after = keyset_page(make_query(), sort_col, after, page_size, id_col)
+        yield from rows
+        if after is None:
+            return
@@ -0,0 +1,56 @@
+"""
+Regras de vencimento mensal dos contratos.
+
+Todo vencimento usa o dia âncora (due_day) do contrato, limitado ao último
+dia do mês (âncora 31 em fevereiro → 28/29, em março → 31). A mesma regra
+existe em SQL em database/migration_v7.sql (next_due_date, usada por register_payment).
+
+`next_due_date` trata um contrato; `add_months` faz o mesmo para arrays
+inteiros com numpy datetime64, sem laço em Python.
+"""
+import calendar
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+def next_due_date(anchor_day, current_due):
+    """Retorna a data de vencimento do próximo mês.
+    Sempre usa anchor_day como dia de referência, respeitando o
+    último dia do mês alvo (ex: âncora 30 em fev → 28/29, em mar → 30)."""
+    next_month = current_due.month + 1
+    next_year  = current_due.year
+    if next_month > 12:
+        next_month = 1
+        next_year += 1
+    last_day = calendar.monthrange(next_year, next_month)[1]
+    return date(next_year, next_month, min(anchor_day, last_day))
+
+
+def add_months(anchor_days, due_dates, months=1):
+    """
+    Versão vetorizada de `next_due_date` aplicada `months` vezes: para cada
+    contrato, o vencimento `months` meses depois de `due_dates`, no dia
+    âncora limitado ao fim do mês. Como a âncora não muda, avançar N meses
+    de uma vez dá o mesmo resultado que N chamadas seguidas.
+
+    Os argumentos são combinados por broadcasting (ex: due_dates[:, None] e
+    np.arange(12) geram a agenda de 12 meses de cada contrato).
+    Retorna datetime64[D].
+    """
+    due = np.asarray(due_dates, dtype="datetime64[D]")
+    target = due.astype("datetime64[M]") + np.asarray(months, dtype=np.int64)
+    first = target.astype("datetime64[D]")
+    month_len = ((target + 1).astype("datetime64[D]") - first).astype(np.int64)
+    day = np.minimum(np.asarray(anchor_days, dtype=np.int64), month_len)
+    return first + (day - 1)
+
+
+def anchor_days(due_days, due_dates):
+    """Dia âncora de cada contrato: due_day, ou o dia do vencimento atual quando vazio (contratos antigos)."""
+    due = np.asarray(due_dates, dtype="datetime64[D]")
+    fallback = (due - due.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64) + 1
+    days = np.asarray(pd.to_numeric(due_days, errors="coerce"), dtype=float)  # None/vazio -> NaN
+    return np.where(np.isnan(days), fallback, days).astype(np.int64)
+
@@ -0,0 +1,89 @@
+"""
+Exporta contratos, pagamentos e clientes para CSV ou Parquet (contabilidade).
+
+As tabelas são lidas em páginas keyset e gravadas no arquivo página a
+página (exporter.py), então a memória não cresce com o histórico.
+Filtros: período pela coluna de data de cada tabela (pagamentos: paid_at,
+contratos: due_date, clientes: created_at) e dono (id ou e-mail).
+
+Uso:
+    python export_data.py                                   # as três tabelas, CSV
+    python export_data.py payments --from 2025-01-01 --to 2025-12-31 --format parquet
+    python export_data.py loans --owner funcionario@empresa.com --out exports/
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import exporter
+from instrumentation import CallRecorder, instrument
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+
+def resolve_owner(client, owner):
+    """Aceita o id do perfil ou o e-mail; retorna o id."""
+    if not owner or "@" not in owner:
+        return owner
+    rows = client.table("profiles").select("id").eq("email", owner).execute().data
+    if not rows:
+        raise SystemExit(f"ERRO: nenhum usuário com e-mail {owner}")
+    return rows[0]["id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("datasets", nargs="*", metavar="tabela",
+                        help=f"tabelas a exportar ({', '.join(exporter.DATASETS)}; padrão: todas)")
+    parser.add_argument("--format", choices=list(exporter.FORMATS), default="csv")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="data inicial (AAAA-MM-DD, inclusive)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="data final (AAAA-MM-DD, inclusive)")
+    parser.add_argument("--owner", help="só os registros deste dono (id ou e-mail)")
+    parser.add_argument("--out", default=".", help="pasta de saída")
+    parser.add_argument("--page-size", type=int, default=exporter.PAGE_SIZE, help="linhas por página na leitura")
+    parser.add_argument("--delimiter", default=",", help="separador do CSV (ex: ';' para o Excel em português)")
+    args = parser.parse_args()
+    unknown = set(args.datasets) - set(exporter.DATASETS)
+    if unknown:
+        parser.error(f"tabela inválida: {', '.join(sorted(unknown))} (use {', '.join(exporter.DATASETS)})")
+
+    if args.format == "parquet" and not exporter.parquet_available():
+        print("ERRO: exportar Parquet requer o pyarrow (pip install pyarrow)")
+        sys.exit(1)
+
+    url, key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        raise ValueError("Variáveis SUPABASE_URL e SUPABASE_SERVICE_KEY não configuradas.")
+    from supabase import create_client
+    recorder = CallRecorder("export", os.getenv("QUERY_LOG_FILE"))
+    client = instrument(create_client(url, key), recorder)
+    recorder.start_rerun()
+
+    owner = resolve_owner(client, args.owner)
+    os.makedirs(args.out, exist_ok=True)
+    print(f"--- Exportação ({args.format}, período {args.start or 'início'} a {args.end or 'hoje'}"
+          f"{f', dono {args.owner}' if owner else ''}) ---")
+    for dataset in args.datasets or exporter.DATASETS:
+        path = os.path.join(args.out, exporter.file_name(dataset, args.format, args.start, args.end))
+        t0 = time.perf_counter()
+
+        def progress(n):
+            print(f"\r  {dataset}: {n} linhas...", end="", flush=True)
+
+        n = exporter.export(client, dataset, path, args.format, args.start, args.end, owner,
+                            args.page_size, progress, args.delimiter)
+        print(f"\r  {dataset}: {n} linhas em {time.perf_counter() - t0:.1f}s → {path} "
+              f"({os.path.getsize(path) / 1024:.0f} KB)")
+
+    summary = recorder.finish()
+    print(f"Supabase: {summary['calls']} chamadas, {summary['ms']:.0f} ms, {summary['rows']} linhas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Exportação de contratos, pagamentos e clientes para a contabilidade (CSV ou Parquet).
+
+Cada tabela é lida em páginas keyset (db_utils.keyset_page) ordenadas pela
+sua coluna de data e gravada no arquivo página a página, a partir de um
+gerador: a memória fica no tamanho de uma página, não do histórico todo.
+Usado pela página "Exportar Dados" (views/exportar.py) e pelo export_data.py.
+Parquet precisa do pyarrow (opcional).
+"""
+import csv
+import importlib.util
+from datetime import date, timedelta
+
+from db_utils import keyset_page
+
+PAGE_SIZE = 1000
+
+# Tabela -> select, coluna de data (filtro de período e ordem do keyset) e
+# colunas do arquivo com o tipo usado no Parquet. Os joins embutidos viram
+# colunas "<tabela no singular>_<campo>" (ex: profiles(name) -> profile_name).
+DATASETS = {
+    "payments": {
+        "label": "Pagamentos",
+        "select": "id, paid_at, loan_id, owner_id, payment_type, amount, proof_url, created_at, profiles(name, email)",
+        "date_col": "paid_at",
+        "columns": [
+            ("id", "text"), ("paid_at", "date"), ("loan_id", "text"), ("owner_id", "text"),
+            ("profile_name", "text"), ("profile_email", "text"), ("payment_type", "text"),
+            ("amount", "numeric"), ("proof_url", "text"), ("created_at", "timestamp"),
+        ],
+    },
+    "loans": {
+        "label": "Contratos",
+        "select": ("id, due_date, client_id, owner_id, status, original_amount, remaining_amount, "
+                   "interest_rate, due_day, clients(name, cpf)"),
+        "date_col": "due_date",
+        "columns": [
+            ("id", "text"), ("due_date", "date"), ("client_id", "text"), ("client_name", "text"),
+            ("client_cpf", "text"), ("owner_id", "text"), ("status", "text"), ("original_amount", "numeric"),
+            ("remaining_amount", "numeric"), ("interest_rate", "numeric"), ("due_day", "integer"),
+        ],
+    },
+    "clients": {
+        "label": "Clientes",
+        "select": "id, created_at, name, cpf, rg, phone, email, address, reference_contact, reputation, owner_id",
+        "date_col": "created_at",
+        "columns": [
+            ("id", "text"), ("created_at", "timestamp"), ("name", "text"), ("cpf", "text"), ("rg", "text"),
+            ("phone", "text"), ("email", "text"), ("address", "text"), ("reference_contact", "text"),
+            ("reputation", "text"), ("owner_id", "text"),
+        ],
+    },
+}
+FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def file_name(dataset, fmt, start=None, end=None):
+    """Nome do arquivo: tabela + período (ou a data de hoje) + extensão."""
+    period = f"_{start or 'inicio'}_{end or 'hoje'}" if start or end else f"_{date.today()}"
+    return f"{dataset}{period}{FORMATS[fmt]}"
+
+
+def _flatten(row):
+    out = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            prefix = key[:-1] if key.endswith("s") else key
+            out.update({f"{prefix}_{k}": v for k, v in value.items()})
+        else:
+            out[key] = value
+    return out
+
+
+def _filtered(q, dataset, start, end, owner):
+    """`start`/`end` (datas, inclusive) filtram pela coluna de data; `owner` pelo owner_id."""
+    date_col = DATASETS[dataset]["date_col"]
+    if start:
+        q = q.gte(date_col, str(start))
+    if end:
+        # lt no dia seguinte inclui o dia todo também nas colunas timestamp (created_at)
+        q = q.lt(date_col, str(end + timedelta(days=1)))
+    if owner:
+        q = q.eq("owner_id", owner)
+    return q
+
+
+def iter_pages(client, dataset, start=None, end=None, owner=None, page_size=PAGE_SIZE):
+    """
+    Gera as linhas de `dataset` (com os filtros de _filtered) em listas de
+    até `page_size`, na ordem (coluna de data, id).
+    """
+    spec = DATASETS[dataset]
+    after = None
+    while True:
+        query = _filtered(client.table(dataset).select(spec["select"]), dataset, start, end, owner)
+        rows, after = keyset_page(query, spec["date_col"], after, page_size)
+        if rows:
+            yield [_flatten(r) for r in rows]
+        if after is None:
+            return
+
+
+def write_csv(pages, path, columns, delimiter=",", progress=None):
+    """Grava as páginas num CSV (UTF-8 com BOM, abre direto no Excel). Retorna o nº de linhas."""
+    total = 0
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, delimiter=delimiter, extrasaction="ignore")
+        writer.writeheader()
+        for rows in pages:
+            writer.writerows(rows)
+            total += len(rows)
+            if progress: progress(total)
+    return total
+
+
+def _arrow_schema(columns):
+    import pyarrow as pa
+    types = {"text": pa.string(), "numeric": pa.float64(), "integer": pa.int64(),
+             "date": pa.date32(), "timestamp": pa.timestamp("us", tz="UTC")}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def write_parquet(pages, path, columns, progress=None):
+    """Grava cada página como um row group do Parquet (schema fixo). Retorna o nº de linhas."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = _arrow_schema(columns)
+    total = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for rows in pages:
+            arrays = []
+            for (name, kind), field in zip(columns, schema):
+                values = [r.get(name) for r in rows]
+                if kind in ("date", "timestamp"):
+                    # Datas chegam como texto ISO do PostgREST: o cast do arrow converte
+                    arrays.append(pa.array(values, type=pa.string()).cast(field.type))
+                else:
+                    arrays.append(pa.array(values, type=field.type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            total += len(rows)
+            if progress: progress(total)
+    return total
+
+
+def count_rows(client, dataset, start=None, end=None, owner=None):
+    """Total de linhas do filtro (para a barra de progresso); None se o banco não informar."""
+    q = _filtered(client.table(dataset).select("id", count="exact"), dataset, start, end, owner)
+    return q.limit(1).execute().count
+
+
+def export(client, dataset, path, fmt="csv", start=None, end=None, owner=None,
+           page_size=PAGE_SIZE, progress=None, delimiter=","):
+    """Exporta `dataset` para `path` no formato `fmt`. Retorna o nº de linhas gravadas."""
+    columns = DATASETS[dataset]["columns"]
+    pages = iter_pages(client, dataset, start, end, owner, page_size)
+    if fmt == "parquet":
+        return write_parquet(pages, path, columns, progress)
+    return write_csv(pages, path, [name for name, _ in columns], delimiter, progress)
@@ -0,0 +1,254 @@
+"""
+Instrumentação das chamadas ao Supabase (app e robô de cobrança).
+
+`instrument(client, recorder)` devolve um proxy do client que mede cada
+round trip — tabela/função, operação, filtros (só colunas e operadores,
+nunca os valores), linhas e latência — e entrega ao `CallRecorder`. O
+recorder agrupa as chamadas por rerun e por página e emite cada uma como
+uma linha JSON no logger "instrumentation" (e, se configurado, num
+arquivo .jsonl).
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger("instrumentation")
+
+# Operações que definem o tipo da query; os demais métodos do builder são filtros/modificadores
+QUERY_OPS = {"select", "insert", "upsert", "update", "delete"}
+# Métodos de storage/auth que não fazem requisição
+LOCAL_METHODS = {"get_public_url"}
+# Quantas chamadas cada recorder guarda para o painel/exportação
+MAX_CALLS = 500
+
+# Várias sessões podem escrever no mesmo arquivo de log
+_file_lock = threading.Lock()
+
+
+# Métodos do builder cujos argumentos são só colunas e paginação: vão inteiros para o log
+PLAIN_METHODS = {"order", "limit", "range", "offset"}
+
+
+def _short(value, limit=40):
+    """Argumento sem dados de cliente para o log: textos longos são cortados."""
+    text = str(value)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _mask(value):
+    """Valor de filtro para o log: nomes e CPFs não podem ir para o arquivo; listas viram contagem."""
+    if isinstance(value, (list, tuple, set)):
+        return f"<{len(value)} valores>"
+    return "?"
+
+
+def _describe(name, args):
+    """Filtro para o log: coluna e operador, nunca o valor (or_ é texto livre com valores)."""
+    if name in PLAIN_METHODS:
+        return f"{name}({', '.join(_short(a) for a in args)})"
+    if name == "or_" or not args or not isinstance(args[0], str):
+        return f"{name}({', '.join(_mask(a) for a in args)})"
+    keep = 2 if name == "filter" else 1  # filter(coluna, operador, valor)
+    return f"{name}({', '.join([_short(a) for a in args[:keep]] + [_mask(a) for a in args[keep:]])})"
+
+
+def _rows(data):
+    if isinstance(data, list):
+        return len(data)
+    return 0 if data is None else 1
+
+
+class CallRecorder:
+    """
+    Guarda as chamadas do rerun atual, as últimas MAX_CALLS e o agregado
+    por página. Seguro para uso por várias threads (uploads em paralelo).
+    """
+
+    def __init__(self, source="app", log_file=None):
+        self.source = source
+        self.rerun = 0
+        self.page = None
+        self.current = []                  # chamadas do rerun em andamento
+        self.last = None                   # resumo do último rerun concluído
+        self.recent = deque(maxlen=MAX_CALLS)
+        self.pages = {}                    # página -> {'reruns', 'calls', 'ms', 'rows'}
+        self._lock = threading.Lock()
+        self._file = log_file
+
+    def start_rerun(self):
+        """Fecha o rerun anterior (agrega na página dele) e começa um novo."""
+        with self._lock:
+            if self.rerun:
+                self._finish()
+            self.rerun += 1
+            self.page = None
+            self.current = []
+
+    def _finish(self):
+        calls = self.current
+        page = self.page or "(sem página)"
+        summary = {
+            "event": "rerun", "source": self.source, "rerun": self.rerun, "page": page,
+            "calls": len(calls), "ms": round(sum(c["ms"] for c in calls), 1),
+            "rows": sum(c["rows"] for c in calls), "errors": sum(1 for c in calls if c["error"]),
+            "by_target": summarize(calls),
+        }
+        agg = self.pages.setdefault(page, {"reruns": 0, "calls": 0, "ms": 0.0, "rows": 0})
+        agg["reruns"] += 1
+        agg["calls"] += summary["calls"]
+        agg["ms"] += summary["ms"]
+        agg["rows"] += summary["rows"]
+        self.last = summary
+        self._emit(summary)
+
+    def finish(self):
+        """Fecha o rerun atual (ex: fim do robô de cobrança) e devolve o resumo."""
+        with self._lock:
+            self._finish()
+            self.current = []
+            return self.last
+
+    def record(self, kind, target, op, filters, rows, ms, error=None):
+        call = {
+            "event": "call", "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "source": self.source, "rerun": self.rerun, "page": self.page,
+            "kind": kind, "target": target, "op": op, "filters": filters,
+            "rows": rows, "ms": round(ms, 2), "error": error,
+        }
+        with self._lock:
+            self.current.append(call)
+            self.recent.append(call)
+        self._emit(call)
+
+    def _emit(self, event):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        logger.info(line)
+        if self._file:
+            with _file_lock, open(self._file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def export_jsonl(self):
+        """Chamadas recentes em JSON Lines (para download)."""
+        with self._lock:
+            return "".join(json.dumps(c, ensure_ascii=False, default=str) + "\n" for c in self.recent)
+
+
+def summarize(calls):
+    """Agrega chamadas por (tipo, alvo, operação): quantidade, ms total/máximo e linhas."""
+    out = {}
+    for c in calls:
+        key = f"{c['kind']}:{c['target']}.{c['op']}"
+        s = out.setdefault(key, {"calls": 0, "ms": 0.0, "max_ms": 0.0, "rows": 0})
+        s["calls"] += 1
+        s["ms"] = round(s["ms"] + c["ms"], 2)
+        s["max_ms"] = max(s["max_ms"], c["ms"])
+        s["rows"] += c["rows"]
+    return dict(sorted(out.items(), key=lambda kv: -kv[1]["ms"]))
+
+
+class _QueryProxy:
+    """Embrulha o builder do postgrest; acumula operação e filtros até o execute()."""
+
+    def __init__(self, builder, recorder, kind, target, op=None, filters=()):
+        self._builder = builder
+        self._recorder = recorder
+        self._kind, self._target, self._op, self._filters = kind, target, op, filters
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if name == "execute":
+            return self._execute
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, "execute"):
+                return result
+            if name in QUERY_OPS:
+                return _QueryProxy(result, self._recorder, self._kind, self._target, name, self._filters)
+            desc = _describe(name, args)
+            return _QueryProxy(result, self._recorder, self._kind, self._target, self._op, self._filters + (desc,))
+        return call
+
+    def _execute(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            res = self._builder.execute(*args, **kwargs)
+        except Exception as e:
+            self._recorder.record(self._kind, self._target, self._op or "select", list(self._filters), 0,
+                                  (time.perf_counter() - t0) * 1000, error=str(e)[:200])
+            raise
+        self._recorder.record(self._kind, self._target, self._op or "select", list(self._filters),
+                              _rows(getattr(res, "data", None)), (time.perf_counter() - t0) * 1000)
+        return res
+
+
+class _MethodProxy:
+    """Embrulha storage/auth: cada chamada de método (exceto as locais) é medida."""
+
+    def __init__(self, obj, recorder, kind, target, nested=()):
+        self._obj, self._recorder, self._kind, self._target = obj, recorder, kind, target
+        self._nested = nested
+
+    def __getattr__(self, name):
+        attr = getattr(self._obj, name)
+        if name in self._nested:
+            return _MethodProxy(attr, self._recorder, self._kind, f"{self._target}.{name}")
+        if not callable(attr) or name.startswith("_") or name in LOCAL_METHODS:
+            return attr
+
+        def call(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                self._recorder.record(self._kind, self._target, name, [], 0,
+                                      (time.perf_counter() - t0) * 1000, error=str(e)[:200])
+                raise
+            self._recorder.record(self._kind, self._target, name, [], _rows(getattr(result, "data", None)),
+                                  (time.perf_counter() - t0) * 1000)
+            return result
+        return call
+
+
+class _StorageProxy:
+    def __init__(self, storage, recorder):
+        self._storage, self._recorder = storage, recorder
+
+    def from_(self, bucket):
+        return _MethodProxy(self._storage.from_(bucket), self._recorder, "storage", bucket)
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+
+class InstrumentedClient:
+    """Proxy do client supabase com a mesma interface (table/from_/rpc/storage/auth)."""
+
+    def __init__(self, client, recorder):
+        self._client = client
+        self.recorder = recorder
+        self.storage = _StorageProxy(client.storage, recorder)
+        self.auth = _MethodProxy(client.auth, recorder, "auth", "auth", nested=("admin",))
+
+    def table(self, name):
+        return _QueryProxy(self._client.table(name), self.recorder, "table", name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None, *args, **kwargs):
+        builder = self._client.rpc(fn, params or {}, *args, **kwargs)
+        keys = tuple(f"{k}={_mask(v)}" for k, v in (params or {}).items() if v is not None)
+        return _QueryProxy(builder, self.recorder, "rpc", fn, "call", keys)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def instrument(client, recorder):
+    """Devolve o client embrulhado; chamadas vão para `recorder`."""
+    return InstrumentedClient(client, recorder)
@@ -0,0 +1,38 @@
+"""Cache de leituras do Supabase com TTL, descarte LRU e invalidação por tabela."""
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Guarda resultados de queries por chave. Cada entrada lembra as tabelas
+    de que depende, para que uma escrita invalide só o que ela afeta.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # chave -> (expira_em, tabelas, valor)
+
+    def get_or_fetch(self, key, tables, fetch):
+        """Devolve o valor em cache para `key` ou executa `fetch()` e guarda."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            self._entries.move_to_end(key)
+            return entry[2]
+        value = fetch()
+        self._entries[key] = (now + self.ttl, frozenset(tables), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *tables):
+        """Remove as entradas que dependem de alguma das tabelas (todas, se nenhuma for informada)."""
+        if not tables:
+            self._entries.clear()
+            return
+        affected = set(tables)
+        for key in [k for k, e in self._entries.items() if e[1] & affected]:
+            del self._entries[key]
@@ -0,0 +1,159 @@
+"""
+Reconciliação em massa de vencimentos e status dos contratos.
+
+Refaz a correção da migration_v3 para os contratos que ela não pegou: o
+código antigo registrava o pagamento de juros/amortização sem avançar o
+vencimento. Lê a carteira (loans) e os pagamentos de juros/amortização
+registrados antes de --registered-before numa passada só (páginas keyset) e:
+  - due_day vazio → dia do vencimento atual (como a migration_v3);
+  - contrato 'atrasado', com saldo, e com pagamento no/depois do vencimento
+    (o predicado da migration_v3) → due_date avança exatamente um mês no dia
+    âncora; fica 'pendente', ou 'atrasado' se o novo vencimento já passou.
+Os demais contratos não são tocados. Pagamentos feitos por register_payment
+(migration_v7) já avançaram o vencimento: --registered-before deve ser a data
+em que ela entrou no ar, senão esses contratos avançariam duas vezes.
+Só as diferenças são gravadas, agrupadas por valores novos e aplicadas com
+update().in_("id", lote). Cada update também filtra pelo due_date/status
+lidos, então um contrato alterado no meio do caminho não é sobrescrito.
+
+Uso:
+    python reconcile_due_dates.py --registered-before 2025-03-01             # simulação
+    python reconcile_due_dates.py --registered-before 2025-03-01 --apply     # grava as diferenças
+"""
+import argparse
+import os
+import time
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from db_utils import chunked, iter_keyset, IN_CHUNK_SIZE
+from duedates import add_months, anchor_days
+from instrumentation import CallRecorder, instrument
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# Tipos de pagamento que quitam a parcela do mês (QUITACAO encerra o contrato)
+INTEREST_TYPES = ["JUROS", "AMORTIZACAO"]
+# Saldo abaixo disso conta como quitado (mesma tolerância de register_payment)
+PAID_TOLERANCE = 0.5
+
+
+def scan(client, page_size, registered_before):
+    """Carteira e pagamentos de juros/amortização registrados antes de `registered_before` (DataFrames)."""
+    loans = pd.DataFrame(iter_keyset(
+        lambda: client.table("loans").select("id, status, due_date, due_day, remaining_amount"), "id", page_size),
+        columns=["id", "status", "due_date", "due_day", "remaining_amount"])
+    payments = pd.DataFrame(iter_keyset(
+        lambda: client.table("payments").select("id, loan_id, paid_at").in_("payment_type", INTEREST_TYPES)
+        .lt("created_at", str(registered_before)), "id", page_size), columns=["id", "loan_id", "paid_at"])
+    return loans, payments
+
+
+def reconcile(loans: pd.DataFrame, payments: pd.DataFrame, today: date) -> pd.DataFrame:
+    """
+    Valores corretos de due_date/due_day/status pela regra da migration_v3.
+    `payments` são só os pagamentos que o due_date ainda não reflete.
+    Retorna só os contratos que mudam, com as colunas antigas e as novas (new_*).
+    """
+    if loans.empty:
+        return loans.assign(new_due_date=[], new_due_day=[], new_status=[], months=[])
+    due = pd.to_datetime(loans["due_date"]).to_numpy(dtype="datetime64[D]")
+    anchors = anchor_days(loans["due_day"], due)
+    last_paid = pd.to_datetime(payments["paid_at"]).groupby(payments["loan_id"].to_numpy()).max()
+    after = last_paid.reindex(loans["id"].to_numpy()).to_numpy(dtype="datetime64[D]")
+
+    # Predicado da migration_v3 (NaT em `after` compara como falso)
+    stale = ((loans["status"] == "atrasado").to_numpy()
+             & (loans["remaining_amount"].astype(float).to_numpy() > PAID_TOLERANCE)
+             & (after >= due))
+    new_due = np.where(stale, add_months(anchors, due, 1), due)
+    # Um mês só: se o novo vencimento também já passou, a parcela continua atrasada
+    new_status = np.where(stale & (new_due >= np.datetime64(today, "D")), "pendente", loans["status"].to_numpy())
+
+    out = loans.assign(new_due_date=new_due.astype(str), new_due_day=anchors, new_status=new_status,
+                       months=stale.astype(int))
+    return out[stale | out["due_day"].isna().to_numpy()]
+
+
+def apply_diffs(client, diffs: pd.DataFrame, size=IN_CHUNK_SIZE):
+    """
+    Grava as diferenças: um update por grupo (valores lidos, valores novos) e
+    lote de ids. Retorna quantos contratos foram efetivamente alterados.
+    """
+    groups = defaultdict(list)
+    for row in diffs.itertuples(index=False):
+        key = (str(row.due_date), row.status, row.new_due_date, row.new_status, int(row.new_due_day))
+        groups[key].append(row.id)
+    updated = 0
+    for (old_due, old_status, new_due, new_status, due_day), ids in groups.items():
+        for chunk in chunked(ids, size):
+            res = (client.table("loans")
+                   .update({"due_date": new_due, "status": new_status, "due_day": due_day})
+                   .in_("id", chunk).eq("due_date", old_due).eq("status", old_status)
+                   .execute())
+            updated += len(res.data or [])
+    return updated, len(groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registered-before", type=date.fromisoformat, required=True,
+                        help="só pagamentos registrados antes desta data (AAAA-MM-DD) contam como não aplicados "
+                             "— a data em que a migration_v7 (register_payment) entrou no ar")
+    parser.add_argument("--apply", action="store_true", help="grava as diferenças (padrão: só simula)")
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today(),
+                        help="data de referência para 'atrasado' (AAAA-MM-DD)")
+    parser.add_argument("--page-size", type=int, default=1000, help="linhas por página na leitura")
+    parser.add_argument("--show", type=int, default=20, help="quantos contratos alterados listar")
+    args = parser.parse_args()
+
+    url, key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        raise ValueError("Variáveis SUPABASE_URL e SUPABASE_SERVICE_KEY não configuradas.")
+    from supabase import create_client
+    recorder = CallRecorder("reconcile", os.getenv("QUERY_LOG_FILE"))
+    client = instrument(create_client(url, key), recorder)
+    recorder.start_rerun()
+
+    t0 = time.perf_counter()
+    loans, payments = scan(client, args.page_size, args.registered_before)
+    t_scan = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    diffs = reconcile(loans, payments, args.today)
+    t_calc = time.perf_counter() - t0
+
+    print(f"--- Reconciliação de vencimentos ({'APLICANDO' if args.apply else 'simulação'}, referência {args.today}) ---")
+    print(f"Leitura: {len(loans)} contratos, {len(payments)} pagamentos de juros anteriores a "
+          f"{args.registered_before} em {t_scan:.2f}s")
+    print(f"Cálculo: {len(diffs)} contratos com diferença em {t_calc * 1000:.0f} ms")
+    if not diffs.empty:
+        print(f"  vencimento avançado um mês: {int(diffs['months'].sum())}")
+        for (old, new), n in diffs.groupby(["status", "new_status"]).size().items():
+            if old != new:
+                print(f"  status {old} → {new}: {n}")
+        print(f"  due_day preenchido: {int(diffs['due_day'].isna().sum())}")
+        for row in diffs.head(args.show).itertuples(index=False):
+            print(f"    {row.id}: {row.due_date} {row.status} → {row.new_due_date} {row.new_status}")
+
+    if args.apply and not diffs.empty:
+        t0 = time.perf_counter()
+        updated, n_groups = apply_diffs(client, diffs)
+        print(f"Gravação: {updated} contratos em {n_groups} grupos em {time.perf_counter() - t0:.2f}s"
+              + (f" ({len(diffs) - updated} alterados por outro processo e ignorados)" if updated < len(diffs) else ""))
+    elif not diffs.empty:
+        print("Nada foi gravado. Rode com --apply para aplicar.")
+
+    summary = recorder.finish()
+    print(f"Supabase: {summary['calls']} chamadas, {summary['ms']:.0f} ms, {summary['rows']} linhas")
+
+
+if __name__ == "__main__":
+    main()
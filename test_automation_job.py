@@ -0,0 +1,87 @@
+"""
+Testes do robô de cobrança (automation_job.py) contra o fake_supabase.
+
+Rodar na raiz do projeto: python -m pytest -q
+"""
+import os
+import signal
+import threading
+import time
+from datetime import date
+from unittest import mock
+
+import pytest
+import supabase
+
+from benchmarks.fake_supabase import FakeDB, FakeSupabase
+
+os.environ.setdefault("SUPABASE_URL", "http://fake.local")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "fake")
+DB = FakeDB()
+with mock.patch.object(supabase, "create_client", lambda *a, **k: FakeSupabase(DB)):
+    import automation_job
+
+
+def _loans(n):
+    today = date.today().isoformat()
+    return [{"id": f"loan-{i:04d}", "remaining_amount": 100.0, "due_date": today,
+             "clients": {"name": f"Cliente {i}", "phone": f"1199999{i:04d}"}} for i in range(n)]
+
+
+def test_interrupted_page_logs_every_sent_message():
+    """SIGTERM no meio da página: o que ainda não começou é cancelado e todo envio feito vai para o log."""
+    DB.tables["notification_logs"] = []
+    sent, lock = [], threading.Lock()
+
+    def slow_send(phone, message):
+        time.sleep(0.05)
+        with lock:
+            sent.append(phone)
+        return True
+
+    def terminate(*_):
+        raise SystemExit(1)  # o que o handler de SIGTERM do __main__ faz
+
+    loans = _loans(200)
+    logs = automation_job.NotificationLogBuffer()
+    totals = {"enviados": 0, "pulados": 0, "erros": 0, "enfileirados": 0}
+    previous = signal.signal(signal.SIGALRM, terminate)
+    try:
+        with mock.patch.object(automation_job, "send_whatsapp", slow_send):
+            signal.setitimer(signal.ITIMER_REAL, 0.3)
+            with pytest.raises(SystemExit):
+                try:
+                    automation_job.process_page(loans, date.today().isoformat(), logs, totals)
+                finally:
+                    logs.flush()
+            time.sleep(0.3)  # threads que ainda estivessem enviando
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+    phones = {l["id"]: l["clients"]["phone"] for l in loans}
+    logged = {phones[r["loan_id"]] for r in DB.tables["notification_logs"] if r["status"] == "success"}
+    assert sent, "nenhum envio antes da interrupção"
+    assert len(sent) < len(loans), "a interrupção não parou os envios"
+    assert set(sent) <= logged
+    assert totals["enviados"] == len(sent)
+
+
+def test_dispatch_keeps_at_most_concurrency_jobs_in_flight():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def send(phone, message):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return True
+
+    results = []
+    with mock.patch.object(automation_job, "send_whatsapp", send):
+        automation_job.dispatch([{"phone": str(i), "message": "oi"} for i in range(50)],
+                                lambda job, ok: results.append(ok), concurrency=4)
+    assert len(results) == 50 and all(results)
+    assert peak[0] <= 4
@@ -0,0 +1,63 @@
+"""
+Testes da projeção de recebimentos (cashflow.py), a regra usada pelo Painel.
+
+Rodar na raiz do projeto: python -m pytest -q
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import cashflow
+from benchmarks.bench_cashflow import synthetic_loans
+from benchmarks.fake_supabase import FakeDB, _rpc_open_loans_by_month
+
+START = date(2026, 10, 17)
+ROLES = {"func": "employee", "admin": "admin"}
+LOANS = [
+    # Vencida em setembro: entra em outubro; comissão sobre o saldo (500), não sobre o original
+    {"id": "a", "owner_id": "func", "original_amount": 1000, "remaining_amount": 500, "interest_rate": 10,
+     "due_date": "2026-09-10", "due_day": 10},
+    {"id": "b", "owner_id": "func", "original_amount": 2000, "remaining_amount": 2000, "interest_rate": 20,
+     "due_date": "2026-12-31", "due_day": 31},
+    # Dono admin: sem comissão; âncora 31 em novembro continua em novembro
+    {"id": "c", "owner_id": "admin", "original_amount": 1000, "remaining_amount": 1000, "interest_rate": 30,
+     "due_date": "2026-11-30", "due_day": 31},
+    # Fora da janela de 3 meses
+    {"id": "d", "owner_id": "admin", "original_amount": 5000, "remaining_amount": 5000, "interest_rate": 10,
+     "due_date": "2027-02-01", "due_day": None},
+]
+
+
+def _by_cell(out):
+    return {(r.owner_id, str(r.mes)[:7]): (r.parcelas, round(r.juros, 2), round(r.comissao, 2))
+            for r in out.itertuples(index=False)}
+
+
+def test_project_known_loans():
+    out = cashflow.project(LOANS, ROLES, months=3, start=START)
+    assert _by_cell(out) == {
+        ("func", "2026-10"): (1, 100.0, 50.0),
+        ("func", "2026-11"): (1, 100.0, 50.0),
+        ("func", "2026-12"): (2, 500.0, 250.0),
+        ("admin", "2026-10"): (0, 0.0, 0.0),
+        ("admin", "2026-11"): (1, 300.0, 0.0),
+        ("admin", "2026-12"): (1, 300.0, 0.0),
+    }
+    assert np.allclose(out["lucro"], out["juros"] - out["comissao"])
+
+
+def test_project_empty():
+    out = cashflow.project([], ROLES, months=6, start=START)
+    assert out.empty and list(out.columns) == ["owner_id", "mes", "parcelas", "juros", "comissao", "lucro"]
+
+
+def test_grouped_loans_match_one_row_per_loan():
+    """Os grupos de open_loans_by_month (aqui, a versão do fake_supabase) dão a mesma projeção."""
+    loans, roles = synthetic_loans(5000)
+    loans["status"] = np.where(np.arange(len(loans)) % 7 == 0, "pago", "pendente")
+    db = FakeDB()
+    db.tables["loans"] = loans.to_dict("records")
+    grouped = cashflow.project(_rpc_open_loans_by_month(db), roles, 12)
+    direct = cashflow.project(loans[loans["status"] != "pago"], roles, 12)
+    pd.testing.assert_frame_equal(grouped, direct, check_exact=False)
@@ -0,0 +1,53 @@
+"""
+Testes da importação de clientes via CSV (client_import.py) contra o fake_supabase.
+
+Rodar na raiz do projeto: python -m pytest -q
+"""
+import io
+from unittest import mock
+
+import client_import
+from benchmarks.fake_supabase import FakeDB, FakeSupabase
+
+OWNER = "dono-1"
+
+
+def _cpf(n):
+    base = [int(d) for d in f"{n:09d}"]
+    for w in (10, 11):
+        d = sum(x * (w - i) for i, x in enumerate(base)) * 10 % 11
+        base.append(0 if d == 10 else d)
+    return "".join(map(str, base))
+
+
+def _csv(cpfs):
+    lines = ["nome,cpf,celular,endereco,referencia"]
+    lines += [f"Cliente {i},{cpf},1198765{i:04d},Rua {i},Ref" for i, cpf in enumerate(cpfs)]
+    return io.BytesIO("\n".join(lines).encode())
+
+
+def _db(cpfs):
+    db = FakeDB()
+    db.insert("clients", [{"name": "Antigo", "cpf": c, "owner_id": OWNER} for c in cpfs])
+    return db
+
+
+def test_existing_cpfs_are_reported_as_skipped():
+    cpfs = [_cpf(n) for n in range(100001, 100011)]
+    db = _db(cpfs[:3])
+    imported, report = client_import.import_clients(FakeSupabase(db), _csv(cpfs), OWNER)
+    assert imported == 7
+    assert sorted(report["CPF"]) == sorted(cpfs[:3])
+    assert set(report["Motivo"]) == {client_import.DUPLICATE_REASON}
+
+
+def test_rows_ignored_by_the_upsert_are_not_counted_as_imported():
+    """CPF cadastrado entre a consulta e o upsert (outra sessão): o upsert pula e o relatório mostra."""
+    cpfs = [_cpf(n) for n in range(200001, 200006)]
+    db = _db(cpfs[:2])
+    with mock.patch.object(client_import, "select_in", lambda *a, **k: []):
+        imported, report = client_import.import_clients(FakeSupabase(db), _csv(cpfs), OWNER)
+    assert imported == 3
+    assert sorted(report["CPF"]) == sorted(cpfs[:2])
+    assert set(report["Motivo"]) == {client_import.DUPLICATE_REASON}
+    assert len(db.tables["clients"]) == 5
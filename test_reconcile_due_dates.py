@@ -0,0 +1,99 @@
+"""
+Testes da reconciliação de vencimentos (reconcile_due_dates.py) contra a
+regra de um contrato por vez (duedates.next_due_date) e o predicado da
+migration_v3.
+
+Rodar na raiz do projeto: python -m pytest -q
+"""
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from duedates import next_due_date
+from reconcile_due_dates import PAID_TOLERANCE, reconcile
+
+TODAY = date(2026, 10, 17)
+
+
+def _frames(loans, payments):
+    loans = pd.DataFrame(loans, columns=["id", "status", "due_date", "due_day", "remaining_amount"])
+    payments = pd.DataFrame(payments, columns=["id", "loan_id", "paid_at"])
+    return loans, payments
+
+
+def _expected(loan, paid, today):
+    """Um contrato pela regra da migration_v3, escrita como no SQL."""
+    due = date.fromisoformat(loan["due_date"])
+    anchor = loan["due_day"] or due.day
+    stale = (loan["status"] == "atrasado" and loan["remaining_amount"] > PAID_TOLERANCE
+             and any(p >= due for p in paid))
+    if not stale:
+        return str(due), loan["status"], anchor
+    new_due = next_due_date(anchor, due)
+    return str(new_due), "pendente" if new_due >= today else "atrasado", anchor
+
+
+def _reconciled(loans, payments, today=TODAY):
+    diffs = reconcile(*_frames(loans, payments), today).set_index("id")
+    out = {}
+    for loan in loans:
+        if loan["id"] in diffs.index:
+            d = diffs.loc[loan["id"]]
+            out[loan["id"]] = (d["new_due_date"], d["new_status"], int(d["new_due_day"]))
+        else:
+            out[loan["id"]] = (loan["due_date"], loan["status"], loan["due_day"])
+    return out
+
+
+@pytest.mark.parametrize("anchor, due, expected", [
+    (31, "2024-01-31", "2024-02-29"),  # bissexto
+    (31, "2025-01-31", "2025-02-28"),
+    (31, "2025-02-28", "2025-03-31"),  # a âncora volta depois do mês curto
+    (30, "2025-02-28", "2025-03-30"),
+    (29, "2023-01-29", "2023-02-28"),
+    (31, "2025-04-30", "2025-05-31"),
+    (15, "2025-12-15", "2026-01-15"),  # virada de ano
+])
+def test_month_end_clamping(anchor, due, expected):
+    loan = {"id": "l", "status": "atrasado", "due_date": due, "due_day": anchor, "remaining_amount": 1000}
+    got = _reconciled([loan], [("p", "l", due)], today=date(2020, 1, 1))
+    assert got["l"] == (expected, "pendente", anchor)
+
+
+@pytest.mark.parametrize("status, remaining, paid, stale", [
+    ("atrasado", 1000, ["2025-01-10"], True),                # pago no dia do vencimento
+    ("atrasado", 1000, ["2025-01-09"], False),               # antes do vencimento
+    ("atrasado", 1000, ["2024-12-01", "2025-01-20"], True),  # vale o último pagamento
+    ("atrasado", PAID_TOLERANCE, ["2025-01-12"], False),     # saldo quitado
+    ("pendente", 1000, ["2025-01-12"], False),
+    ("pago", 1000, ["2025-01-12"], False),
+    ("atrasado", 1000, [], False),
+])
+def test_migration_v3_predicate(status, remaining, paid, stale):
+    loan = {"id": "l", "status": status, "due_date": "2025-01-10", "due_day": 10, "remaining_amount": remaining}
+    got = _reconciled([loan], [(f"p{i}", "l", p) for i, p in enumerate(paid)], today=date(2025, 1, 20))
+    assert got["l"] == (("2025-02-10", "pendente", 10) if stale else ("2025-01-10", status, 10))
+
+
+def test_matches_next_due_date_on_random_loans():
+    rng = random.Random(7)
+    loans, payments, paid_by_loan = [], [], {}
+    for i in range(3000):
+        anchor = rng.choice([28, 29, 30, 31]) if rng.random() < 0.6 else rng.randint(1, 31)
+        # Vencimento coerente com a âncora (limitado ao fim do mês)
+        first = date(rng.randint(2019, 2027), rng.randint(1, 12), 1)
+        due = next_due_date(anchor, first - timedelta(days=1))
+        loan = {"id": f"l{i:05d}", "status": rng.choice(["atrasado", "atrasado", "pendente", "pago"]),
+                "due_date": str(due), "due_day": None if rng.random() < 0.1 else anchor,
+                "remaining_amount": rng.choice([0, 0.3, 0.5, 100, 1000])}
+        paid = [due + timedelta(days=rng.randint(-60, 90)) for _ in range(rng.randint(0, 3))]
+        paid_by_loan[loan["id"]] = paid
+        payments += [(f"{loan['id']}-{j}", loan["id"], str(p)) for j, p in enumerate(paid)]
+        loans.append(loan)
+
+    got = _reconciled(loans, payments)
+    for loan in loans:
+        expected = _expected(loan, paid_by_loan[loan["id"]], TODAY)
+        assert got[loan["id"]] == expected, loan
@@ -0,0 +1,53 @@
+"""
+Testes do estágio de imagens de uploads.py (process_image).
+
+Rodar na raiz do projeto: python -m pytest -q
+"""
+import io
+
+from PIL import Image
+
+from uploads import process_image
+
+OPTS = {"max_side": 1600, "quality": 80, "thumb_side": 320}
+
+
+class _File(io.BytesIO):
+    """Imita o UploadedFile do Streamlit (read/seek/getvalue)."""
+
+
+def _png(size, exif=None):
+    out = io.BytesIO()
+    img = Image.new("RGB", size, "white")
+    img.paste((20, 40, 200), (0, 0, size[0] // 2, size[1]))  # print de tela: cores chapadas
+    img.save(out, "PNG", **({"exif": exif} if exif else {}))
+    return out.getvalue()
+
+
+def _noise_jpeg(size):
+    out = io.BytesIO()
+    Image.effect_noise(size, 80).convert("RGB").save(out, "JPEG", quality=95)
+    return out.getvalue()
+
+
+def test_keeps_smaller_original_with_its_format():
+    original = _png((800, 600))
+    main, fmt, thumb = process_image(_File(original), **OPTS)
+    assert (main, fmt) == (original, "PNG")
+    assert Image.open(io.BytesIO(thumb)).format == "JPEG"
+
+
+def test_reencodes_when_smaller():
+    original = _noise_jpeg((3000, 2000))
+    main, fmt, _ = process_image(_File(original), **OPTS)
+    assert fmt == "JPEG" and len(main) < len(original)
+    assert max(Image.open(io.BytesIO(main)).size) == OPTS["max_side"]
+
+
+def test_never_keeps_original_with_metadata():
+    exif = Image.Exif()
+    exif[0x010F] = "Camera"  # Make
+    original = _png((800, 600), exif=exif.tobytes())
+    main, fmt, _ = process_image(_File(original), **OPTS)
+    assert fmt == "JPEG"
+    assert not Image.open(io.BytesIO(main)).getexif()
@@ -0,0 +1,203 @@
+"""
+Envio de arquivos (documentos e comprovantes) para o bucket 'documents' do Supabase Storage.
+Fotos (jpg/png) passam antes por um estágio opcional que reduz a resolução,
+recomprime, remove metadados (EXIF/GPS) e gera uma miniatura ao lado — ou
+mantêm o original quando recomprimir não diminuiria o arquivo.
+"""
+import io
+import os
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BUCKET = "documents"
+# Envios simultâneos num upload de vários arquivos
+UPLOAD_CONCURRENCY = 4
+# Acima deste tamanho o arquivo vai para um temporário em disco (em blocos)
+# e é enviado de lá, sem criar mais uma cópia inteira em memória
+STREAM_THRESHOLD = 5 * 1024 * 1024
+COPY_BLOCK_SIZE = 1024 * 1024
+
+# Estágio de imagens (o app sobrescreve com os valores do secrets.toml)
+IMAGE_OPTIONS = {
+    "enabled": True,
+    "max_side": 1600,   # maior lado da imagem armazenada, em pixels
+    "quality": 80,      # qualidade JPEG (1-95)
+    "thumb_side": 320,  # maior lado da miniatura
+}
+IMAGE_TYPES = {"image/jpeg", "image/jpg", "image/png"}
+# Formato do Pillow -> (extensão, content-type) do objeto armazenado
+IMAGE_FORMATS = {"JPEG": (".jpg", "image/jpeg"), "PNG": (".png", "image/png")}
+# Chaves de img.info com metadados do usuário (câmera, GPS, software, comentários)
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment")
+
+
+def storage_path(pub_url: str) -> str:
+    """Caminho do objeto no bucket a partir da URL pública."""
+    return pub_url.split(f"/object/public/{BUCKET}/", 1)[-1].split("?", 1)[0]
+
+
+def _size(file) -> int:
+    size = getattr(file, "size", None)
+    if size is None:
+        pos = file.seek(0, os.SEEK_END)
+        file.seek(0)
+        size = pos
+    return size
+
+
+def _to_jpeg(img, quality) -> bytes:
+    buf = io.BytesIO()
+    # Sem exif=...: o JPEG gerado não carrega os metadados do original
+    img.save(buf, "JPEG", quality=quality, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+def _pil():
+    """(Image, ImageOps) do Pillow, importado só no primeiro envio de foto; None sem Pillow."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:  # Sem Pillow as imagens são enviadas como vieram
+        return None
+    return Image, ImageOps
+
+
+def _has_metadata(img) -> bool:
+    return bool(img.getexif()) or any(k in img.info for k in METADATA_KEYS) or bool(getattr(img, "text", None))
+
+
+def process_image(file, max_side, quality, thumb_side):
+    """
+    Reduz a imagem para caber em max_side x max_side, recomprime em JPEG
+    sem metadados e gera a miniatura. Se o JPEG sair maior que o arquivo
+    enviado e este já couber em max_side sem metadados (ex: print de tela
+    em PNG, JPEG já comprimido), guarda o original.
+    Retorna (imagem, formato, miniatura) — formato é uma chave de
+    IMAGE_FORMATS — ou None se o arquivo não puder ser lido como imagem.
+    """
+    Image, ImageOps = _pil()
+    try:
+        file.seek(0)
+        original = file.read()
+        with Image.open(io.BytesIO(original)) as src:
+            fmt = src.format
+            keep_original = fmt in IMAGE_FORMATS and max(src.size) <= max_side and not _has_metadata(src)
+            img = ImageOps.exif_transpose(src)  # aplica a rotação da câmera antes de descartar o EXIF
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                bg = Image.new("RGB", img.size, "white")
+                bg.paste(img, mask=img.getchannel("A"))
+                img = bg
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+            main = _to_jpeg(img, quality)
+            img.thumbnail((thumb_side, thumb_side), Image.LANCZOS)
+            thumb = _to_jpeg(img, min(quality, 70))
+        if keep_original and len(main) >= len(original):
+            return original, fmt, thumb
+        return main, "JPEG", thumb
+    except Exception:
+        return None
+    finally:
+        file.seek(0)
+
+
+def _public_url(bucket, name):
+    pub_url = bucket.get_public_url(name)
+    if isinstance(pub_url, dict):
+        pub_url = pub_url.get('publicUrl') or pub_url.get('publicURL', '')
+    return pub_url
+
+
+def upload_file(client, file, folder="docs"):
+    """
+    Envia um arquivo (ex: UploadedFile do Streamlit).
+    Retorna (info, erro). info tem url, name (nome original), path, thumb_url,
+    original_size e stored_size; erro é None em caso de sucesso.
+    """
+    try:
+        base = f"{folder}/{uuid.uuid4()}_{file.name.replace(' ', '_')}"
+        bucket = client.storage.from_(BUCKET)
+        original_size = _size(file)
+        processed = None
+        if IMAGE_OPTIONS["enabled"] and file.type in IMAGE_TYPES and _pil() is not None:
+            processed = process_image(file, IMAGE_OPTIONS["max_side"], IMAGE_OPTIONS["quality"], IMAGE_OPTIONS["thumb_side"])
+
+        thumb_url = None
+        if processed:
+            main, fmt, thumb = processed
+            ext, mime = IMAGE_FORMATS[fmt]
+            name = os.path.splitext(base)[0] + ext
+            bucket.upload(name, main, {"content-type": mime})
+            stored_size = len(main)
+            try:
+                thumb_name = os.path.splitext(base)[0] + "_thumb.jpg"
+                bucket.upload(thumb_name, thumb, {"content-type": "image/jpeg"})
+                thumb_url = _public_url(bucket, thumb_name)
+            except Exception:
+                pass  # sem miniatura o documento continua válido
+        elif original_size > STREAM_THRESHOLD:
+            name = base
+            tmp = tempfile.NamedTemporaryFile(delete=False)
+            try:
+                with tmp:
+                    file.seek(0)
+                    shutil.copyfileobj(file, tmp, COPY_BLOCK_SIZE)
+                bucket.upload(name, tmp.name, {"content-type": file.type})
+            finally:
+                os.unlink(tmp.name)
+            stored_size = original_size
+        else:
+            name = base
+            bucket.upload(name, file.getvalue(), {"content-type": file.type})
+            stored_size = original_size
+
+        return {
+            "url": _public_url(bucket, name), "name": file.name, "path": name, "thumb_url": thumb_url,
+            "original_size": original_size, "stored_size": stored_size,
+        }, None
+    except Exception as e:
+        return None, str(e)
+
+
+def upload_many(client, files, folder, max_workers=UPLOAD_CONCURRENCY):
+    """
+    Envia vários arquivos em paralelo (pool limitado).
+    Retorna (enviados, falhas): [info] (ver upload_file) e
+    [(nome do arquivo, erro)], na ordem dos arquivos recebidos.
+    """
+    files = list(files or [])
+    if not files:
+        return [], []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as pool:
+        results = list(pool.map(lambda f: upload_file(client, f, folder), files))
+    done = [info for info, err in results if not err]
+    failed = [(f.name, err) for f, (_, err) in zip(files, results) if err]
+    return done, failed
+
+
+def remove_uploaded(client, infos):
+    """Remove do storage arquivos já enviados e suas miniaturas (rollback); falhas são ignoradas."""
+    urls = [u for info in infos for u in (info["url"], info.get("thumb_url")) if u]
+    if not urls:
+        return
+    try:
+        client.storage.from_(BUCKET).remove([storage_path(u) for u in urls])
+    except Exception:
+        pass
+
+
+def record_uploads(client, infos, owner_id):
+    """Registra tamanho original x armazenado em storage_uploads (migration_v9). Falhas são ignoradas."""
+    rows = [{
+        "path": i["path"], "thumb_url": i.get("thumb_url"), "owner_id": owner_id,
+        "original_size": i["original_size"], "stored_size": i["stored_size"],
+    } for i in infos]
+    if not rows:
+        return
+    try:
+        client.table("storage_uploads").insert(rows).execute()
+    except Exception:
+        pass
@@ -0,0 +1,68 @@
+"""
+Validação de CPF e celular.
+As funções de coluna recebem uma pandas Series e devolvem máscaras booleanas;
+os dígitos verificadores do CPF saem de um único produto matricial em NumPy.
+`validate_cpf` / `validate_phone` são os atalhos para um valor só.
+"""
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Pesos dos dígitos verificadores: coluna 0 -> 1º dígito (10..2), coluna 1 -> 2º (11..2)
+_CPF_WEIGHTS = np.zeros((11, 2), dtype=np.int64)
+_CPF_WEIGHTS[:9, 0] = np.arange(10, 1, -1)
+_CPF_WEIGHTS[:10, 1] = np.arange(11, 1, -1)
+
+
+def only_digits(values: pd.Series) -> pd.Series:
+    """Remove tudo que não for dígito de cada valor."""
+    return values.fillna("").astype(str).str.replace(r"\D", "", regex=True)
+
+
+def _digit_matrix(digits: pd.Series, width: int) -> np.ndarray:
+    """Matriz (n, width) com os dígitos; valores de outro tamanho viram zeros."""
+    fixed = digits.where(digits.str.len() == width, "0" * width)
+    exotic = fixed.str.contains(r"[^0-9]")
+    if exotic.any():
+        # \d também aceita dígitos Unicode (ex: árabe-índicos); converte como int() faria
+        fixed = fixed.copy()
+        fixed[exotic] = fixed[exotic].map(lambda v: "".join(str(unicodedata.digit(ch)) for ch in v))
+    buf = "".join(fixed).encode("ascii")
+    return np.frombuffer(buf, dtype=np.uint8).reshape(-1, width).astype(np.int64) - 48
+
+
+def phone_mask(digits: pd.Series) -> pd.Series:
+    """Celular válido: 11 dígitos (DDD + número) e o 3º dígito igual a 9."""
+    return (digits.str.len() == 11) & (digits.str[2] == "9")
+
+
+def cpf_mask(digits: pd.Series) -> pd.Series:
+    """CPF válido: 11 dígitos, não todos iguais, com os dois dígitos verificadores corretos."""
+    m = _digit_matrix(digits, 11)
+    ok = (digits.str.len() == 11).to_numpy() & (m != m[:, :1]).any(axis=1)
+    check = (m @ _CPF_WEIGHTS) * 10 % 11
+    check[check == 10] = 0
+    ok &= (check[:, 0] == m[:, 9]) & (check[:, 1] == m[:, 10])
+    return pd.Series(ok, index=digits.index)
+
+
+def check_cpfs(values: pd.Series):
+    """Retorna (máscara de válidos, CPFs só com dígitos)."""
+    digits = only_digits(values)
+    return cpf_mask(digits), digits
+
+
+def check_phones(values: pd.Series):
+    """Retorna (máscara de válidos, celulares só com dígitos)."""
+    digits = only_digits(values)
+    return phone_mask(digits), digits
+
+
+def validate_cpf(cpf) -> bool:
+    return bool(check_cpfs(pd.Series([cpf]))[0].iloc[0])
+
+
+def validate_phone(phone) -> bool:
+    # Aceita apenas números, deve ter 11 dígitos e o 3º ser 9 (11 9xxxx-xxxx)
+    return bool(check_phones(pd.Series([phone]))[0].iloc[0])
@@ -0,0 +1,30 @@
+"""
+Páginas do app, uma por item do menu. Cada módulo expõe `render()` e só é
+importado quando a página é aberta pela primeira vez no processo — assim
+pandas/altair não pesam no login nem nas páginas que não usam.
+"""
+import importlib
+
+# Item do menu -> módulo em views/ (na ordem do menu)
+PAGES = {
+    "Painel Financeiro": "painel",
+    "Baixa de Pagamentos": "baixa",
+    "Novo Contrato": "novo_contrato",
+    "Cadastrar Cliente": "cadastro",
+    "Base de Clientes": "clientes",
+    "Calculadora de Atraso": "calculadora",
+    "Gerenciar Usuários": "usuarios",
+    "Exportar Dados": "exportar",
+}
+# Só aparecem para o admin
+ADMIN_PAGES = {"Gerenciar Usuários", "Exportar Dados"}
+
+
+def menu_items(admin: bool):
+    return [p for p in PAGES if admin or p not in ADMIN_PAGES]
+
+
+def render(page: str):
+    """Importa (na primeira vez) e desenha a página `page` — um item do menu ou "Login"."""
+    module = "login" if page == "Login" else PAGES[page]
+    importlib.import_module(f"{__name__}.{module}").render()
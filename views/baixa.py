@@ -0,0 +1,112 @@
+"""Baixa de Pagamentos: registra juros, amortização ou quitação de um contrato."""
+from datetime import datetime, date
+
+import streamlit as st
+
+from core import (db, invalidate, apply_owner_filter, brl, client_index, update_client_index, keyset_pager,
+                  CLIENT_SEARCH_LIMIT, upload_file, remove_uploaded)
+
+
+def render():
+    supabase = db()
+    st.title("💸 Registrar Pagamento")
+    if st.session_state.pop('payment_done', False):
+        st.success("✅ Pagamento registrado com sucesso!")
+        st.balloons()
+    search = st.text_input("Buscar (Nome/CPF)")
+    
+    target_ids = []
+    if search:
+        target_ids = [c['id'] for c in client_index().search(search, CLIENT_SEARCH_LIMIT)]
+        if not target_ids: st.warning("Não encontrado."); st.stop()
+
+    def open_loans():
+        q = apply_owner_filter(supabase.table("loans").select("*, clients(name, cpf)").neq("status", "pago"))
+        return q.in_("client_id", target_ids) if target_ids else q
+    with st.spinner("Carregando contratos..."):
+        loans = keyset_pager("baixa", ["loans", "clients"], open_loans, "due_date", reset_on=search)
+
+    if loans:
+        def make_label(l):
+            due = datetime.strptime(l['due_date'], '%Y-%m-%d').date()
+            delta = (date.today() - due).days
+            icon = "🔴" if l['status'] == 'atrasado' else ("🟡" if delta == 0 else "⚪")
+            atraso = f"  ⚠️ {delta}d em atraso" if delta > 0 else ""
+            return f"{icon} {l['clients']['name']} | Vence: {due.strftime('%d/%m/%Y')}{atraso}"
+        opts = {make_label(l): l for l in loans}
+        sel = st.selectbox("Selecione o Contrato", list(opts.keys()))
+        d = opts[sel]
+
+        # Cálculos (juros sempre sobre o valor original emprestado)
+        saldo = float(d['remaining_amount'])
+        juros = float(d['original_amount']) * (float(d['interest_rate'])/100)
+        total_quit = saldo + juros
+
+        # Card Informativo
+        st.info(f"""
+        **Resumo do Contrato:**
+        - 💰 Saldo Devedor (Principal): **{brl(saldo)}**
+        - 📈 Juros da Parcela ({d['interest_rate']}% sobre {brl(float(d['original_amount']))}): **{brl(juros)}**
+        - 🏁 Total para Quitação Hoje: **{brl(total_quit)}**
+        """)
+
+        # Modo fora do form para atualizar val_sug em tempo real
+        mode = st.radio("Tipo de Pagamento", ["Somente Juros", "Juros + Amortização", "Quitação Total"], horizontal=True)
+
+        with st.form("pay"):
+            # Definição de valor sugerido
+            val_sug = juros if mode == "Somente Juros" else (juros + 100) if mode == "Juros + Amortização" else total_quit
+            
+            c1, c2 = st.columns(2)
+            dt = c1.date_input("Data Pagamento", date.today(), format="DD/MM/YYYY")
+            val = c2.number_input("Valor Recebido (R$)", min_value=0.0, value=val_sug, step=10.0)
+            
+            # Upload Comprovante
+            proof = st.file_uploader("Anexar Comprovante (Opcional)", type=['jpg','png','pdf'])
+
+            confirm_quit = True
+            if mode == "Quitação Total":
+                confirm_quit = st.checkbox(f"✅ Confirmo a quitação total de **{brl(total_quit)}**. Esta ação não pode ser desfeita.")
+
+            if st.form_submit_button("Confirmar Baixa", type="primary"):
+                if mode == "Quitação Total" and not confirm_quit:
+                    st.error("⚠️ Marque a confirmação acima para prosseguir com a quitação.")
+                else:
+                    err = None
+                    if mode == "Somente Juros":
+                        if val < (juros - 0.1): err = f"Valor insuficiente. Mínimo para juros: {brl(juros)}"
+                    elif mode == "Juros + Amortização":
+                        if val <= juros:
+                            err = f"O valor ({brl(val)}) não cobre os juros. Para amortizar, precisa ser MAIOR que {brl(juros)}."
+                    elif mode == "Quitação Total":
+                        if val < (total_quit - 1.0): err = f"Para quitar, o valor deve ser {brl(total_quit)}"
+
+                    if err: st.error(err)
+                    else:
+                        with st.spinner("Processando pagamento..."):
+                            try:
+                                proof_info = None
+                                if proof:
+                                    proof_info, _ = upload_file(proof, f"proofs/{d['id']}")
+                                proof_url = proof_info['url'] if proof_info else None
+
+                                # Uma chamada: pagamento, saldo/vencimento e reputação na mesma transação (migration_v7)
+                                type_db = "JUROS" if mode == "Somente Juros" else "AMORTIZACAO" if mode == "Juros + Amortização" else "QUITACAO"
+                                try:
+                                    supabase.rpc("register_payment", {
+                                        "p_loan_id": d['id'], "p_amount": val, "p_payment_type": type_db,
+                                        "p_paid_at": str(dt), "p_owner_id": st.session_state.user.id,
+                                        "p_proof_url": proof_url
+                                    }).execute()
+                                except Exception:
+                                    # Baixa não gravada: não deixa o comprovante órfão no storage
+                                    if proof_info: remove_uploaded([proof_info])
+                                    raise
+                                invalidate("loans", "payments", "clients")
+                                rep = 'BOM' if dt <= datetime.strptime(d['due_date'], '%Y-%m-%d').date() else 'RUIM'
+                                update_client_index(lambda ix: ix.patch(d['client_id'], reputation=rep))
+
+                                st.session_state['payment_done'] = True
+                                st.rerun()
+                            except Exception as e: st.error(f"Erro: {e}")
+    else: st.info("Nada pendente.")
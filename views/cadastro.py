@@ -0,0 +1,148 @@
+"""Cadastrar Cliente: formulário com documentos e importação em massa via CSV."""
+import re
+
+import streamlit as st
+
+import client_import
+from core import db, invalidate, update_client_index, upload_files, remove_uploaded, doc_rows, validate_email
+from validators import validate_cpf, validate_phone
+
+
+def _mask_cpf():
+    v = re.sub(r'\D', '', st.session_state.get('_cad_cpf', ''))
+    if len(v) >= 9:
+        st.session_state['_cad_cpf'] = f"{v[:3]}.{v[3:6]}.{v[6:9]}-{v[9:11]}"
+    elif len(v) > 6:
+        st.session_state['_cad_cpf'] = f"{v[:3]}.{v[3:6]}.{v[6:]}"
+    elif len(v) > 3:
+        st.session_state['_cad_cpf'] = f"{v[:3]}.{v[3:]}"
+
+
+def _mask_phone():
+    v = re.sub(r'\D', '', st.session_state.get('_cad_tel', ''))
+    if len(v) >= 7:
+        st.session_state['_cad_tel'] = f"({v[:2]}) {v[2:7]}-{v[7:11]}"
+    elif len(v) > 2:
+        st.session_state['_cad_tel'] = f"({v[:2]}) {v[2:]}"
+
+
+def _mask_rg():
+    v = re.sub(r'\D', '', st.session_state.get('_cad_rg', ''))
+    if len(v) >= 8:
+        st.session_state['_cad_rg'] = f"{v[:2]}.{v[2:5]}.{v[5:8]}-{v[8:9]}"
+    elif len(v) > 5:
+        st.session_state['_cad_rg'] = f"{v[:2]}.{v[2:5]}.{v[5:]}"
+    elif len(v) > 2:
+        st.session_state['_cad_rg'] = f"{v[:2]}.{v[2:]}"
+
+
+def render():
+    supabase = db()
+    st.title("👤 Novo Cliente")
+
+    # --- IMPORTAÇÃO EM MASSA VIA CSV ---
+    with st.expander("📥 Importar clientes via CSV"):
+        st.markdown("""
+**Formato esperado do CSV** (com cabeçalho):
+- Colunas obrigatórias: `nome`, `cpf`, `celular`, `endereco`, `referencia`
+- Colunas opcionais: `rg`, `email`
+- CPF: apenas números ou formatado (000.000.000-00)
+- Celular: DDD + 9 dígitos (apenas números ou só dígitos)
+        """)
+        csv_template = "nome,cpf,celular,endereco,referencia,rg,email\nJoão Silva,123.456.789-09,11987654321,Rua das Flores 10 Apto 2 São Paulo SP,Maria Silva (esposa),12345678,joao@email.com\nMaria Oliveira,987.654.321-00,21976543210,Av. Brasil 500 Rio de Janeiro RJ,Carlos Oliveira (irmão),,"
+        st.download_button(
+            label="💾 Baixar modelo CSV",
+            data=csv_template.encode('utf-8-sig'),
+            file_name="modelo_importacao_clientes.csv",
+            mime="text/csv"
+        )
+        csv_file = st.file_uploader("Selecione o arquivo CSV preenchido", type=["csv"], key="csv_import")
+        if csv_file:
+            try:
+                missing = client_import.REQUIRED_COLUMNS - set(client_import.read_columns(csv_file))
+                if missing:
+                    st.error(f"Colunas faltando no CSV: {', '.join(missing)}")
+                else:
+                    st.dataframe(client_import.read_preview(csv_file), use_container_width=True)
+                    total_rows = client_import.count_rows(csv_file)
+                    st.caption(f"{total_rows} clientes encontrados no arquivo.")
+                    if st.button("✅ Confirmar Importação", type="primary"):
+                        bar = st.progress(0.0, text="Importando...")
+                        ok, erros = client_import.import_clients(
+                            supabase, csv_file, st.session_state.user.id,
+                            on_progress=lambda n: bar.progress(min(n / max(total_rows, 1), 1.0), text=f"{n}/{total_rows} linhas processadas")
+                        )
+                        if ok:
+                            invalidate("clients")
+                        # Guarda o resultado para o relatório sobreviver ao rerun do download
+                        st.session_state['import_report'] = (ok, erros)
+            except Exception as e:
+                st.error(f"Erro ao ler CSV: {e}")
+        else:
+            st.session_state.pop('import_report', None)
+        if 'import_report' in st.session_state:
+            ok, erros = st.session_state['import_report']
+            skipped = int((erros["Motivo"] == client_import.DUPLICATE_REASON).sum())
+            if ok: st.success(f"✅ {ok} cliente(s) importado(s) com sucesso!")
+            if skipped: st.info(f"ℹ️ {skipped} cliente(s) pulado(s): CPF já cadastrado.")
+            if not erros.empty:
+                st.error(f"⚠️ {len(erros)} linha(s) não importada(s):")
+                st.dataframe(erros.head(100), use_container_width=True, hide_index=True)
+                st.download_button(
+                    label="💾 Baixar relatório de erros",
+                    data=erros.to_csv(index=False).encode('utf-8-sig'),
+                    file_name="erros_importacao_clientes.csv",
+                    mime="text/csv"
+                )
+
+    st.divider()
+    with st.form("cli"):
+        c1, c2 = st.columns(2)
+        nm = c1.text_input("Nome *")
+        cpf = c1.text_input("CPF *", max_chars=14, placeholder="000.000.000-00")
+        tel = c1.text_input("Celular *", max_chars=15, placeholder="(00) 00000-0000")
+        ref = c1.text_input("Referência *")
+
+        rg = c2.text_input("RG", max_chars=12, placeholder="00.000.000-0")
+        em = c2.text_input("Email", placeholder="exemplo@email.com")
+        end = c2.text_area("Endereço *")
+        files = st.file_uploader("Docs", accept_multiple_files=True)
+
+        if st.form_submit_button("Salvar"):
+            errs = []
+            if not (nm and cpf and tel and end and ref): errs.append("Preencha obrigatórios *")
+            if cpf and not validate_cpf(cpf): errs.append("CPF inválido")
+            if tel and not validate_phone(tel): errs.append("Celular inválido")
+            if em and not validate_email(em): errs.append("Email inválido")
+
+            if errs: 
+                for e in errs: st.error(e)
+            else:
+                try:
+                    res = supabase.table("clients").insert({
+                        "name": nm, "cpf": re.sub(r'\D','',cpf), "phone": re.sub(r'\D','',tel),
+                        "rg": rg, "email": em, "address": end, "reference_contact": ref,
+                        "reputation": "NEUTRO", "owner_id": st.session_state.user.id
+                    }).execute()
+                    if res.data:
+                        invalidate("clients", "client_documents")
+                        update_client_index(lambda ix: ix.upsert(res.data[0]))
+                        cid = res.data[0]['id']
+                        doc_fail = None
+                        sent, failed = upload_files(files, cid)
+                        if failed:
+                            doc_fail = f"Erro ao enviar '{failed[0][0]}': {failed[0][1]}"
+                        elif sent:
+                            try:
+                                supabase.table("client_documents").insert(doc_rows(cid, sent)).execute()
+                            except Exception as e:
+                                doc_fail = f"Erro ao salvar documentos: {e}"
+                        if doc_fail:
+                            # Desfaz tudo: arquivos já enviados e o cliente
+                            remove_uploaded(sent)
+                            supabase.table("clients").delete().eq("id", cid).execute()
+                            update_client_index(lambda ix: ix.remove(cid))
+                            st.error(doc_fail)
+                        else:
+                            st.success("Salvo!")
+                except Exception as e: st.error(f"Erro: {e}")
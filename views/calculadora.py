@@ -0,0 +1,38 @@
+"""Calculadora de Atraso: multa fixa + juros por dia sobre o saldo."""
+import streamlit as st
+
+from core import brl
+
+
+def render():
+    st.title("🧮 Calculadora de Multa e Juros por Atraso")
+    st.caption("Use esta calculadora para saber o total a cobrar de um cliente em atraso.")
+
+    c1, c2 = st.columns(2)
+    saldo_calc = c1.number_input("💰 Saldo Devedor (R$)", min_value=0.0, step=50.0, format="%.2f")
+    multa = c1.number_input("⚠️ Multa Fixa (R$)", min_value=0.0, step=5.0, format="%.2f",
+                            help="Valor fixo de multa cobrado uma única vez pelo atraso")
+    juros_dia = c2.number_input("📅 Juros por Dia (R$)", min_value=0.0, step=1.0, format="%.2f",
+                                help="Valor fixo cobrado por cada dia de atraso")
+    dias = c2.number_input("📆 Dias em Atraso", min_value=0, step=1,
+                           help="Quantos dias se passaram desde o vencimento")
+
+    if saldo_calc > 0 or multa > 0 or juros_dia > 0:
+        st.divider()
+        total_juros_atraso = juros_dia * dias
+        total_cobrar = saldo_calc + multa + total_juros_atraso
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Saldo Devedor", brl(saldo_calc))
+        col2.metric("Multa", brl(multa))
+        col3.metric(f"Juros ({dias} dias)", brl(total_juros_atraso),
+                    delta=f"{brl(juros_dia)}/dia", delta_color="off")
+        col4.metric("💥 Total a Cobrar", brl(total_cobrar))
+
+        st.info(f"""
+**Memória de cálculo:**
+- Saldo devedor: **{brl(saldo_calc)}**
+- Multa fixa: **{brl(multa)}**
+- Juros por atraso: {brl(juros_dia)}/dia × {dias} dias = **{brl(total_juros_atraso)}**
+- **Total: {brl(saldo_calc)} + {brl(multa)} + {brl(total_juros_atraso)} = {brl(total_cobrar)}**
+        """)
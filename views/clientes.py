@@ -0,0 +1,184 @@
+"""Base de Clientes: carteira paginada com edição, exclusão e abas de
+documentos, contratos e pagamentos de cada cliente."""
+from datetime import datetime
+import re
+
+import pandas as pd
+import streamlit as st
+
+from core import (db, invalidate, apply_owner_filter, is_admin, brl, client_index, update_client_index,
+                  keyset_pager, load_clients_bundle, CLIENT_VIEWS, CLIENT_SEARCH_LIMIT, upload_files,
+                  remove_uploaded, doc_rows)
+
+
+def render():
+    supabase = db()
+    st.title("📂 Carteira")
+    _admin = is_admin()
+    search = st.text_input("Buscar (Nome/CPF)")
+    if search:
+        clients = client_index().search(search, CLIENT_SEARCH_LIMIT)
+    else:
+        with st.spinner("Carregando clientes..."):
+            clients = keyset_pager("carteira", ["clients"], lambda: apply_owner_filter(supabase.table("clients").select("*")), "name")
+
+    if clients:
+        # Abas abertas nesta página (o valor dos widgets já está no session_state)
+        open_views = {st.session_state.get(f"view_{c['id']}") for c in clients} - {None}
+        page_ids = [c['id'] for c in clients]
+        bundle = load_clients_bundle(page_ids, open_views)
+        for c in clients:
+            icon = "🟢" if c['reputation']=='BOM' else "🔴" if c['reputation']=='RUIM' else "⚪"
+            with st.expander(f"{icon} {c['name']} ({c['cpf']})"):
+                hcols = st.columns([4, 1, 1]) if _admin else st.columns([5, 1])
+                hcols[0].write(f"📱 {c['phone']} | 📍 {c['address']}")
+                if hcols[1].button("✏️ Editar", key=f"editbtn_{c['id']}"):
+                    st.session_state.edit_client_id = None if st.session_state.get('edit_client_id') == c['id'] else c['id']
+                    st.rerun()
+                if _admin and hcols[2].button("🗑️ Excluir", key=f"delbtn_{c['id']}", type="secondary"):
+                    st.session_state[f'confirm_del_{c["id"]}'] = True
+
+                if _admin and st.session_state.get(f'confirm_del_{c["id"]}'):
+                    st.warning("⚠️ Tem certeza que deseja excluir este cliente? Esta ação não pode ser desfeita.")
+                    cc1, cc2 = st.columns(2)
+                    if cc1.button("✅ Sim, excluir", key=f"yes_del_{c['id']}", type="primary"):
+                        active = supabase.table("loans").select("id").eq("client_id", c['id']).neq("status","pago").execute().data
+                        if active:
+                            st.error("❌ Cliente possui contratos ativos. Quite todos os contratos antes de excluir.")
+                            st.session_state.pop(f'confirm_del_{c["id"]}', None)
+                        else:
+                            try:
+                                supabase.table("client_documents").delete().eq("client_id", c['id']).execute()
+                                supabase.table("loans").delete().eq("client_id", c['id']).execute()
+                                supabase.table("clients").delete().eq("id", c['id']).execute()
+                                invalidate("clients", "loans", "client_documents", "payments")
+                                update_client_index(lambda ix: ix.remove(c['id']))
+                                st.session_state.pop(f'confirm_del_{c["id"]}', None)
+                                st.rerun()
+                            except Exception as e: st.error(f"Erro ao excluir: {e}")
+                    if cc2.button("❌ Cancelar", key=f"cancel_del_{c['id']}"):
+                        st.session_state.pop(f'confirm_del_{c["id"]}', None)
+                        st.rerun()
+
+                if st.session_state.get('edit_client_id') == c['id']:
+                    with st.form(f"edit_cli_{c['id']}"):
+                        ec1, ec2 = st.columns(2)
+                        e_nm = ec1.text_input("Nome", value=c.get('name',''))
+                        e_tel = ec1.text_input("Celular", value=c.get('phone',''))
+                        e_ref = ec1.text_input("Referência", value=c.get('reference_contact',''))
+                        e_rg = ec2.text_input("RG", value=c.get('rg',''))
+                        e_em = ec2.text_input("Email", value=c.get('email',''))
+                        e_end = ec2.text_area("Endereço", value=c.get('address',''))
+                        if st.form_submit_button("💾 Salvar alterações", type="primary"):
+                            try:
+                                upd = supabase.table("clients").update({
+                                    "name": e_nm, "phone": re.sub(r'\D','',e_tel),
+                                    "rg": e_rg, "email": e_em,
+                                    "address": e_end, "reference_contact": e_ref
+                                }).eq("id", c['id']).execute()
+                                invalidate("clients")
+                                if upd.data: update_client_index(lambda ix: ix.upsert(upd.data[0]))
+                                st.session_state.edit_client_id = None
+                                st.success("✅ Cliente atualizado!")
+                                st.rerun()
+                            except Exception as e: st.error(f"Erro: {e}")
+                    st.divider()
+
+                # As abas só são montadas (e seus dados buscados) quando abertas
+                view = st.radio("Detalhes", CLIENT_VIEWS, index=None, horizontal=True,
+                                key=f"view_{c['id']}", label_visibility="collapsed")
+
+                if view == "📎 Documentos":
+                    docs = bundle[c['id']]['docs']
+                    if docs:
+                        for doc in docs:
+                            dc0, dc1, dc2, dc3 = st.columns([1, 4, 2, 1])
+                            if doc.get('thumb_url'): dc0.image(doc['thumb_url'], width=64)
+                            else: dc0.write("📄")
+                            dc1.write(doc.get('file_name') or 'Documento')
+                            if doc.get('file_url'):
+                                dc2.markdown(f"[🔗 Abrir]({doc['file_url']})")
+                            if _admin and dc3.button("🗑️", key=f"del_doc_{doc['id']}", help="Excluir documento"):
+                                supabase.table("client_documents").delete().eq("id", doc['id']).execute()
+                                invalidate("client_documents")
+                                st.rerun()
+                    else:
+                        st.info("Nenhum documento cadastrado.")
+                    st.divider()
+                    with st.form(f"upload_doc_{c['id']}"):
+                        new_docs = st.file_uploader("Adicionar documentos", accept_multiple_files=True, type=['jpg','png','pdf'])
+                        if st.form_submit_button("📤 Enviar"):
+                            if new_docs:
+                                sent, failed = upload_files(new_docs, c['id'])
+                                if sent:
+                                    try:
+                                        supabase.table("client_documents").insert(doc_rows(c['id'], sent)).execute()
+                                    except Exception as e:
+                                        remove_uploaded(sent)
+                                        st.error(f"Erro ao salvar documentos: {e}")
+                                        st.stop()
+                                    invalidate("client_documents")
+                                if failed:
+                                    for fname, err in failed: st.error(f"Erro ao enviar '{fname}': {err}")
+                                else:
+                                    st.success("Documento(s) enviado(s)!")
+                                    st.rerun()
+                            else:
+                                st.warning("Selecione ao menos um arquivo.")
+
+                elif view == "💰 Contratos":
+                    loans = bundle[c['id']]['loans']
+                    if loans:
+                        df_l = pd.DataFrame(loans)
+                        df_l['Vencimento'] = pd.to_datetime(df_l['due_date']).dt.strftime('%d/%m/%Y')
+                        df_l = df_l[['Vencimento', 'original_amount', 'remaining_amount', 'interest_rate', 'status']].rename(columns={
+                            'original_amount': 'Valor', 'remaining_amount': 'Saldo', 'interest_rate': 'Juros (%)', 'status': 'Status'
+                        })
+                        st.dataframe(df_l, use_container_width=True)
+                        if _admin:
+                            st.markdown("**✏️ Editar juros de um contrato:**")
+                            loan_opts = {f"Vence {l['due_date']} | Saldo {brl(float(l['remaining_amount']))}": l for l in loans}
+                            sel_loan_lbl = st.selectbox("Selecione o contrato", list(loan_opts.keys()), key=f"sel_loan_{c['id']}")
+                            sel_loan = loan_opts[sel_loan_lbl]
+                            with st.form(f"edit_loan_{c['id']}"):
+                                new_rate = st.number_input("Nova Taxa de Juros (%)", value=float(sel_loan['interest_rate']), step=0.5)
+                                if st.form_submit_button("💾 Salvar Juros"):
+                                    try:
+                                        supabase.table("loans").update({"interest_rate": new_rate}).eq("id", sel_loan['id']).execute()
+                                        invalidate("loans")
+                                        st.success("✅ Juros atualizado!")
+                                        st.rerun()
+                                    except Exception as e: st.error(f"Erro: {e}")
+                    else:
+                        st.info("Nenhum contrato.")
+
+                elif view == "💸 Pagamentos":
+                    if bundle[c['id']]['loans']:
+                        logs = bundle[c['id']]['payments']
+                        if logs:
+                            data_logs = []
+                            for l in logs:
+                                dt_br = datetime.strptime(l['paid_at'], '%Y-%m-%d').strftime('%d/%m/%Y')
+                                prof = l.get('profiles')
+                                resp = prof['email'] if isinstance(prof, dict) else l.get('owner_id', '-')
+                                data_logs.append({
+                                    "Data": dt_br,
+                                    "Valor (R$)": brl(float(l['amount'])),
+                                    "Tipo": l['payment_type'],
+                                    "Responsável": resp,
+                                    "Comprovante": l.get('proof_url') or "",
+                                })
+                            st.dataframe(
+                                pd.DataFrame(data_logs),
+                                column_config={
+                                    "Comprovante": st.column_config.LinkColumn("Comprovante", display_text="Ver"),
+                                },
+                                use_container_width=True,
+                                hide_index=True,
+                            )
+                        else:
+                            st.info("Sem pagamentos registrados.")
+                    else:
+                        st.info("Sem contratos.")
+    else:
+        st.info("Nenhum cliente encontrado.")
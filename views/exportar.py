@@ -0,0 +1,114 @@
+"""Exportar Dados (somente admin): contratos, pagamentos e clientes em CSV/Parquet para a contabilidade."""
+import glob
+import os
+import tempfile
+import time
+
+import streamlit as st
+
+import exporter
+from core import db, cached
+
+MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+# Arquivos temporários das exportações; os nunca baixados (sessão abandonada) são apagados após EXPORT_MAX_AGE
+EXPORT_PREFIX = "export_"
+EXPORT_MAX_AGE = 6 * 3600
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _download(exp):
+    """Conteúdo para o download_button. No primeiro clique o arquivo é lido e
+    apagado do disco; os cliques seguintes usam os bytes guardados na sessão."""
+    if 'data' not in exp:
+        exp['data'] = _read(exp['path'])
+        os.remove(exp['path'])
+    return exp['data']
+
+
+def _discard_previous():
+    """Apaga o arquivo temporário da exportação anterior desta sessão."""
+    prev = st.session_state.pop('_export', None)
+    if prev and os.path.exists(prev['path']):
+        os.remove(prev['path'])
+
+
+def _sweep_stale():
+    """Apaga exportações de qualquer sessão que nunca foram baixadas (mais antigas que EXPORT_MAX_AGE)."""
+    cutoff = time.time() - EXPORT_MAX_AGE
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), EXPORT_PREFIX + "*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # outra sessão apagou antes
+
+
+def render():
+    supabase = db()
+    if st.session_state.role != 'admin':
+        st.error("Acesso negado.")
+        st.stop()
+    st.title("📤 Exportar Dados")
+    st.caption("O arquivo é montado em disco página a página (sem carregar o histórico inteiro na memória). "
+               "Para exportações muito grandes use `python export_data.py` no servidor.")
+    profiles = cached(["profiles"], ("profiles_all",),
+                      lambda: supabase.table("profiles").select("id, name, email, role").execute().data)
+    names = {p['id']: p.get('name') or p['email'] for p in profiles}
+    date_labels = {"paid_at": "data do pagamento", "due_date": "vencimento", "created_at": "data de cadastro"}
+
+    with st.form("export"):
+        c1, c2 = st.columns(2)
+        dataset = c1.selectbox("Tabela", list(exporter.DATASETS), format_func=lambda d: (
+            f"{exporter.DATASETS[d]['label']} (período por {date_labels[exporter.DATASETS[d]['date_col']]})"))
+        formats = ["csv"] + (["parquet"] if exporter.parquet_available() else [])
+        fmt = c2.selectbox("Formato", formats, format_func=str.upper)
+        d1, d2, d3 = st.columns(3)
+        start = d1.date_input("De", value=None, format="DD/MM/YYYY")
+        end = d2.date_input("Até", value=None, format="DD/MM/YYYY")
+        delimiter = d3.selectbox("Separador (CSV)", [",", ";"])
+        owner = st.selectbox("Responsável", [None] + sorted(names, key=lambda o: names[o].lower()),
+                             format_func=lambda o: "Todos" if o is None else names[o])
+        submitted = st.form_submit_button("📤 Gerar arquivo", type="primary")
+
+    if submitted:
+        if start and end and start > end:
+            st.error("A data inicial é posterior à final.")
+        else:
+            _discard_previous()
+            _sweep_stale()
+            fd, path = tempfile.mkstemp(prefix=f"{EXPORT_PREFIX}{dataset}_", suffix=exporter.FORMATS[fmt])
+            os.close(fd)
+            try:
+                total = exporter.count_rows(supabase, dataset, start, end, owner)
+            except Exception:
+                total = None
+            bar = st.progress(0.0, text="Exportando...")
+
+            def progress(n):
+                if total:
+                    bar.progress(min(n / total, 1.0), text=f"Exportando... {n} de {total} linhas")
+                else:
+                    bar.progress(0.0, text=f"Exportando... {n} linhas")
+
+            try:
+                rows = exporter.export(supabase, dataset, path, fmt, start, end, owner,
+                                       progress=progress, delimiter=delimiter)
+            except Exception as e:
+                os.remove(path)
+                bar.empty()
+                st.error(f"Erro ao exportar: {e}")
+                return
+            bar.empty()
+            st.session_state._export = {"path": path, "rows": rows, "fmt": fmt, "size": os.path.getsize(path),
+                                        "name": exporter.file_name(dataset, fmt, start, end)}
+
+    exp = st.session_state.get('_export')
+    if exp and ('data' in exp or os.path.exists(exp['path'])):
+        st.success(f"✅ {exp['rows']} linhas exportadas — `{exp['name']}` ({exp['size'] / 1024:,.0f} KB)")
+        # Leitura adiada: o arquivo só é lido do disco (e apagado) quando o botão é clicado
+        st.download_button("⬇️ Baixar arquivo", lambda: _download(exp), file_name=exp['name'],
+                           mime=MIME_TYPES[exp['fmt']], type="primary")
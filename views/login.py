@@ -0,0 +1,28 @@
+"""Tela de login."""
+import streamlit as st
+
+from core import login
+
+
+def render():
+    st.markdown("""
+    <div style='text-align:center; padding: 50px 0 30px 0;'>
+        <div style='font-size: 3.5rem; margin-bottom: 8px;'>🏦</div>
+        <h1 style='font-size: 2.2rem; margin: 0 0 8px 0;'>Gestão de Empréstimos</h1>
+        <p style='color: #888; margin: 0; font-size: 1rem;'>Faça login para acessar o sistema</p>
+    </div>
+    """, unsafe_allow_html=True)
+    c1, c2, c3 = st.columns([1, 1.2, 1])
+    with c2:
+        with st.form("login"):
+            st.markdown("#### 🔐 Acesse sua conta")
+            nome = st.text_input("Seu Nome", placeholder="Como quer ser chamado")
+            email = st.text_input("E-mail", placeholder="seu@email.com")
+            password = st.text_input("Senha", type="password", placeholder="••••••••")
+            st.write("")
+            if st.form_submit_button("Entrar", use_container_width=True, type="primary"):
+                if not nome.strip():
+                    st.error("Informe seu nome.")
+                else:
+                    with st.spinner("Verificando credenciais..."):
+                        login(email, password, nome)
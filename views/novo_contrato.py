@@ -0,0 +1,71 @@
+"""Novo Contrato: escolhe o cliente e gera o empréstimo."""
+from datetime import date
+
+import streamlit as st
+
+from core import db, cached, invalidate, apply_owner_filter, is_admin, brl, client_index, keyset_pager, CLIENT_SEARCH_LIMIT
+
+
+def render():
+    supabase = db()
+    st.title("💰 Novo Contrato")
+    if st.session_state.pop('loan_created', False):
+        st.success("✅ Contrato criado com sucesso!")
+    search = st.text_input("Buscar (Nome/CPF)")
+    try:
+        # Busca no índice em memória; sem busca, página de clientes ordenada por nome
+        if search:
+            cli_data = client_index().search(search, CLIENT_SEARCH_LIMIT)
+        else:
+            cli_data = keyset_pager("novo_contrato", ["clients"], lambda: apply_owner_filter(supabase.table("clients").select("*")), "name")
+        # Dicionário reverso para buscar objeto completo pelo Label
+        opts = {}
+        for c in cli_data:
+            icon = "🟢" if c['reputation']=='BOM' else "🔴" if c['reputation']=='RUIM' else "⚪"
+            lbl = f"{icon} {c['name']} | CPF: {c['cpf']}"
+            opts[lbl] = c
+    except: opts = {}
+
+    if not opts: st.warning("Nenhum cliente encontrado." if search else "Cadastre clientes.")
+    else:
+        st.write("Busque o cliente:")
+        sel_lbl = st.selectbox("Cliente", list(opts.keys()), index=None, placeholder="Digite para buscar...")
+        
+        if sel_lbl:
+            cli = opts[sel_lbl]
+            # Contexto Visual
+            loans = cached(["loans"], ("client_debt", cli['id']),
+                           lambda: supabase.table("loans").select("remaining_amount").eq("client_id", cli['id']).neq("status","pago").execute().data)
+            divida = sum([x['remaining_amount'] for x in loans])
+            
+            alert_color = "#ff4b4b" if cli['reputation']=='RUIM' else "#4CAF50"
+            st.markdown(f"""
+            <div style="border-left: 5px solid {alert_color}; background-color:#262730; padding:15px; border-radius:5px; margin-bottom:15px">
+                <h4 style="margin:0">{cli['name']}</h4>
+                <span>📱 {cli['phone']} | 📍 {cli['address']}</span><br>
+                <span>💸 Dívida Atual: <b>{brl(divida)}</b></span>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            if cli['reputation']=='RUIM': st.error("⚠️ Atenção: Cliente com histórico negativo.")
+
+            with st.form("new_loan"):
+                c1, c2, c3 = st.columns(3)
+                val = c1.number_input("Valor (R$)", min_value=50.0, step=50.0)
+                if is_admin():
+                    rate = c2.number_input("Juros (%)", value=10.0, step=0.5)
+                else:
+                    rate = 30.0
+                    c2.metric("Juros (%)", "30%")
+                due = c3.date_input("1º Vencimento", date.today(), format="DD/MM/YYYY")
+                
+                if st.form_submit_button("Gerar Contrato", type="primary"):
+                    with st.spinner("Criando contrato..."):
+                        supabase.table("loans").insert({
+                            "client_id": cli['id'], "original_amount": val, "remaining_amount": val,
+                            "interest_rate": rate, "due_date": str(due), "due_day": due.day,
+                            "owner_id": st.session_state.user.id
+                        }).execute()
+                        invalidate("loans")
+                    st.session_state['loan_created'] = True
+                    st.rerun()
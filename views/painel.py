@@ -0,0 +1,240 @@
+"""Painel Financeiro: alertas de vencimento, KPIs, distribuição por status,
+previsão de recebimentos (cashflow.py) e evolução da carteira (portfolio_snapshots)."""
+from datetime import datetime, date, timedelta
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+import cashflow
+from core import (db, cached, apply_owner_filter, is_admin, owner_id, brl, client_index, keyset_pager,
+                  CLIENT_SEARCH_LIMIT)
+
+
+def render():
+    supabase = db()
+    st.title("📊 Painel Financeiro")
+
+    # Alertas: só contratos em aberto que vencem até daqui a 7 dias
+    hoje = date.today()
+    with st.spinner("Carregando dados..."):
+        alertas_raw = cached(["loans", "clients"], ("alertas", str(hoje)),
+                             lambda: apply_owner_filter(supabase.table("loans").select("id, status, due_date, clients(name)")
+                                                        .neq("status", "pago").lte("due_date", str(hoje + timedelta(days=7)))).execute().data)
+    atrasados_lst = [l for l in alertas_raw if l['status'] == 'atrasado']
+    vencem_hoje_lst = [l for l in alertas_raw if l['status'] == 'pendente' and datetime.strptime(l['due_date'], '%Y-%m-%d').date() == hoje]
+    vencem_semana_lst = [l for l in alertas_raw if l['status'] == 'pendente' and hoje < datetime.strptime(l['due_date'], '%Y-%m-%d').date() <= hoje + timedelta(days=7)]
+
+    al1, al2, al3 = st.columns(3)
+    with al1:
+        if atrasados_lst:
+            st.error(f"🔴 **{len(atrasados_lst)} contrato(s) atrasado(s)**")
+            for l in atrasados_lst[:3]: st.caption(f"↳ {l['clients']['name']}")
+            if len(atrasados_lst) > 3: st.caption(f"↳ ... e mais {len(atrasados_lst)-3}")
+        else:
+            st.success("✅ Nenhum contrato atrasado")
+    with al2:
+        if vencem_hoje_lst:
+            st.warning(f"🟡 **{len(vencem_hoje_lst)} vence(m) hoje**")
+            for l in vencem_hoje_lst[:3]: st.caption(f"↳ {l['clients']['name']}")
+        else:
+            st.success("✅ Nenhum vence hoje")
+    with al3:
+        if vencem_semana_lst:
+            st.warning(f"🟠 **{len(vencem_semana_lst)} vence(m) essa semana**")
+            for l in vencem_semana_lst[:3]: st.caption(f"↳ {l['clients']['name']}")
+        else:
+            st.success("✅ Nenhum vence essa semana")
+
+    st.divider()
+    with st.expander("🔍 Filtros", expanded=True):
+        c1, c2 = st.columns(2)
+        dr = c1.date_input("Período (Vencimento)", (date(date.today().year, 1, 1), date.today()), format="DD/MM/YYYY")
+        # Clientes pela busca do índice em memória (não lista a carteira toda);
+        # os já escolhidos continuam nas opções quando a busca muda
+        cli_names = st.session_state.setdefault('_painel_cli_names', {})
+        busca = c2.text_input("Buscar clientes (Nome/CPF)", key="_painel_busca")
+        found = client_index().search(busca, CLIENT_SEARCH_LIMIT) if busca else []
+        cli_names.update({c['id']: c['name'] for c in found})
+        chosen = [cid for cid in st.session_state.get('_painel_cli', []) if cid in cli_names]
+        sel_cli = c2.multiselect("Clientes", list(dict.fromkeys(chosen + [c['id'] for c in found])),
+                                 format_func=cli_names.get, key="_painel_cli")
+
+    # Filtros aplicados no banco (KPIs/gráficos agregados por dashboard_summary, migration_v5)
+    d_ini, d_fim = (str(dr[0]), str(dr[1])) if len(dr) == 2 else (None, None)
+    cli_ids = sorted(sel_cli) or None
+    params = {"p_owner_id": None if is_admin() else owner_id(), "p_start": d_ini, "p_end": d_fim, "p_client_ids": cli_ids}
+    try:
+        summary = pd.DataFrame(cached(["loans", "profiles"], ("dashboard_summary", d_ini, d_fim, tuple(cli_ids or ())),
+                                      lambda: supabase.rpc("dashboard_summary", params).execute().data))
+    except Exception as e:
+        st.error(f"Erro ao carregar indicadores (aplique database/migration_v5.sql): {e}")
+        st.stop()
+
+    if not summary.empty:
+        num_cols = ['total_emprestado', 'saldo_devedor', 'juros_previstos', 'comissao_funcionarios']
+        summary[num_cols] = summary[num_cols].astype(float)
+        # KPIs
+        tot_orig = summary['total_emprestado'].sum()
+        tot_dev = summary['saldo_devedor'].sum()
+
+        if is_admin():
+            tot_commission = summary['comissao_funcionarios'].sum()
+            tot_admin_profit = summary['juros_previstos'].sum() - tot_commission
+
+            k1, k2, k3, k4 = st.columns(4)
+            k1.metric("Total Emprestado", brl(tot_orig))
+            k2.metric("Saldo a Receber", brl(tot_dev))
+            k3.metric("Lucro Previsto (Admin)", brl(tot_admin_profit))
+            k4.metric("Comissões Funcionários", brl(tot_commission))
+        else:
+            tot_commission_emp = tot_orig * 0.10
+            k1, k2, k3 = st.columns(3)
+            k1.metric("Total Emprestado", brl(tot_orig))
+            k2.metric("Saldo a Receber", brl(tot_dev))
+            k3.metric("Minha Comissão (10%)", brl(tot_commission_emp))
+
+        # Tabela Formatada (apenas as colunas exibidas, já filtradas no banco), em páginas por vencimento
+        st.divider()
+        def grid_query():
+            q = apply_owner_filter(supabase.table("loans").select("id, due_date, original_amount, remaining_amount, status"))
+            if d_ini: q = q.gte("due_date", d_ini).lte("due_date", d_fim)
+            if cli_ids: q = q.in_("client_id", cli_ids)
+            return q
+        st.caption(f"{int(summary['contratos'].sum())} contratos no filtro")
+        grid = pd.DataFrame(keyset_pager("painel", ["loans"], grid_query, "due_date",
+                                         reset_on=(d_ini, d_fim, tuple(cli_ids or ()))))
+        if not grid.empty:
+            # Formata data para string BR
+            grid['due_date'] = pd.to_datetime(grid['due_date']).dt.strftime('%d/%m/%Y')
+            grid = grid[['due_date', 'original_amount', 'remaining_amount', 'status']]
+            grid.columns = ['Vencimento', 'Valor Original', 'Saldo Devedor', 'Status']
+
+            def color(v): return f"background-color: {'#d4edda' if v=='pago' else '#f8d7da' if v=='atrasado' else '#fff3cd'}; color: black"
+            st.dataframe(grid.style.map(color, subset=['Status']).format({'Valor Original': brl, 'Saldo Devedor': brl}), use_container_width=True)
+
+        # Gráficos de distribuição
+        st.divider()
+        st.subheader("📊 Distribuição por Status")
+        gc1, gc2 = st.columns(2)
+        label_map = {'pago': 'Pago', 'pendente': 'Pendente', 'atrasado': 'Atrasado'}
+        status_count = summary[['status', 'contratos']].rename(columns={'contratos': 'Contratos'})
+        status_saldo = summary[['status', 'saldo_devedor']].rename(columns={'saldo_devedor': 'Saldo'})
+        status_count['Status'] = status_count['status'].map(label_map)
+        status_saldo['Status'] = status_saldo['status'].map(label_map)
+        cor_scale = alt.Scale(domain=['pago','pendente','atrasado'], range=['#2ecc71','#f39c12','#e74c3c'])
+        with gc1:
+            c_count = alt.Chart(status_count).mark_arc(innerRadius=55, outerRadius=95).encode(
+                theta=alt.Theta('Contratos:Q'),
+                color=alt.Color('status:N', scale=cor_scale, legend=alt.Legend(title='Status')),
+                tooltip=[alt.Tooltip('Status:N', title='Status'), alt.Tooltip('Contratos:Q', title='Contratos')]
+            ).properties(
+                title=alt.TitleParams('Contratos por Status', anchor='middle', fontSize=14, dy=-5),
+                height=260,
+                padding={'top': 30}
+            )
+            st.altair_chart(c_count, use_container_width=True)
+        with gc2:
+            c_saldo = alt.Chart(status_saldo).mark_bar(
+                cornerRadiusTopLeft=6, cornerRadiusTopRight=6
+            ).encode(
+                x=alt.X('Status:N', title=None, axis=alt.Axis(labelAngle=0, labelFontSize=13)),
+                y=alt.Y('Saldo:Q', title='Saldo Devedor (R$)', axis=alt.Axis(format=',.0f')),
+                color=alt.Color('status:N', scale=cor_scale, legend=None),
+                tooltip=[alt.Tooltip('Status:N', title='Status'), alt.Tooltip('Saldo:Q', title='Saldo (R$)', format=',.2f')]
+            ).properties(
+                title=alt.TitleParams('Saldo Devedor por Status', anchor='middle', fontSize=14),
+                height=260,
+                padding={'top': 30}
+            )
+            st.altair_chart(c_saldo, use_container_width=True)
+
+        # Previsão mês a mês dos contratos em aberto (cashflow.py), sem os filtros de período.
+        # O banco só agrupa os contratos por dono/mês/taxa (open_loans_by_month, migration_v15)
+        st.divider()
+        st.subheader("📈 Previsão de Recebimentos")
+        fc1, fc2 = st.columns([1, 2])
+        n_meses = fc1.slider("Meses", 3, 24, 12, key="_fc_meses")
+        profiles = cached(["profiles"], ("profiles_all",),
+                          lambda: supabase.table("profiles").select("id, name, email, role").execute().data)
+        roles = {p['id']: p['role'] for p in profiles}
+        names = {p['id']: p.get('name') or p['email'] for p in profiles}
+        try:
+            grupos = cached(["loans"], ("open_loans_by_month",), lambda: supabase.rpc(
+                "open_loans_by_month", {"p_owner_id": None if is_admin() else owner_id()}).execute().data)
+        except Exception as e:
+            grupos = []
+            st.caption(f"Previsão indisponível (aplique database/migration_v15.sql): {e}")
+        forecast = cashflow.project(grupos, roles, n_meses)
+        if is_admin() and not forecast.empty:
+            por_resp = fc2.selectbox("Responsável", ["Todos"] + sorted({names.get(o, o) for o in forecast['owner_id']}), key="_fc_owner")
+            if por_resp != "Todos":
+                forecast = forecast[forecast['owner_id'].map(lambda o: names.get(o, o)) == por_resp]
+        if forecast.empty:
+            st.info("Nenhum contrato em aberto para projetar.")
+        else:
+            mensal = forecast.groupby('mes', as_index=False)[['parcelas', 'juros', 'comissao', 'lucro']].sum()
+            if is_admin():
+                series = {'lucro': 'Lucro (Admin)', 'comissao': 'Comissões'}
+                f1, f2, f3 = st.columns(3)
+                f1.metric(f"Juros previstos ({n_meses} meses)", brl(mensal['juros'].sum()))
+                f2.metric("Lucro previsto (Admin)", brl(mensal['lucro'].sum()))
+                f3.metric("Comissões previstas", brl(mensal['comissao'].sum()))
+            else:
+                series = {'comissao': 'Minha Comissão'}
+                fc2.metric(f"Minha comissão prevista ({n_meses} meses)", brl(mensal['comissao'].sum()))
+            long = mensal.melt(id_vars=['mes', 'parcelas'], value_vars=list(series), var_name='tipo', value_name='valor')
+            long['Tipo'] = long['tipo'].map(series)
+            c_prev = alt.Chart(long).mark_bar().encode(
+                x=alt.X('yearmonth(mes):O', title=None, axis=alt.Axis(labelAngle=0, format='%m/%Y')),
+                y=alt.Y('valor:Q', title='Valor (R$)', stack=True, axis=alt.Axis(format=',.0f')),
+                color=alt.Color('Tipo:N', scale=alt.Scale(domain=list(series.values()), range=['#2ecc71', '#3498db'][:len(series)]),
+                                legend=alt.Legend(title=None, orient='top')),
+                tooltip=[alt.Tooltip('yearmonth(mes):O', title='Mês', format='%m/%Y'), alt.Tooltip('Tipo:N'),
+                         alt.Tooltip('valor:Q', title='Valor (R$)', format=',.2f'), alt.Tooltip('parcelas:Q', title='Parcelas')]
+            ).properties(height=300)
+            st.altair_chart(c_prev, use_container_width=True)
+            st.caption("Juros de cada contrato em aberto todo mês até a quitação (comissão: 10% do saldo devedor); "
+                       "parcelas vencidas entram no mês atual.")
+
+        # Tendência a partir das fotos diárias gravadas pelo robô (migration_v12)
+        st.divider()
+        st.subheader("📉 Evolução da Carteira")
+        dias = st.selectbox("Período", [30, 90, 180, 365], index=1, format_func=lambda d: f"Últimos {d} dias", key="_hist_dias")
+        desde = str(hoje - timedelta(days=dias))
+        try:
+            hist = pd.DataFrame(cached(["portfolio_snapshots"], ("snapshots", desde), lambda: apply_owner_filter(
+                supabase.table("portfolio_snapshots").select("snapshot_date, owner_id, status, contratos, saldo_devedor, approximate")
+                .gte("snapshot_date", desde)).order("snapshot_date").execute().data))
+        except Exception as e:
+            hist = pd.DataFrame()
+            st.caption(f"Histórico indisponível (aplique database/migration_v12.sql): {e}")
+        if hist.empty:
+            st.info("Ainda não há fotos da carteira no período. O robô diário grava uma por dia.")
+        else:
+            hist['snapshot_date'] = pd.to_datetime(hist['snapshot_date'])
+            hist['saldo_devedor'] = hist['saldo_devedor'].astype(float)
+            hist['Status'] = hist['status'].map(label_map)
+            por_status = hist.groupby(['snapshot_date', 'status', 'Status'], as_index=False)[['saldo_devedor', 'contratos']].sum()
+            c_hist = alt.Chart(por_status).mark_area(opacity=0.85).encode(
+                x=alt.X('snapshot_date:T', title=None, axis=alt.Axis(format='%d/%m')),
+                y=alt.Y('saldo_devedor:Q', title='Saldo Devedor (R$)', stack=True, axis=alt.Axis(format=',.0f')),
+                color=alt.Color('status:N', scale=cor_scale, legend=alt.Legend(title='Status', orient='top')),
+                tooltip=[alt.Tooltip('snapshot_date:T', title='Data', format='%d/%m/%Y'), alt.Tooltip('Status:N'),
+                         alt.Tooltip('contratos:Q', title='Contratos'), alt.Tooltip('saldo_devedor:Q', title='Saldo (R$)', format=',.2f')]
+            ).properties(title=alt.TitleParams('Saldo Devedor por Status', anchor='middle', fontSize=14), height=280)
+            st.altair_chart(c_hist, use_container_width=True)
+            if is_admin():
+                hist['Responsável'] = hist['owner_id'].map(lambda o: names.get(o, o))
+                por_dono = hist[hist['status'] != 'pago'].groupby(['snapshot_date', 'Responsável'], as_index=False)['saldo_devedor'].sum()
+                c_dono = alt.Chart(por_dono).mark_line(point=True).encode(
+                    x=alt.X('snapshot_date:T', title=None, axis=alt.Axis(format='%d/%m')),
+                    y=alt.Y('saldo_devedor:Q', title='Saldo em Aberto (R$)', axis=alt.Axis(format=',.0f')),
+                    color=alt.Color('Responsável:N', legend=alt.Legend(orient='top')),
+                    tooltip=[alt.Tooltip('snapshot_date:T', title='Data', format='%d/%m/%Y'), alt.Tooltip('Responsável:N'),
+                             alt.Tooltip('saldo_devedor:Q', title='Saldo (R$)', format=',.2f')]
+                ).properties(title=alt.TitleParams('Saldo em Aberto por Responsável', anchor='middle', fontSize=14), height=280)
+                st.altair_chart(c_dono, use_container_width=True)
+            if hist['approximate'].any():
+                st.caption("Dias anteriores ao início das fotos foram reconstruídos a partir dos pagamentos (valores aproximados).")
+    else: st.warning("Sem dados para o filtro.")
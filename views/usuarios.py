@@ -0,0 +1,102 @@
+"""Gerenciar Usuários (somente admin): cria funcionários, troca a própria senha e lista/exclui contas."""
+import streamlit as st
+
+from core import db, auth_db, cached, invalidate, validate_email, forget_role
+
+
+def render():
+    supabase, supabase_auth = db(), auth_db()
+    if st.session_state.role != 'admin':
+        st.error("Acesso negado.")
+        st.stop()
+    st.title("👥 Gerenciar Usuários")
+    tab_criar, tab_senha, tab_lista = st.tabs(["➕ Criar Funcionário", "🔑 Alterar Minha Senha", "📋 Funcionários"])
+
+    with tab_criar:
+        st.subheader("Criar conta de funcionário")
+        with st.form("new_employee"):
+            n_name = st.text_input("Nome do Funcionário")
+            n_email = st.text_input("E-mail")
+            n_pass = st.text_input("Senha Temporária", type="password")
+            n_pass2 = st.text_input("Confirmar Senha", type="password")
+            if st.form_submit_button("✅ Criar Conta", type="primary"):
+                errs = []
+                if not (n_name and n_email and n_pass): errs.append("Preencha todos os campos.")
+                if n_pass != n_pass2: errs.append("Senhas não conferem.")
+                if n_email and not validate_email(n_email): errs.append("E-mail inválido.")
+                if len(n_pass) < 6: errs.append("Senha deve ter ao menos 6 caracteres.")
+                for er in errs: st.error(er)
+                if not errs:
+                    try:
+                        # admin.create_user cria sem enviar email de confirmação
+                        res_new = supabase.auth.admin.create_user({
+                            "email": n_email,
+                            "password": n_pass,
+                            "email_confirm": True,
+                        })
+                        if res_new.user:
+                            supabase.table("profiles").update({"name": n_name, "role": "employee"}).eq("id", res_new.user.id).execute()
+                            invalidate("profiles")
+                            st.success(f"✅ Funcionário **{n_name}** criado! E-mail: `{n_email}` | Senha: `{n_pass}`")
+                        else:
+                            st.error("Não foi possível criar o usuário. O e-mail já pode estar cadastrado.")
+                    except Exception as e:
+                        st.error(f"Erro: {e}")
+
+    with tab_senha:
+        st.subheader("Alterar sua senha")
+        with st.form("change_pass"):
+            new_p = st.text_input("Nova Senha", type="password")
+            new_p2 = st.text_input("Confirmar Nova Senha", type="password")
+            if st.form_submit_button("🔑 Alterar Senha", type="primary"):
+                if not new_p: st.error("Informe a nova senha.")
+                elif new_p != new_p2: st.error("Senhas não conferem.")
+                elif len(new_p) < 6: st.error("Senha deve ter ao menos 6 caracteres.")
+                else:
+                    try:
+                        # Usa supabase_auth com a sessão do usuário logado
+                        supabase_auth.auth.set_session(
+                            st.session_state.session.access_token,
+                            st.session_state.session.refresh_token
+                        )
+                        supabase_auth.auth.update_user({"password": new_p})
+                        st.success("✅ Senha alterada com sucesso!")
+                    except Exception as e:
+                        st.error(f"Erro: {e}")
+
+    with tab_lista:
+        st.subheader("Usuários cadastrados")
+        try:
+            profs = cached(["profiles"], ("profiles_all",),
+                           lambda: supabase.table("profiles").select("id, name, email, role").execute().data)
+            if profs:
+                for p in profs:
+                    role_icon = "👑 Admin" if p['role'] == 'admin' else "👤 Funcionário"
+                    is_self = p['id'] == st.session_state.user.id
+                    pc1, pc2, pc3 = st.columns([3, 2, 1])
+                    pc1.write(f"**{p.get('name') or '—'}** | {p['email']}")
+                    pc2.write(role_icon)
+                    if not is_self:
+                        if pc3.button("🗑️", key=f"del_user_{p['id']}", help="Excluir funcionário"):
+                            st.session_state[f'confirm_del_user_{p["id"]}'] = True
+                    else:
+                        pc3.caption("(você)")
+                    if st.session_state.get(f'confirm_del_user_{p["id"]}'):
+                        st.warning(f"⚠️ Excluir **{p.get('name') or p['email']}**? Esta ação não pode ser desfeita.")
+                        uc1, uc2 = st.columns(2)
+                        if uc1.button("✅ Confirmar exclusão", key=f"yes_del_user_{p['id']}", type="primary"):
+                            try:
+                                supabase.auth.admin.delete_user(p['id'])
+                                forget_role(p['id'])
+                                invalidate("profiles")
+                                st.session_state.pop(f'confirm_del_user_{p["id"]}', None)
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Erro: {e}")
+                        if uc2.button("❌ Cancelar", key=f"cancel_del_user_{p['id']}"):
+                            st.session_state.pop(f'confirm_del_user_{p["id"]}', None)
+                            st.rerun()
+            else:
+                st.info("Nenhum usuário encontrado.")
+        except Exception as e:
+            st.error(f"Erro ao listar usuários: {e}")
@@ -0,0 +1,167 @@
+"""
+Envio de mensagens pelo WAHA com limite de taxa e novas tentativas.
+
+- Token bucket global (protege o servidor WAHA) e um por sessão
+  (protege o número de WhatsApp de ser marcado por rajadas).
+- 429, 5xx, timeouts e erros de conexão são repetidos com backoff
+  exponencial + jitter, respeitando o Retry-After quando vier.
+- Um orçamento de retries (fração dos envios) evita que uma falha geral
+  multiplique as requisições.
+"""
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+
+import requests
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """`rate` fichas por segundo, acumulando até `burst`. Thread-safe."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloqueia até haver uma ficha (ou a pausa acabar)."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Suspende o bucket (ex: 429 com Retry-After) e zera as fichas acumuladas."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class RetryBudget:
+    """Retries permitidos = `ratio` x envios feitos + `minimum`."""
+
+    def __init__(self, ratio: float = 0.2, minimum: int = 10):
+        self.ratio, self.minimum = ratio, minimum
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.retries < self.minimum + self.ratio * self.requests:
+                self.retries += 1
+                return True
+            return False
+
+
+def retry_after(resp) -> float | None:
+    """Segundos pedidos pelo cabeçalho Retry-After (número ou data HTTP)."""
+    value = resp.headers.get("Retry-After") if resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class WahaSender:
+    """Envia textos pelo endpoint /api/sendText com limite de taxa e retries."""
+
+    def __init__(self, base_url: str, api_key: str = "", http: requests.Session = None,
+                 rate: float = 5.0, burst: float = 5.0,
+                 session_rate: float = 1.0, session_burst: float = 3.0,
+                 max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 budget: RetryBudget = None, timeout: float = 15.0):
+        self.url = f"{base_url.rstrip('/')}/api/sendText"
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["X-Api-Key"] = api_key
+        self.http = http or requests.Session()
+        self.global_bucket = TokenBucket(rate, burst)
+        self.session_rate, self.session_burst = session_rate, session_burst
+        self.session_buckets = {}
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay, self.max_delay = base_delay, max_delay
+        self.budget = budget or RetryBudget()
+        self.timeout = timeout
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def _session_bucket(self, session: str) -> TokenBucket:
+        with self._lock:
+            if session not in self.session_buckets:
+                self.session_buckets[session] = TokenBucket(self.session_rate, self.session_burst)
+            return self.session_buckets[session]
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: aleatório entre 0 e base * 2^tentativa (limitado a max_delay)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def send_text(self, chat_id: str, text: str, session: str = "default") -> tuple[bool, str | None]:
+        """Retorna (sucesso, último erro)."""
+        bucket = self._session_bucket(session)
+        payload = {"session": session, "chatId": chat_id, "text": text}
+        error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                if not self.budget.try_spend():
+                    self._count("budget_exhausted")
+                    break
+                self._count("retries")
+            # Sessão antes do global: uma sessão pausada por 429 não segura a vez das outras
+            bucket.acquire()
+            self.global_bucket.acquire()
+            self.budget.record_request()
+            resp = None
+            try:
+                resp = self.http.post(self.url, json=payload, headers=self.headers, timeout=self.timeout)
+                if resp.status_code < 400:
+                    self._count("sent")
+                    return True, None
+                error = f"HTTP {resp.status_code}"
+                if resp.status_code not in RETRY_STATUS:
+                    break  # 4xx (número inválido, sessão parada...): repetir não resolve
+            except (requests.Timeout, requests.ConnectionError) as e:
+                error = type(e).__name__
+            except requests.RequestException as e:
+                error = str(e)
+                break
+
+            wait = retry_after(resp)
+            if resp is not None and resp.status_code == 429:
+                self._count("throttled")
+                # O limite é do número: segura todas as threads desta sessão
+                bucket.pause(wait if wait is not None else self._backoff(attempt + 1))
+            if attempt + 1 < self.max_attempts:
+                time.sleep(min(self.max_delay, wait) if wait is not None else self._backoff(attempt))
+        self._count("failed")
+        return False, error
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1